@@ -1,40 +1,282 @@
+import os
+import sys
+
+if __name__ == "__main__":
+    # Headless CLI (`run` / `ctl`): dispatch before the pipeline imports, so `ctl` stays a thin client
+    from utils.headless import main
+    sys.exit(main())
+
 import threading
 import queue
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 
 
-from utils.pipeline import (
-    RecorderThread,
-    ConverterThread,
-    TranscriberThread,
-    SummarizerThread,
-)
+from utils.stages import StageContext, build_pipeline, STAGE_SPEC_KEYS
+from utils.config_service import get_config_service
+from utils.async_engine import get_engine
+from utils.process_pool import get_process_pool
 from utils.logger import get_logger
+from utils.model_router import configure_models, log_usage_report
+from utils.embedding_cache import get_embedding_cache
+from utils.evaluator import ObjectiveSet
+from utils.vector_index import VectorIndex, load_library
+from utils.backpressure import MonitoredQueue, QueueMonitor
+from utils.latency import LatencyTracker, LatencyMonitor
+from utils.session_pool import FairPool, log_pool_stats
+from utils.journal import SessionJournal, discard_journal_audio, replay
+
+
+# Used when config.yaml has no `pipeline.stages`
+DEFAULT_TOPOLOGY = [
+    {"name": "recorder", "class": "utils.pipeline.RecorderStage", "output": "record"},
+    {"name": "converter", "class": "utils.pipeline.ConverterStage", "input": "record", "output": "convert"},
+    {"name": "transcriber", "class": "utils.pipeline.TranscriberStage", "input": "convert", "output": "tone", "pool": "stt"},
+    {"name": "tone", "class": "utils.pipeline.ToneStage", "input": "tone", "output": "transcribe", "pool": "llm"},
+    {"name": "summarizer", "class": "utils.pipeline.SummarizerStage", "input": "transcribe"},
+]
 
 
 class MasterController:
-    """Manages the full audio processing pipeline (Recorder → Converter → Transcriber → Summarizer)."""
+    """
+    Manages the audio processing pipeline declared under `pipeline.stages` (Recorder → … → Summarizer).
 
-    def __init__(self, config_path: str = "./config.yaml", ui_queue = None):
+    One controller is one meeting session. Several can run side by side (see SessionManager):
+    each gets a `session_id`, its own stages, queues and state, per-session config `overrides`
+    (e.g. {"audio": {"input_device_index": 2}}), and the shared STT/LLM `pools`.
+    """
+
+    def __init__(self, config_path: str = "./config.yaml", ui_queue = None, session_id: str = None,
+                 pools: dict = None, overrides: dict = None):
         # Initialize logger
         self.logger = get_logger(config_path)
         self.config_path = config_path
         self.ui_queue = ui_queue
-        self.logger.info("🧩 MasterController initialized with configuration.")
+        self.session_id = session_id
+        self.pools = pools or {}
+        self.overrides = overrides or {}
+        self._subscriptions = []
+        self.logger.info(f"🧩 MasterController initialized with configuration{self._label()}.")
 
         # Thread synchronization events
         self.stop_event = threading.Event()
         self.pause_event = threading.Event()
         self.pause_event.set()  # start unpaused
 
-        # Queues for inter-thread communication
-        self.record_q = queue.Queue(maxsize=50)
-        self.convert_q = queue.Queue(maxsize=50)
-        self.transcribe_q = queue.Queue(maxsize=50)
+        # Parsed and validated once; edits to config.yaml arrive as per-section change events
+        self.settings = get_config_service(config_path)
+        cfg = self.settings.snapshot()
+        for section in self.overrides:
+            cfg[section] = self._overlay(section, cfg.get(section))
+        self.cfg = cfg
+        pipeline_cfg = cfg.get("pipeline") or {}
+        self.topology = pipeline_cfg.get("stages") or DEFAULT_TOPOLOGY
+        # threads | asyncio (network stages as coroutines on one event loop)
+        self.engine_mode = pipeline_cfg.get("engine", "threads")
+        self.engine_limits = pipeline_cfg.get("limits") or {}
+        # Worker processes for stages with `engine: process` (CPU-bound kernels off the GIL)
+        self.process_workers = int(pipeline_cfg.get("processes", 2))
+        # Shutdown deadlines (seconds)
+        self._apply_shutdown(cfg["shutdown"])
+        # Per-queue backpressure policy and gauge reporting
+        self.queue_cfg = cfg.get("queues") or {}
+        # Capture → UI latency histograms, dumped every `latency.report_interval` seconds
+        self.latency_interval = float(cfg["latency"]["report_interval"])
+        self.latency = None  # LatencyTracker of the current (or last) run
+        # Crash-safe meeting journal; an unfinished one is resumed on the next start
+        self.journal_cfg = cfg["journal"]
+        self.journal = None
+        self._subscribe("pipeline", self._on_pipeline_change)
+        self._subscribe("shutdown", lambda new, old: self._apply_shutdown(new))
+        self._subscribe("latency", self._on_latency_change)
+        self.audio_rate = int((cfg.get("audio") or {}).get("rate", 16000))
+        configure_models(config_path)
+        cache_dir = (cfg.get("evaluator") or {}).get("cache_dir")
+        if cache_dir:
+            cache_dir = os.path.join(os.path.dirname(os.path.abspath(config_path)), cache_dir)
+        get_embedding_cache(cache_dir)
+        evaluator_cfg = cfg.get("evaluator") or {}
+        self.evaluator_backend = evaluator_cfg.get("backend", "openai")
+        self.evaluator_storage = evaluator_cfg.get("storage", "float32")
+
+        # Queues between stages, created per run by build_pipeline
+        self.queues = {}
 
         # Thread handles
         self.threads = []
+        self._drain_thread = None
+        self.queue_monitor = None
+        self.latency_monitor = None
+
+        # Meeting set up by initialize_meeting(); objectives are embedded in the background
+        self.meeting = {"purpose": "", "participants": [], "objectives": {}}
+        self._objectives = None  # Future → ObjectiveSet
+        self._prep_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="MeetingPrep")
+
+        # Objective/topic library index, loaded (or embedded and saved) once in the background
+        self._library = None  # Future → VectorIndex
+        library_path = evaluator_cfg.get("library")
+        if library_path and self.evaluator_backend != "local":
+            base_dir = os.path.dirname(os.path.abspath(config_path))
+            library_path = os.path.join(base_dir, library_path)
+            if os.path.exists(library_path):
+                self._library = self._prep_pool.submit(
+                    self._load_library, library_path,
+                    os.path.join(base_dir, evaluator_cfg.get("library_index", "cache/objective_library.npz")),
+                    evaluator_cfg.get("library_pca_dims"),
+                )
+            else:
+                self.logger.warning(f"⚠️ Objective library not found: {library_path}")
+
+    # ======================================================
+    # ⚙️ Live settings
+    # ======================================================
+
+    def _label(self) -> str:
+        return f" [{self.session_id}]" if self.session_id else ""
+
+    def _overlay(self, section: str, values) -> dict:
+        """A config section with this session's overrides applied (the stages' `ctx.view`)."""
+        merged = dict(values or {})
+        merged.update(self.overrides.get(section) or {})
+        return merged
+
+    def _subscribe(self, section: str, handler):
+        """Follow a config section, seen through this session's overrides; undone by close()."""
+        def callback(new, old):
+            handler(self._overlay(section, new), self._overlay(section, old))
+        self.settings.subscribe(section, callback)
+        self._subscriptions.append((section, callback))
+
+    def _apply_shutdown(self, shutdown_cfg):
+        self.drain_timeout = float(shutdown_cfg["drain_timeout"])
+        self.final_timeout = float(shutdown_cfg["final_timeout"])
+
+    def _on_latency_change(self, new, old):
+        self.latency_interval = float(new["report_interval"])
+        if self.latency_monitor is not None:
+            self.latency_monitor.interval = self.latency_interval
+
+    def _on_pipeline_change(self, new, old):
+        """Retune running stages (concurrency, stage options, engine limits); topology edits wait for the next start."""
+        self.engine_mode = new.get("engine", "threads")
+        self.engine_limits = new.get("limits") or {}
+        self.process_workers = int(new.get("processes", 2))
+        if self.engine_limits and any(t.engine is not None for t in self.threads):
+            get_engine(self.engine_limits)
+
+        specs = {spec["name"]: spec for spec in new.get("stages") or DEFAULT_TOPOLOGY}
+        layout = lambda spec: tuple(spec.get(k) for k in ("class", "input", "output", "enabled", "engine"))
+        old_specs = {spec["name"]: spec for spec in old.get("stages") or DEFAULT_TOPOLOGY}
+        if set(specs) != set(old_specs) or any(layout(specs[n]) != layout(old_specs[n]) for n in specs):
+            self.logger.info("🔁 Pipeline topology changed; it takes effect on the next start.")
+        self.topology = list(specs.values())
+
+        for t in self.threads:
+            spec = specs.get(t.name)
+            if spec is None or not t.is_alive():
+                continue
+            t.set_concurrency(spec.get("concurrency", 1))
+            options = {k: v for k, v in spec.items() if k not in STAGE_SPEC_KEYS}
+            previous = {k: v for k, v in old_specs.get(t.name, {}).items() if k not in STAGE_SPEC_KEYS}
+            if options != previous:
+                t.stage.reconfigure(options)
+
+    def _load_library(self, library_path, index_path, pca_dims=None):
+        try:
+            return VectorIndex.load_or_build(load_library(library_path), index_path, pca_dims, self.evaluator_storage)
+        except Exception as e:
+            self.logger.error(f"❌ Could not build the objective library index: {e}", exc_info=True)
+            raise
+
+    def _new_queue(self, name: str) -> MonitoredQueue:
+        """Build one stage queue from `queues.<name>` (maxsize, policy, coalesce_max_seconds)."""
+        qcfg = self.queue_cfg.get(name) or {}
+        base_dir = os.path.dirname(os.path.abspath(self.config_path))
+        max_seconds = qcfg.get("coalesce_max_seconds")
+        return MonitoredQueue(
+            name,
+            maxsize=int(qcfg.get("maxsize", 50)),
+            policy=qcfg.get("policy", "block"),
+            spill_dir=os.path.join(base_dir, self.queue_cfg.get("spill_dir", "temp_audio/spill"), self.session_id or ""),
+            coalesce_max_bytes=int(max_seconds * self.audio_rate * 2) if max_seconds else None,  # 16-bit mono PCM
+        )
+
+    def _open_journal(self):
+        """
+        Open this session's journal; returns (journal, replayed state or None).
+
+        An unfinished journal (no final summary) is resumed when `journal.resume` is on:
+        its meeting setup is adopted if none was given. Otherwise it is archived and a
+        fresh journal starts with the current meeting.
+        """
+        if not self.journal_cfg["enabled"]:
+            return None, None
+        base_dir = os.path.dirname(os.path.abspath(self.config_path))
+        path = os.path.join(base_dir, self.journal_cfg["dir"], f"{self.session_id or 'meeting'}.jsonl")
+        state = None
+        if os.path.exists(path) and os.path.getsize(path):
+            try:
+                state = replay(path)
+            except Exception as e:
+                self.logger.error(f"❌ Could not replay journal {path}: {e}", exc_info=True)
+            if state is None or state.final is not None or state.empty or not self.journal_cfg["resume"]:
+                state = None
+                archived = f"{path[:-len('.jsonl')]}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+                os.replace(path, archived)
+                discard_journal_audio(path)  # clips saved for a resume that will not happen
+                self.logger.info(f"🗄️ Previous journal archived to {archived}")
+
+        journal = SessionJournal(path, fsync=self.journal_cfg["fsync"])
+        if state is None:
+            journal.append("meeting", **self.meeting)
+            return journal, None
+
+        if state.meeting and not any(self.meeting.values()):
+            self.initialize_meeting(**state.meeting)
+        self.logger.info(
+            f"♻️ Resuming meeting from {path} | {len(state.clips)} clips, {len(state.deltas)} transcript deltas, "
+            f"{len(state.partials)} partials"
+        )
+        self._notify("status", f"Resumed meeting: {len(state.deltas)} transcript chunks recovered")
+        return journal, state
+
+    def _notify(self, msg_type: str, content: str = ""):
+        """Send a pipeline status message to the UI, if one is attached."""
+        if self.ui_queue:
+            self.ui_queue.put({"type": msg_type, "content": content})
+
+    # ======================================================
+    # 📋 Meeting Setup
+    # ======================================================
+
+    def initialize_meeting(self, purpose: str = "", participants=None, objectives=None) -> int:
+        """
+        Set the meeting's purpose, participants and objectives.
+
+        `objectives` is a {name: description} dict or a list of objective texts (e.g. the
+        Workshop tab's Company.objectives). Their embeddings are computed once, in the
+        background, so the first partial evaluation pays no embedding latency.
+        Returns the number of objectives.
+        """
+        if isinstance(objectives, (list, tuple)):
+            objectives = {o: o for o in objectives if o and o.strip()}
+        objectives = dict(objectives or {})
+        self.meeting = {
+            "purpose": purpose or "",
+            "participants": list(participants or []),
+            "objectives": objectives,
+        }
+        self._objectives = (
+            self._prep_pool.submit(ObjectiveSet, objectives, self.evaluator_backend, self.evaluator_storage)
+            if objectives else None
+        )
+        self.logger.info(
+            f"📋 Meeting initialized | purpose={purpose!r} | participants={len(self.meeting['participants'])} "
+            f"| objectives={len(objectives)}"
+        )
+        return len(objectives)
 
     # ======================================================
     # 🟢 Pipeline Lifecycle Methods
@@ -42,23 +284,51 @@ class MasterController:
 
     def start_all(self):
         """Start all threads in the audio processing pipeline."""
+        if self.is_stopping():
+            self.logger.warning("⚠️ Start requested while the previous run is still draining.")
+            return
         self.logger.info("🚀 Starting all threads...")
         try:
             self.stop_event.clear()
             self.pause_event.set()
 
-            # Instantiate threads
-            self.threads = [
-                RecorderThread(self.record_q, self.stop_event, self.pause_event, self.config_path),
-                ConverterThread(self.record_q, self.convert_q, self.stop_event, self.config_path),
-                TranscriberThread(self.convert_q, self.transcribe_q, self.stop_event, self.config_path, ui_queue= self.ui_queue),
-                SummarizerThread(self.transcribe_q, self.stop_event, self.config_path, ui_queue = self.ui_queue),
-            ]
+            # Fresh stages and queues per run, so nothing left behind by an abandoned drain leaks into the next one
+            engine = get_engine(self.engine_limits) if self.engine_mode == "asyncio" else None
+            uses_processes = any(
+                spec.get("engine") == "process" and spec.get("enabled", True) for spec in self.topology
+            )
+            processes = get_process_pool(self.process_workers) if uses_processes else None
+            self.latency = LatencyTracker()
+            self.journal, resumed = self._open_journal()
+            ctx = StageContext(
+                self.config_path, self.cfg, self.stop_event, self.pause_event, ui_queue=self.ui_queue,
+                objectives=self._objectives, participants=self.meeting["participants"], library=self._library,
+                engine=engine, processes=processes, latency=self.latency, settings=self.settings,
+                session_id=self.session_id, pools=self.pools, journal=self.journal, overrides=self.overrides,
+            )
+            self.threads, self.queues = build_pipeline(self.topology, ctx, self._new_queue)
+
+            # Each stage restores its state from the journal and hands back the work a crash interrupted;
+            # it is queued before any stage runs, so new clips cannot overtake it
+            if resumed is not None:
+                for t in self.threads:
+                    items = t.stage.resume(resumed)
+                    if items:
+                        (t.input_q if t.input_q is not None else t.output_q).prefill(items)
 
             for t in self.threads:
                 t.start()
                 self.logger.info(f"✅ {t.name} started successfully.")
 
+            self.queue_monitor = QueueMonitor(
+                list(self.queues.values()),
+                interval=float(self.queue_cfg.get("monitor_interval", 5)),
+                ui_queue=self.ui_queue,
+            )
+            self.queue_monitor.start()
+            self.latency_monitor = LatencyMonitor(self.latency, interval=self.latency_interval, ui_queue=self.ui_queue)
+            self.latency_monitor.start()
+
         except Exception as e:
             self.logger.error(f"❌ Failed to start threads: {e}", exc_info=True)
             self.stop_all()
@@ -80,49 +350,123 @@ class MasterController:
         self.pause_event.set()
 
     def stop_all(self):
-        """Stop all threads and clean up pipeline."""
+        """
+        Stop recording and return immediately.
+
+        The remaining clips drain through the pipeline on a background thread, bounded by
+        `shutdown.drain_timeout`; the final summary and a "stopped" message follow on ui_queue.
+        """
+        if self.is_stopping():
+            self.logger.warning("⚠️ Stop requested, but the pipeline is already stopping.")
+            return
         self.logger.info("🛑 Stopping all threads...")
         try:
             self.stop_event.set()
             self.pause_event.set()  # unpause in case paused
 
-            # Push None to queues to release waiting threads
-            for q in [self.record_q, self.convert_q, self.transcribe_q]:
-                q.put(None)
+            self._drain_thread = threading.Thread(
+                target=self._drain_and_finalize,
+                args=(list(self.threads), [self.queue_monitor, self.latency_monitor]),
+                daemon=True,
+                name="ShutdownThread",
+            )
+            self._drain_thread.start()
 
-            # Join threads safely
-            for t in self.threads:
-                if t.is_alive():
-                    t.join(timeout=3)
-                    self.logger.info(f"🧵 {t.name} stopped successfully.")
+        except Exception as e:
+            self.logger.error(f"❌ Error during shutdown: {e}", exc_info=True)
 
-            summarizer_thread = next(
-                (t for t in self.threads if isinstance(t, SummarizerThread)), None
-            )
+    def _drain_and_finalize(self, threads, monitors=()):
+        """Let queued work flow through the stages until the deadline, then publish the final summary."""
+        deadline = time.monotonic() + self.drain_timeout
+        # The sink stage that owns the final summary
+        summarizer_thread = next(
+            (t for t in threads if hasattr(t.stage, "publish_final_summary")), None
+        )
+        try:
+            # Recorder flushes its last clip and sends the end-of-stream sentinel downstream
+            for t in threads:
+                if t is summarizer_thread or not t.is_alive():
+                    continue
+                q = t.input_q
+                pending = f" ({q.qsize()} queued)" if q is not None else ""
+                self._notify("status", f"Stopping: finishing {t.name}{pending}…")
+                t.join(timeout=max(0.0, deadline - time.monotonic()))
+                if t.is_alive():
+                    self.logger.warning(f"⚠️ {t.name} did not drain before the deadline; abandoning its backlog.")
+                    break
+                self.logger.info(f"🧵 {t.name} stopped successfully.")
 
             if summarizer_thread:
+                if any(t.is_alive() for t in threads if t is not summarizer_thread):
+                    # Release the summarizer with what it has so far
+                    try:
+                        summarizer_thread.input_q.put(None, timeout=1)
+                    except queue.Full:
+                        pass
+                self._notify("status", "Stopping: generating final summary…")
+                summarizer_thread.join(
+                    timeout=self.final_timeout + max(0.0, deadline - time.monotonic())
+                )
                 if summarizer_thread.is_alive():
-                    time.sleep(2)
-                summarizer_thread.generate_final_summary() 
+                    self.logger.warning("⚠️ Final summary timed out; publishing the rolling summary.")
+                    summarizer_thread.stage.publish_final_summary()
             else:
-                self.logger.warning("No SummarizerThread instance found during shutdown")
-
-            self.threads.clear()
-            self.logger.info("✅ All threads stopped cleanly.")
-                # ✅ Generate final summary once all threads have finished
-            
+                self.logger.warning("No summarizer stage found during shutdown")
+
+            self.logger.info(f"✅ All threads stopped cleanly{self._label()}.")
+            log_usage_report(self.session_id)
+            if self.pools:
+                log_pool_stats(self.pools, self.session_id)
+            for space, stats in get_embedding_cache().memory_report().items():
+                self.logger.info(
+                    f"💾 Embedding cache {space}: {stats['rows']} rows × {stats['dim']} dims, "
+                    f"{stats['bytes'] / 1024:.1f} KiB on disk"
+                )
 
         except Exception as e:
             self.logger.error(f"❌ Error during shutdown: {e}", exc_info=True)
+        finally:
+            # Monitors report their final totals (queue gauges, session latency histograms)
+            for monitor in monitors:
+                if monitor is not None:
+                    monitor.stop()
+                    monitor.join(timeout=1)
+            if self.journal is not None:
+                self.journal.close()
+            self.threads = [t for t in self.threads if t not in threads]
+            self._notify("stopped", "Stopped")
 
     # ======================================================
     # 🔍 Status Helpers
     # ======================================================
 
+    def latency_report(self) -> dict:
+        """p50/p95/p99 per stage, queue wait and end to end for the current (or last) run."""
+        return self.latency.snapshot() if self.latency is not None else {}
+
     def is_running(self) -> bool:
         """Check if any worker thread is currently active."""
         return any(t.is_alive() for t in self.threads)
 
+    def is_stopping(self) -> bool:
+        """Check if a previous run is still draining in the background."""
+        return self._drain_thread is not None and self._drain_thread.is_alive()
+
+    def wait_stopped(self, timeout: float = None) -> bool:
+        """Block until the background drain has finished; returns False on timeout."""
+        if self._drain_thread is not None:
+            self._drain_thread.join(timeout)
+        return not self.is_stopping()
+
+    def capture_stats(self) -> dict:
+        """Capture-process counters (device overflows, ring overruns, dropped samples) of the current run."""
+        recorder = next((t.stage for t in self.threads if hasattr(t.stage, "capture_stats")), None)
+        return recorder.capture_stats() if recorder is not None else {}
+
+    def pool_stats(self) -> dict:
+        """This session's share of the shared pools: counters and p50/p95 wait / run time."""
+        return {name: pool.stats(self.session_id).get(self.session_id, {}) for name, pool in self.pools.items()}
+
     def thread_status(self):
         """Return dictionary of current thread states."""
         status = {t.name: t.is_alive() for t in self.threads}
@@ -138,78 +482,76 @@ class MasterController:
         self.logger.info("🔻 Initiating safe shutdown sequence...")
         try:
             self.stop_all()
+            self.wait_stopped(self.drain_timeout + self.final_timeout)
         except Exception as e:
             self.logger.error(f"Error during safe shutdown: {e}", exc_info=True)
         finally:
-            self.logger.info("🧹 MasterController shutdown complete.")
-
-
-# if __name__ == "__main__":
-#     controller = MasterController("./config.yaml")
-
-#     controller.start_all()
-#     time.sleep(300)
-
-#     controller.pause_all()
-#     time.sleep(3)
-
-#     controller.resume_all()
-#     time.sleep(20)
+            self.close()
+            self.logger.info(f"🧹 MasterController shutdown complete{self._label()}.")
 
-#     controller.stop_all()
+    def close(self):
+        """Release what the session holds outside its own threads (config subscriptions, prep pool)."""
+        for section, callback in self._subscriptions:
+            self.settings.unsubscribe(section, callback)
+        self._subscriptions = []
+        self._prep_pool.shutdown(wait=False)
+        for pool in self.pools.values():
+            pool.forget(self.session_id)
 
-    # if __name__ == "__main__":
-    #     import sys
 
+class SessionManager:
+    """
+    Several meeting sessions (rooms) in one process.
 
-    #     controller = MasterController("./config.yaml")
-
-    #     print("\n🎙️ Voice Recording Controller (Interactive Mode)")
-    #     print("--------------------------------------------------")
-    #     print("Commands:")
-    #     print("  ▶️  start  → Start recording")
-    #     print("  ⏸️  pause  → Pause recording")
-    #     print("  🔁  resume  → Resume recording")
-    #     print("  🛑  stop  → Stop and exit")
-    #     print("--------------------------------------------------\n")
-
-    #     running = True
-    #     while running:
-    #         try:
-    #             cmd = input("Enter command (s/p/r/x): ").strip().lower()
-
-    #             if cmd == "start":
-    #                 controller.start_all()
-    #                 print("✅ Recording started.")
-
-    #             elif cmd == "pause":
-    #                 controller.pause_all()
-    #                 print("⏸️ Recording paused.")
-
-    #             elif cmd == "resume":
-    #                 controller.resume_all()
-    #                 print("▶️ Recording resumed.")
-
-    #             elif cmd == "stop":
-    #                 print("🛑 Stopping all threads...")
-    #                 controller.stop_all()
-    #                 print("✅ All threads stopped cleanly.")
-    #                 running = False
-
-    #             elif cmd == "":
-    #                 continue  # Ignore blank input
-
-    #             else:
-    #                 print("⚠️ Invalid command. Use s/p/r/x.")
-
-    #         except KeyboardInterrupt:
-    #             print("\n🧹 Keyboard interrupt received. Stopping safely...")
-    #             controller.stop_all()
-    #             running = False
-    #         except Exception as e:
-    #             print(f"❌ Error: {e}")
-    #             controller.stop_all()
-    #             running = False
-
-    #     print("👋 Exiting gracefully.")
+    Every session is a MasterController with isolated stages, queues and state; STT and LLM
+    calls of all sessions go through two bounded FairPools (`sessions:` in config.yaml) that
+    serve the sessions round-robin, so one busy room cannot starve the others.
+    """
 
+    def __init__(self, config_path: str = "./config.yaml"):
+        self.config_path = config_path
+        self.logger = get_logger(config_path)
+        cfg = get_config_service(config_path).section("sessions")
+        self.pools = {
+            "stt": FairPool("stt", cfg["stt_workers"], cfg["max_share"]),
+            "llm": FairPool("llm", cfg["llm_workers"], cfg["max_share"]),
+        }
+        self.sessions = {}
+        self._lock = threading.Lock()
+
+    def create_session(self, session_id: str, ui_queue=None, overrides: dict = None) -> MasterController:
+        """Add a session; `overrides` patch config sections for it (e.g. its microphone)."""
+        with self._lock:
+            if session_id in self.sessions:
+                raise ValueError(f"Session {session_id!r} already exists")
+            controller = MasterController(
+                self.config_path, ui_queue=ui_queue, session_id=session_id, pools=self.pools, overrides=overrides
+            )
+            self.sessions[session_id] = controller
+        self.logger.info(f"🏠 Session {session_id} created ({len(self.sessions)} active).")
+        return controller
+
+    def get(self, session_id: str) -> MasterController:
+        return self.sessions[session_id]
+
+    def close_session(self, session_id: str):
+        """Stop the session (draining it as usual) and release it."""
+        with self._lock:
+            controller = self.sessions.pop(session_id)
+        if controller.is_running() or controller.is_stopping():
+            controller.safe_shutdown()
+        else:
+            controller.close()
+        self.logger.info(f"🏠 Session {session_id} closed ({len(self.sessions)} active).")
+
+    def pool_stats(self) -> dict:
+        """{pool: {session: stats}} across all sessions."""
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+    def shutdown(self):
+        """Close every session, then the shared pools."""
+        for session_id in list(self.sessions):
+            self.close_session(session_id)
+        log_pool_stats(self.pools)
+        for pool in self.pools.values():
+            pool.shutdown(wait=False)
@@ -0,0 +1,167 @@
+"""
+UI frame time and capture overflows with the CPU-bound stages on threads vs. worker processes.
+
+Replays synthetic clips through the real VAD and converter stages (`engine: threads` and
+`engine: process`) faster than real time, while the main thread runs a 60 fps loop standing
+in for the Qt event loop and a capture thread reads the "microphone" at its real cadence.
+A read that comes later than the device buffer can hold is counted as an overflow (what
+PyAudio hides with `exception_on_overflow=False`).
+
+Usage:
+    python benchmarks/bench_cpu_stages.py [--clips 200] [--clip-seconds 5] [--speed 20]
+                                          [--processes 2] [--concurrency 2] [--out report.json]
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import argparse
+import tempfile
+import threading
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+# Worker processes re-import this script: the pipeline modules are imported inside run()
+
+RATE = 16000
+FRAME_BUDGET = 1 / 60
+
+
+def percentiles_ms(values):
+    values = np.asarray(values) * 1000
+    if not len(values):
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"p50_ms": round(p50, 2), "p95_ms": round(p95, 2), "p99_ms": round(p99, 2), "max_ms": round(values.max(), 2)}
+
+
+def synthetic_clips(n, seconds, seed=0):
+    """Noise floor with voiced bursts, as 16-bit PCM bytes."""
+    rng = np.random.default_rng(seed)
+    clips = []
+    for i in range(n):
+        samples = rng.normal(0, 60, int(RATE * seconds))
+        t = np.arange(len(samples)) / RATE
+        voiced = (np.sin(2 * np.pi * 0.7 * t + i) > 0.2) * 6000 * np.sin(2 * np.pi * 180 * t)
+        clips.append((samples + voiced).clip(-32768, 32767).astype(np.int16).tobytes())
+    return clips
+
+
+def capture_loop(stop, chunk, buffer_chunks, out):
+    """Read `chunk` frames per period; a gap longer than the device buffer is an overflow."""
+    period = chunk / RATE
+    capacity = period * buffer_chunks
+    frames, last, lateness = [], time.perf_counter(), []
+    overflows, lost = 0, 0.0
+    while not stop.is_set():
+        time.sleep(period)
+        now = time.perf_counter()
+        gap = now - last
+        last = now
+        lateness.append(max(0.0, gap - period))
+        if gap > capacity:
+            overflows += 1
+            lost += gap - capacity
+        frames.append(b"\0" * (chunk * 2))  # what the recorder does with each read
+        if len(frames) * chunk >= RATE * 5:
+            b"".join(frames)
+            frames = []
+    out.update(reads=len(lateness), overflows=overflows, lost_seconds=round(lost, 3),
+               lateness=percentiles_ms(lateness))
+
+
+def run(mode, clips, args):
+    """One replay; returns frame-time, capture and throughput figures."""
+    from utils.stages import StageContext, StageRunner
+    from utils.vad import VadStage
+    from utils.pipeline import ConverterStage
+    from utils.process_pool import get_process_pool
+
+    processes = get_process_pool(args.processes) if mode == "process" else None
+    config = {"audio": {"rate": RATE, "output_dir": tempfile.mkdtemp(prefix="bench_cpu_")}}
+    ctx = StageContext(os.path.join(ROOT, "config.yaml"), config, threading.Event(), threading.Event(),
+                       processes=processes)
+    record_q, voiced_q, convert_q = queue.Queue(maxsize=8), queue.Queue(maxsize=8), queue.Queue()
+    vad, converter = VadStage(ctx, threshold_db=-45.0), ConverterStage(ctx)
+    vad.name, converter.name = "vad", "converter"
+    runners = [
+        StageRunner(vad, record_q, voiced_q, args.concurrency, processes=processes),
+        StageRunner(converter, voiced_q, convert_q, args.concurrency, processes=processes),
+    ]
+    for r in runners:
+        r.start()
+
+    stop, capture = threading.Event(), {}
+    capture_thread = threading.Thread(target=capture_loop, args=(stop, args.chunk, args.buffer_chunks, capture))
+    capture_thread.start()
+
+    def feed():
+        interval = args.clip_seconds / args.speed if args.speed > 0 else 0.0
+        for i, pcm in enumerate(clips):
+            record_q.put({"pcm": pcm, "seq": i + 1, "offset": i * args.clip_seconds, "captured_at": time.time()})
+            time.sleep(interval)
+        record_q.put(None)
+
+    started = time.perf_counter()
+    feeder = threading.Thread(target=feed, daemon=True)
+    feeder.start()
+
+    # The "Qt" loop: tick every 16.7 ms, do a little Python work, measure the frame interval
+    frames = []
+    janky, last = 0, time.perf_counter()
+    while any(r.is_alive() for r in runners):
+        time.sleep(max(0.0, last + FRAME_BUDGET - time.perf_counter()))
+        rows = [{"type": "transcript", "content": f"row {i}"} for i in range(50)]
+        json.dumps(rows)
+        now = time.perf_counter()
+        frames.append(now - last)
+        janky += int(now - last > 2 * FRAME_BUDGET)
+        last = now
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    capture_thread.join()
+    converted = 0
+    while convert_q.get() is not None:
+        converted += 1
+    shutil.rmtree(config["audio"]["output_dir"], ignore_errors=True)
+    return {
+        "frames": {"count": len(frames), **percentiles_ms(frames), "janky": janky},
+        "capture": capture,
+        "pipeline": {"clips": len(clips), "converted": converted, "seconds": round(elapsed, 2),
+                     "audio_seconds_per_second": round(len(clips) * args.clip_seconds / elapsed, 1),
+                     "stages": {r.name: r.stats() for r in runners}},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clips", type=int, default=200)
+    parser.add_argument("--clip-seconds", type=float, default=5.0)
+    parser.add_argument("--speed", type=float, default=20.0, help="replay speed vs. real time (0 = as fast as the stages take clips)")
+    parser.add_argument("--concurrency", type=int, default=2, help="workers per stage")
+    parser.add_argument("--processes", type=int, default=2, help="worker processes in process mode")
+    parser.add_argument("--chunk", type=int, default=1024, help="frames per capture read")
+    parser.add_argument("--buffer-chunks", type=int, default=4, help="device buffer, in reads")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    clips = synthetic_clips(args.clips, args.clip_seconds)
+    report = {
+        "config": vars(args),
+        "threads": run("threads", clips, args),
+        "process": run("process", clips, args),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
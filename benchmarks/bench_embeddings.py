@@ -0,0 +1,137 @@
+"""
+Compare the offline hashed TF-IDF evaluator backend against OpenAI embeddings.
+
+For each recorded session (JSON: {"objectives": [...], "summaries": [...]}) every partial
+summary is scored against every objective with both backends; the report gives ranking
+agreement (Spearman rho, top-1 match, top-3 overlap) and per-evaluation latency as JSON.
+
+Usage:
+    python benchmarks/bench_embeddings.py [session.json ...] [--out report.json]
+
+Without session files, the sample workshop objectives and a few synthetic summaries are used.
+Without OPENAI_API_KEY only the local backend is timed.
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from utils.local_embeddings import HashingTfidfEmbedder  # noqa: E402
+
+SAMPLE_SUMMARIES = [
+    "Speaker 1 proposed automation, the data platform and the QMS rollout as the top priorities for the next 18 months.",
+    "Speaker 2 described batch release delays in manufacturing and long handoffs between R&D and quality as the main bottlenecks.",
+    "The group discussed tracking cycle time and audit findings as shared metrics for innovation and compliance readiness.",
+    "Speaker 3 suggested a weekly leadership sync with a single decision log to speed up approvals.",
+    "Speaker 1 and Speaker 4 talked about making teams accountable for data quality and changing the culture around dashboards.",
+]
+
+
+def load_sessions(paths):
+    if not paths:
+        with open(os.path.join(ROOT, "workshop", "config", "sample_page1_data.json"), "r") as f:
+            objectives = json.load(f)["company"]["objectives"]
+        return [{"name": "sample", "objectives": objectives, "summaries": SAMPLE_SUMMARIES}]
+    sessions = []
+    for path in paths:
+        with open(path, "r") as f:
+            data = json.load(f)
+        sessions.append({
+            "name": os.path.basename(path),
+            "objectives": list(data["objectives"]),
+            "summaries": [s for s in data["summaries"] if s.strip()],
+        })
+    return sessions
+
+
+def spearman(a, b):
+    """Spearman rank correlation (no tie correction; scores are continuous)."""
+    ra, rb = np.argsort(np.argsort(a)), np.argsort(np.argsort(b))
+    if len(a) < 2 or ra.std() == 0 or rb.std() == 0:
+        return float("nan")
+    return float(np.corrcoef(ra, rb)[0, 1])
+
+
+def score_local(objectives, summaries):
+    embedder = HashingTfidfEmbedder()
+    embedder.fit_partial(objectives)
+    scores, latencies = [], []
+    for summary in summaries:
+        start = time.perf_counter()
+        seg = embedder.embed([summary])
+        obj = embedder.transform(objectives)
+        scores.append((obj @ seg.T).toarray()[:, 0])
+        latencies.append(time.perf_counter() - start)
+    return np.array(scores), latencies
+
+
+def score_openai(objectives, summaries):
+    from utils.evaluator import embed_texts, normalize_rows
+
+    obj = normalize_rows(embed_texts(objectives))
+    scores, latencies = [], []
+    for summary in summaries:
+        start = time.perf_counter()
+        seg = normalize_rows(embed_texts([summary], use_cache=False))
+        scores.append((obj @ seg.T)[:, 0])
+        latencies.append(time.perf_counter() - start)
+    return np.array(scores), latencies
+
+
+def latency_stats(latencies):
+    ms = np.array(latencies) * 1000.0
+    return {"mean_ms": round(float(ms.mean()), 3), "p50_ms": round(float(np.percentile(ms, 50)), 3),
+            "p95_ms": round(float(np.percentile(ms, 95)), 3)}
+
+
+def compare(local, remote):
+    rhos, top1, top3 = [], [], []
+    for a, b in zip(local, remote):
+        rhos.append(spearman(a, b))
+        top1.append(int(np.argmax(a) == np.argmax(b)))
+        k = min(3, len(a))
+        top3.append(len(set(np.argsort(-a)[:k]) & set(np.argsort(-b)[:k])) / k)
+    return {
+        "spearman_rho": round(float(np.nanmean(rhos)), 3),
+        "top1_agreement": round(float(np.mean(top1)), 3),
+        "top3_overlap": round(float(np.mean(top3)), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sessions", nargs="*", help="session JSON files with objectives and summaries")
+    parser.add_argument("--out", help="write the JSON report here as well")
+    args = parser.parse_args()
+
+    use_openai = bool(os.getenv("OPENAI_API_KEY"))
+    report = {"openai": use_openai, "sessions": []}
+    for session in load_sessions(args.sessions):
+        local, local_lat = score_local(session["objectives"], session["summaries"])
+        entry = {
+            "name": session["name"],
+            "objectives": len(session["objectives"]),
+            "summaries": len(session["summaries"]),
+            "local": latency_stats(local_lat),
+        }
+        if use_openai:
+            remote, remote_lat = score_openai(session["objectives"], session["summaries"])
+            entry["openai"] = latency_stats(remote_lat)
+            entry["agreement"] = compare(local, remote)
+        report["sessions"].append(entry)
+
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Memory and latency of scoring against float32 vs. int8 (Int8Matrix) embedding matrices.
+
+Builds a random row-normalized matrix the size of a large objective/topic library and
+scores batches of queries against it both ways. Reports storage, the peak memory the
+product allocates on top of the stored matrix (tracemalloc), latency and the largest
+score error int8 introduces, as JSON.
+
+Usage:
+    python benchmarks/bench_int8_scoring.py [--rows 50000] [--dims 1024] [--queries 8] [--repeat 20]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+import numpy as np
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+
+from utils.evaluator import Int8Matrix, normalize_rows  # noqa: E402
+
+
+def measure(matrix, queries, repeat):
+    tracemalloc.start()
+    scores = matrix @ queries.T
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        matrix @ queries.T
+    elapsed = (time.perf_counter() - started) / repeat
+    return scores, {
+        "storage_mib": round(matrix.nbytes / 2 ** 20, 2),
+        "product_peak_mib": round(peak / 2 ** 20, 2),  # output plus temporaries
+        "latency_ms": round(elapsed * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--dims", type=int, default=1024)
+    parser.add_argument("--queries", type=int, default=8)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    dense = normalize_rows(rng.normal(size=(args.rows, args.dims)))
+    queries = normalize_rows(rng.normal(size=(args.queries, args.dims)))
+    exact, float32 = measure(dense, queries, args.repeat)
+    approx, int8 = measure(Int8Matrix.quantize(dense), queries, args.repeat)
+    report = {
+        "config": vars(args),
+        "float32": float32,
+        "int8": int8,
+        "max_abs_score_error": round(float(np.abs(exact - approx).max()), 5),
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+"""
+End-to-end pipeline benchmark: MasterController against local fake STT / OpenAI servers.
+
+A ReplayStage takes the recorder's place and feeds synthetic speech-like audio (or a WAV
+file) through the configured stages, queues and summarizer; every network call goes to
+`fake_backends.py` with fixed latency and seeded jitter, so two runs of the same commit
+see the same work and the same delays. The run is stopped only once the pipeline has
+settled (queues empty, no partial summary pending), so summaries and objective evaluation
+are part of what is measured. Reports, as JSON on stdout (the app's own output goes to stderr):
+    throughput    audio seconds processed per wall second (until the final summary is out)
+    latency       per stage, queue wait and end to end (the app's own LatencyTracker)
+    stages        items, errors and utilization per stage
+    resources     peak RSS, CPU seconds and CPU % of this process (and its worker processes)
+    backends      calls and injected delay per fake service
+With --baseline, the run is compared with an earlier report and the script exits with
+status 1 when throughput, p95 end-to-end latency, peak RSS or CPU regress past --tolerance.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--seconds 300] [--wav meeting.wav] [--speed 0]
+                                        [--clip-seconds 5] [--engine threads|asyncio]
+                                        [--stt-latency 0.6] [--llm-latency 0.5] ...
+                                        [--out report.json] [--baseline old.json] [--tolerance 0.15]
+"""
+
+import os
+import sys
+import json
+import time
+import queue
+import shutil
+import platform
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+import urllib.request
+
+from fake_backends import add_arguments
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, ROOT)
+# The app's modules build their API clients at import: they are imported in run(), after
+# the base URLs point at the fake backends
+
+
+def start_backends(args):
+    """Run fake_backends.py in its own process (its CPU stays out of ours); returns (process, url)."""
+    command = [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_backends.py")]
+    for name in ("stt_latency", "stt_per_audio_second", "stt_jitter", "llm_latency", "llm_jitter",
+                 "token_seconds", "embed_latency", "embed_jitter", "seed"):
+        command += [f"--{name.replace('_', '-')}", str(getattr(args, name))]
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, stdin=subprocess.DEVNULL, text=True)
+    port = int(process.stdout.readline())
+    return process, f"http://127.0.0.1:{port}"
+
+
+class ResourceSampler(threading.Thread):
+    """Samples this process's RSS (VmRSS) and CPU time while the pipeline runs."""
+
+    def __init__(self, interval: float = 0.25):
+        super().__init__(daemon=True, name="ResourceSampler")
+        self.interval = interval
+        self.peak_rss = self.start_rss = self._rss()
+        self._stopped = threading.Event()
+
+    @staticmethod
+    def _rss() -> int:
+        try:
+            with open("/proc/self/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024  # peak so far, not current
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, self._rss())
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+        self.peak_rss = max(self.peak_rss, self._rss())
+
+
+def cpu_seconds(who) -> float:
+    usage = resource.getrusage(who)
+    return usage.ru_utime + usage.ru_stime
+
+
+def wait_settled(controller, runners, settle: float, deadline: float) -> bool:
+    """
+    Wait until every queue is empty, the summarizer has no partial due (whenever its spacing
+    allows) and no stage finished an item for `settle` seconds. False on the deadline.
+    """
+    summarizer = next((r.stage for r in runners if hasattr(r.stage, "scheduler")), None)
+    last, quiet_since = None, time.monotonic()
+    while time.monotonic() < deadline and controller.is_running():
+        busy = any(q.qsize() for q in controller.queues.values())
+        busy = busy or (summarizer is not None and summarizer.scheduler.is_due(now=float("inf")))
+        progress = tuple(r.items for r in runners) + (summarizer.messages_received if summarizer else 0,)
+        if busy or progress != last:
+            last, quiet_since = progress, time.monotonic()
+        elif time.monotonic() - quiet_since >= settle:
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def overrides_for(args, settings, workdir):
+    """Config overrides: the replay source, throwaway directories, no drain deadline."""
+    from audioMaster import DEFAULT_TOPOLOGY
+
+    stages = [dict(s) for s in (settings.section("pipeline").get("stages") or DEFAULT_TOPOLOGY)]
+    source = next(s for s in stages if not s.get("input"))
+    output = source.get("output", "record")
+    source.clear()
+    source.update({
+        "name": "recorder", "class": "utils.pipeline.ReplayStage", "output": output,
+        "path": args.wav, "seconds": args.seconds, "speed": args.speed, "seed": args.seed,
+    })
+    pipeline = {"stages": stages}
+    if args.engine:
+        pipeline["engine"] = args.engine
+    return {
+        "pipeline": pipeline,
+        "audio": {"duration": args.clip_seconds, "output_dir": os.path.join(workdir, "audio")},
+        "queues": {"spill_dir": os.path.join(workdir, "spill")},
+        "journal": {"dir": os.path.join(workdir, "sessions"), "resume": False},
+        "evaluator": {"cache_dir": os.path.join(workdir, "embeddings")},
+        "shutdown": {"drain_timeout": args.timeout, "final_timeout": args.timeout},
+    }
+
+
+def run(args, backend_url):
+    os.environ["OPENAI_BASE_URL"] = backend_url + "/v1"
+    os.environ["ELEVENLABS_BASE_URL"] = backend_url
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("ELEVENLABS_API_KEY", "bench")
+
+    from audioMaster import MasterController
+    from utils.config_service import get_config_service
+    import utils.process_pool as process_pool
+
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    settings = get_config_service(args.config)
+    ui_queue = queue.Queue()
+    controller = MasterController(args.config, ui_queue=ui_queue, session_id="bench",
+                                  overrides=overrides_for(args, settings, workdir))
+    controller.initialize_meeting(
+        purpose="Quarterly planning",
+        participants=["Speaker 1", "Speaker 2"],
+        objectives=["Agree on the launch timeline", "Review the budget risks", "Assign owners for hiring"],
+    )
+
+    messages, first_transcript = {}, [None]
+
+    def drain_ui():
+        while True:
+            msg = ui_queue.get()
+            if msg is None:
+                return
+            messages[msg["type"]] = messages.get(msg["type"], 0) + 1
+            if msg["type"] == "transcript" and first_transcript[0] is None:
+                first_transcript[0] = time.perf_counter()
+
+    ui_thread = threading.Thread(target=drain_ui, daemon=True, name="BenchUI")
+    ui_thread.start()
+
+    sampler = ResourceSampler()
+    sampler.start()
+    cpu_before = cpu_seconds(resource.RUSAGE_SELF)
+    started = time.perf_counter()
+    controller.start_all()
+    runners = list(controller.threads)
+    source = next(r.stage for r in runners if hasattr(r.stage, "finished"))
+    deadline = time.monotonic() + args.timeout
+    while not source.finished.wait(0.5):
+        if time.monotonic() > deadline or not controller.is_running():
+            break
+    ingested = time.perf_counter()
+    # Stopping ends partial summaries: let the transcripts, partials and evaluations catch up first
+    settled = wait_settled(controller, runners, args.settle, deadline)
+    controller.stop_all()
+    drained = controller.wait_stopped(args.timeout)
+    elapsed = time.perf_counter() - started
+    cpu = cpu_seconds(resource.RUSAGE_SELF) - cpu_before
+    sampler.stop()
+
+    latency = controller.latency_report()
+    stages = {r.name: r.stats() for r in runners}
+    controller.close()
+    if process_pool._pool is not None:
+        process_pool._pool.shutdown()  # its workers' CPU shows up in RUSAGE_CHILDREN once reaped
+    children_cpu = cpu_seconds(resource.RUSAGE_CHILDREN)  # before the fake backends are reaped
+    ui_queue.put(None)
+    ui_thread.join()
+    shutil.rmtree(workdir, ignore_errors=True)
+
+    audio_seconds = source.offset
+    return {
+        "drained": drained,
+        "settled": settled,
+        "throughput": {
+            "audio_seconds": round(audio_seconds, 1),
+            "wall_seconds": round(elapsed, 2),
+            "audio_seconds_per_second": round(audio_seconds / elapsed, 2) if elapsed else 0.0,
+            "ingest_seconds": round(ingested - started, 2),
+            "drain_seconds": round(elapsed - (ingested - started), 2),
+            "first_transcript_seconds": round(first_transcript[0] - started, 2) if first_transcript[0] else None,
+        },
+        "latency": latency,
+        "stages": stages,
+        "ui_messages": messages,
+        "resources": {
+            "start_rss_mb": round(sampler.start_rss / 2 ** 20, 1),
+            "peak_rss_mb": round(sampler.peak_rss / 2 ** 20, 1),
+            "cpu_seconds": round(cpu, 2),
+            "cpu_percent": round(100 * cpu / elapsed, 1) if elapsed else 0.0,
+            "children_cpu_seconds": round(children_cpu, 2),
+        },
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# (path into the report, higher is better)
+COMPARED = [
+    (("result", "throughput", "audio_seconds_per_second"), True),
+    (("result", "latency", "end_to_end", "p95"), False),
+    (("result", "resources", "peak_rss_mb"), False),
+    (("result", "resources", "cpu_seconds"), False),
+]
+
+
+def compare(report, baseline, tolerance):
+    """Relative change of the compared metrics; a change worse than `tolerance` is a regression."""
+    changes, regressions = {}, []
+    for path, higher_is_better in COMPARED:
+        new, old = report, baseline
+        for key in path:
+            new = new.get(key) if isinstance(new, dict) else None
+            old = old.get(key) if isinstance(old, dict) else None
+        if not isinstance(new, (int, float)) or not isinstance(old, (int, float)) or not old:
+            continue
+        change = (new - old) / old
+        name = ".".join(path[1:])
+        changes[name] = {"baseline": old, "current": new, "change": round(change, 3)}
+        if (-change if higher_is_better else change) > tolerance:
+            regressions.append(name)
+    return {"baseline_commit": baseline.get("commit"), "tolerance": tolerance,
+            "metrics": changes, "regressions": regressions}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--config", default=os.path.join(ROOT, "config.yaml"))
+    parser.add_argument("--seconds", type=float, default=300.0, help="synthetic meeting length")
+    parser.add_argument("--wav", help="replay this 16-bit mono WAV (at audio.rate) instead")
+    parser.add_argument("--speed", type=float, default=0.0, help="replay speed vs. real time (0 = as fast as the record queue takes clips)")
+    parser.add_argument("--clip-seconds", type=float, default=5.0, help="audio.duration")
+    parser.add_argument("--engine", choices=("threads", "asyncio"), help="pipeline.engine (default: config.yaml)")
+    parser.add_argument("--timeout", type=float, default=1800.0, help="give up on the run after this long")
+    parser.add_argument("--settle", type=float, default=3.0, help="quiet seconds that count as caught up before Stop")
+    add_arguments(parser)
+    parser.add_argument("--out", help="write the JSON report here")
+    parser.add_argument("--baseline", help="an earlier report to compare with")
+    parser.add_argument("--tolerance", type=float, default=0.15, help="allowed relative regression")
+    args = parser.parse_args()
+
+    # Only the report goes to stdout: prints and logs of the app (and its worker processes) go to stderr
+    report_out = os.fdopen(os.dup(sys.stdout.fileno()), "w")
+    sys.stdout.flush()
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    backends, url = start_backends(args)
+    try:
+        result = run(args, url)
+        with urllib.request.urlopen(url + "/stats") as response:
+            result["backends"] = json.load(response)
+    finally:
+        backends.terminate()
+        backends.wait()
+
+    report = {
+        "commit": git_commit(),
+        "started_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "result": result,
+    }
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(report, json.load(f), args.tolerance)
+        status = 1 if report["comparison"]["regressions"] else 0
+    text = json.dumps(report, indent=2)
+    print(text, file=report_out, flush=True)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
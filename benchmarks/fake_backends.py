@@ -0,0 +1,227 @@
+"""
+Local stand-ins for the ElevenLabs speech-to-text and OpenAI chat / embeddings APIs.
+
+Answers have the shape the SDKs expect and are deterministic: the transcript, summaries,
+tone and embedding vectors depend only on the request. Each call waits a configurable
+latency with jitter; the jitter is drawn from a hash of the request body, so the same
+run sees the same delays whatever order the calls arrive in.
+
+Point the app at it with
+    OPENAI_BASE_URL=http://127.0.0.1:<port>/v1  ELEVENLABS_BASE_URL=http://127.0.0.1:<port>
+
+Usage:
+    python benchmarks/fake_backends.py [--port 0] [--stt-latency 0.6] [--stt-jitter 0.2] ...
+The first line on stdout is the bound port. GET /stats returns the call counters.
+"""
+
+import io
+import sys
+import json
+import time
+import wave
+import base64
+import hashlib
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+WORDS = (
+    "budget roadmap launch customer hiring timeline risk review metrics quarter design "
+    "feedback release testing migration pricing contract vendor onboarding support"
+).split()
+
+
+def _unit(*parts) -> float:
+    """A number in [0, 1) fixed by `parts`."""
+    digest = hashlib.sha256(b"|".join(p if isinstance(p, bytes) else str(p).encode() for p in parts)).digest()
+    return int.from_bytes(digest[:8], "big") / 2 ** 64
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class Backend:
+    """Latency model and response bodies; shared by all handler threads."""
+
+    def __init__(self, args):
+        self.args = args
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def delay(self, service: str, body: bytes, extra: float = 0.0) -> float:
+        latency = getattr(self.args, f"{service}_latency")
+        jitter = getattr(self.args, f"{service}_jitter")
+        seconds = max(0.0, latency + extra + jitter * (2 * _unit(self.args.seed, service, body) - 1))
+        with self.lock:
+            c = self.calls.setdefault(service, {"count": 0, "delay_seconds": 0.0})
+            c["count"] += 1
+            c["delay_seconds"] = round(c["delay_seconds"] + seconds, 3)
+        return seconds
+
+    # --- ElevenLabs ---
+    def transcription(self, body: bytes) -> dict:
+        """Words for the WAV inside the multipart body: ~2.5 words/s, two speakers taking turns."""
+        riff = body.find(b"RIFF")
+        seconds = 0.0
+        if riff >= 0:
+            with wave.open(io.BytesIO(body[riff:]), "rb") as wf:
+                seconds = wf.getnframes() / wf.getframerate()
+        digest = hashlib.sha256(body[riff:] if riff >= 0 else body).digest()
+        n_words = int(seconds * 2.5)
+        words, step = [], seconds / max(1, n_words)
+        for i in range(n_words):
+            text = WORDS[(digest[i % len(digest)] + i) % len(WORDS)]
+            speaker = f"speaker_{(i // 6 + digest[0]) % 2}"
+            start = round(i * step, 3)
+            if i:
+                words.append({"text": " ", "type": "spacing", "start": start, "end": start, "speaker_id": speaker})
+            words.append({"text": text, "type": "word", "start": start, "end": round(start + step * 0.8, 3),
+                          "speaker_id": speaker, "logprob": -0.1})
+        return {
+            "language_code": "eng", "language_probability": 0.99,
+            "text": " ".join(w["text"] for w in words if w["type"] == "word"), "words": words,
+        }, seconds
+
+    # --- OpenAI ---
+    def completion_text(self, request: dict) -> str:
+        prompt = "\n".join(str(m.get("content", "")) for m in request.get("messages", []))
+        if "emotional tone" in prompt:
+            u = _unit(prompt)
+            sentiment = ("Positive", "Neutral", "Negative")[int(u * 3)]
+            return json.dumps({"sentiment": sentiment, "aggression_score": round(u / 2, 2)})
+        picks = [WORDS[int(_unit(prompt, i) * len(WORDS))] for i in range(12)]
+        return (
+            f"1. **Agenda**\n- {picks[0]} and {picks[1]}\n"
+            f"2. **Participants**\n- Speaker 1, Speaker 2\n"
+            f"3. **Key Takeaways**\n- Agreed on the {picks[2]} {picks[3]}.\n- The {picks[4]} {picks[5]} needs work.\n"
+            f"4. **Follow Up**\n- Revisit the {picks[6]} {picks[7]} next week.\n"
+            f"5. **Action Points**\n- Speaker 1 owns the {picks[8]} {picks[9]}.\n"
+            f"- Speaker 2 drafts the {picks[10]} {picks[11]}."
+        )
+
+    def embeddings(self, request: dict) -> dict:
+        inputs = request.get("input", [])
+        inputs = [inputs] if isinstance(inputs, str) else inputs
+        dims = int(request.get("dimensions") or 1536)
+        data = []
+        for i, text in enumerate(inputs):
+            seed = int.from_bytes(hashlib.sha256(str(text).encode()).digest()[:8], "big")
+            vec = np.random.default_rng(seed).normal(size=dims).astype(np.float32)
+            vec /= np.linalg.norm(vec)
+            embedding = (base64.b64encode(vec.tobytes()).decode() if request.get("encoding_format") == "base64"
+                         else vec.tolist())
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+        tokens = sum(_tokens(str(t)) for t in inputs)
+        return {"object": "list", "data": data, "model": request.get("model"),
+                "usage": {"prompt_tokens": tokens, "total_tokens": tokens}}
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, as the SDKs' connection pools expect
+    backend: Backend = None
+
+    def log_message(self, *args):
+        pass
+
+    def _body(self) -> bytes:
+        return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+    def _json(self, payload: dict, status: int = 200):
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _chunk(self, data: bytes):
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.rstrip("/") == "/stats":
+            with self.backend.lock:
+                return self._json(dict(self.backend.calls))
+        self._json({"error": "not found"}, 404)
+
+    def do_POST(self):
+        body = self._body()
+        path = self.path.split("?")[0].rstrip("/")
+        backend, args = self.backend, self.backend.args
+        if path.endswith("/speech-to-text"):
+            payload, seconds = backend.transcription(body)
+            time.sleep(backend.delay("stt", body, extra=args.stt_per_audio_second * seconds))
+            return self._json(payload)
+        if path.endswith("/embeddings"):
+            request = json.loads(body)
+            time.sleep(backend.delay("embed", body))
+            return self._json(backend.embeddings(request))
+        if path.endswith("/chat/completions"):
+            request = json.loads(body)
+            text = backend.completion_text(request)
+            prompt_tokens = sum(_tokens(str(m.get("content", ""))) for m in request.get("messages", []))
+            usage = {"prompt_tokens": prompt_tokens, "completion_tokens": _tokens(text),
+                     "total_tokens": prompt_tokens + _tokens(text)}
+            base = {"id": "chatcmpl-bench", "created": int(time.time()), "model": request.get("model")}
+            time.sleep(backend.delay("llm", body))  # time to first token
+            if not request.get("stream"):
+                return self._json({**base, "object": "chat.completion", "usage": usage, "choices": [
+                    {"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}]})
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Transfer-Encoding", "chunked")
+            self.end_headers()
+            pieces = text.split(" ")
+            for i, piece in enumerate(pieces):
+                delta = {"content": piece + (" " if i < len(pieces) - 1 else "")}
+                chunk = {**base, "object": "chat.completion.chunk",
+                         "choices": [{"index": 0, "delta": delta, "finish_reason": None}]}
+                self._chunk(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+                time.sleep(args.token_seconds)
+            if (request.get("stream_options") or {}).get("include_usage"):
+                chunk = {**base, "object": "chat.completion.chunk", "choices": [], "usage": usage}
+                self._chunk(b"data: " + json.dumps(chunk).encode() + b"\n\n")
+            self._chunk(b"data: [DONE]\n\n")
+            self._chunk(b"")
+            return
+        self._json({"error": f"no fake for {self.path}"}, 404)
+
+
+def add_arguments(parser):
+    """Latency options, shared with the benchmark that starts this server."""
+    parser.add_argument("--stt-latency", type=float, default=0.6, help="seconds per STT call")
+    parser.add_argument("--stt-per-audio-second", type=float, default=0.02, help="extra STT seconds per audio second")
+    parser.add_argument("--stt-jitter", type=float, default=0.2, help="± seconds, uniform")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="seconds to the first token")
+    parser.add_argument("--llm-jitter", type=float, default=0.2)
+    parser.add_argument("--token-seconds", type=float, default=0.005, help="between streamed tokens")
+    parser.add_argument("--embed-latency", type=float, default=0.15)
+    parser.add_argument("--embed-jitter", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+
+
+def serve(args, port: int = 0) -> ThreadingHTTPServer:
+    handler = type("BoundHandler", (Handler,), {"backend": Backend(args)})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=0)
+    add_arguments(parser)
+    args = parser.parse_args()
+    server = serve(args, args.port)
+    print(server.server_address[1], flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,4 +1,5 @@
 import sys
+import time
 import logging
 from random import randint, choice, uniform
 
@@ -6,7 +7,7 @@ from PyQt6.QtWidgets import (
     QApplication, QCheckBox, QAbstractScrollArea, QComboBox, QDialog, QFrame, QGridLayout, QGroupBox, QHBoxLayout, QHeaderView, QLabel, QLineEdit, QMainWindow, QMessageBox, QPushButton, QScrollArea, QSizePolicy, QSpacerItem, QTabWidget, QTableWidget, QTableWidgetItem, QTextEdit, QVBoxLayout, QWidget
 )
 from PyQt6.QtCore import Qt, QTimer, QTime
-from PyQt6.QtGui import QTextOption
+from PyQt6.QtGui import QTextOption, QTextCursor
 
 
 from login.login_page import LoginDialog
@@ -27,9 +28,10 @@ from PyQt6.QtGui import QColor
 # Audio module as a QWidget
 # -------------------------
 class AudioTab(QWidget):
-    def __init__(self):
+    def __init__(self, objectives_provider=None):
         super().__init__()
         self.setWindowTitle("Audio — Extracted Tab")
+        self.objectives_provider = objectives_provider  # () → list of meeting objectives (Workshop tab)
         self.ui_queue = Queue()
         self.controller = MasterController("./config.yaml", ui_queue = self.ui_queue)
         self._build_ui()
@@ -39,10 +41,11 @@ class AudioTab(QWidget):
         self.audio_stopped = True
         self.audio_counter = 0
         self._last_transcript = None  # track last displayed line to prevent duplicates
+        self._stream_anchor = {}  # pane kind → document position where the streamed summary starts
 
         self.update_timer = QTimer()
         self.update_timer.timeout.connect(self._process_ui_queue)
-        self.update_timer.start(500) 
+        self.update_timer.start(50)  # ~20 fps so streamed summary tokens render smoothly
 
     # ======================================================
     # 🧱 UI Layout
@@ -135,6 +138,12 @@ class AudioTab(QWidget):
         ctrl = QHBoxLayout()
         ctrl.addWidget(self.audio_status)
         ctrl.addStretch(1)
+        self.queue_status = QLabel("")
+        self.queue_status.setObjectName("Caption")
+        ctrl.addWidget(self.queue_status)
+        self.latency_status = QLabel("")
+        self.latency_status.setObjectName("Caption")
+        ctrl.addWidget(self.latency_status)
         s2.addLayout(ctrl)
         root.addWidget(step2)
 
@@ -252,6 +261,13 @@ class AudioTab(QWidget):
         top.addWidget(self.audio_table, 2)
 
         right_side = QVBoxLayout()
+        self.coverage_label = QLabel("Objectives: waiting for the first evaluation")
+        self.coverage_label.setWordWrap(True)
+        right_side.addWidget(self.coverage_label)
+        self.participation_label = QLabel("Participation: no speech yet")
+        self.participation_label.setWordWrap(True)
+        right_side.addWidget(self.participation_label)
+
         partial_group = QGroupBox("Partial Summary")
         partial_layout = QVBoxLayout(partial_group)
         self.partial_summary = QTextEdit()
@@ -275,11 +291,25 @@ class AudioTab(QWidget):
     # 🎛️ Control Logic
     # ======================================================
     def _audio_init(self):
-        """Reset UI + state."""
+        """Reset UI + state and hand the meeting's objectives to the pipeline."""
         self.audio_table.setRowCount(0)
         self.partial_summary.clear()
         self.final_summary.clear()
-        self.audio_status.setText("Status: Initialized")
+        self.coverage_label.setText("Objectives: waiting for the first evaluation")
+        self.participation_label.setText("Participation: no speech yet")
+
+        purpose = self.audio_purpose.text().strip()
+        participants = [p.strip() for p in self.audio_participants.text().split(",") if p.strip()]
+        objectives = []
+        if self.objectives_provider:
+            try:
+                objectives = list(self.objectives_provider() or [])
+            except Exception as e:
+                logging.getLogger().warning(f"[AudioTab] Could not read workshop objectives: {e}")
+        if not objectives and purpose:
+            objectives = [purpose]
+        count = self.controller.initialize_meeting(purpose, participants, objectives)
+        self.audio_status.setText(f"Status: Initialized ({count} objectives)")
 
         self.btn_audio_record.setEnabled(True)
         self.btn_audio_pause.setEnabled(False)
@@ -316,27 +346,161 @@ class AudioTab(QWidget):
         self.btn_audio_pause.setText("Pause")
 
     def _audio_stop(self):
-        """Stop all threads gracefully."""
+        """Stop recording; the pipeline drains in the background and reports back via ui_queue."""
         self.controller.stop_all()
         self.audio_running = False
         self.audio_stopped = True
-        self.audio_status.setText("Status: Stopped")
-        self.btn_audio_record.setEnabled(True)
+        self.audio_status.setText("Status: Stopping…")
+        self.btn_audio_record.setEnabled(False)  # re-enabled once the drain reports "stopped"
         self.btn_audio_pause.setEnabled(False)
         self.btn_audio_pause.setText("Pause")
         self.btn_audio_stop.setEnabled(False)
-        QMessageBox.information(self, "Meeting Ended", "All threads stopped, final summary generated.")
 
+    def _show_queues(self, snapshot):
+        """One-line queue gauges; the deepest, oldest backlog points at the bottleneck stage."""
+        parts = []
+        for name, s in snapshot.items():
+            part = f"{name} {s['depth']}/{s['maxsize']} (hw {s['high_water']}, {s['oldest_age']:.0f}s)"
+            if s["depth"] >= s["maxsize"] or s["dropped"]:
+                part = f"<span style='color:#c62828'>{part}</span>"
+            parts.append(part)
+        self.queue_status.setText("Queues: " + " · ".join(parts))
+
+    def _show_latency(self, snapshot, final=False):
+        """How stale the live transcript is (speech → row), plus the slowest stage by p95."""
+        e2e = snapshot.get("end_to_end")
+        if not e2e:
+            return
+        text = f"Lag p50 {e2e['p50']:.1f}s · p95 {e2e['p95']:.1f}s · p99 {e2e['p99']:.1f}s"
+        stages = {k: v for k, v in snapshot.items() if k.startswith("stage.")}
+        if stages:
+            name, slowest = max(stages.items(), key=lambda kv: kv[1]["p95"])
+            text += f" (slowest: {name.split('.', 1)[1]} p95 {slowest['p95']:.1f}s)"
+        self.latency_status.setText(("Session " if final else "") + text)
+
+    def _show_coverage(self, snapshot):
+        """Show which meeting objectives have not been covered yet."""
+        uncovered = snapshot.get("uncovered", [])
+        total = len(snapshot.get("objectives", {}))
+        if not uncovered:
+            self.coverage_label.setText(f"✅ All {total} objectives covered")
+            return
+        items = "".join(f"<li>{name}</li>" for name in uncovered)
+        self.coverage_label.setText(f"<b>⏳ Still uncovered ({len(uncovered)}/{total}):</b><ul>{items}</ul>")
+
+    @staticmethod
+    def _participation_table(snapshot):
+        rows = "".join(
+            f"<tr><td>{name}</td><td>{s['talk_time']:.0f}s ({s['share']:.0%})</td><td>{s['turns']}</td>"
+            f"<td>{s['longest_monologue']:.0f}s</td><td>{s['interruptions']}</td><td>{s['silence']:.0f}s</td></tr>"
+            for name, s in snapshot.get("speakers", {}).items()
+        )
+        return (
+            "<table cellspacing='6'><tr><th align='left'>Speaker</th><th>Talk</th><th>Turns</th>"
+            f"<th>Longest</th><th>Interrupts</th><th>Quiet for</th></tr>{rows}</table>"
+        )
+
+    def _show_participation(self, snapshot):
+        """Per-speaker talk time and turns, flagging speakers who have gone quiet."""
+        html = "<b>🎙️ Participation</b>" + self._participation_table(snapshot)
+        if snapshot.get("silent"):
+            html += f"⚠️ Quiet: {', '.join(snapshot['silent'])}<br>"
+        if snapshot.get("unheard"):
+            html += f"⚠️ {snapshot['unheard']} expected participant(s) not heard yet"
+        self.participation_label.setText(html)
+
+    def _on_pipeline_stopped(self):
+        self.audio_status.setText("Status: Stopped")
+        self.btn_audio_record.setEnabled(True)
+        box = QMessageBox(QMessageBox.Icon.Information, "Meeting Ended",
+                          "All threads stopped, final summary generated.", parent=self)
+        box.open()  # non-modal, so the UI timer keeps running
+
+
+    # ======================================================
+    # 🌊 Streamed summaries
+    # ======================================================
+    _SUMMARY_HEADERS = {"partial": "<b>🧩 Partial Summary:</b>", "final": "<b>✅ Final Summary:</b>"}
+
+    def _summary_pane(self, kind):
+        return self.partial_summary if kind == "partial" else self.final_summary
+
+    def _begin_stream(self, kind):
+        """Open a new summary block in the pane and remember where it starts."""
+        pane = self._summary_pane(kind)
+        cursor = pane.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        if not pane.document().isEmpty():
+            cursor.insertBlock()
+        self._stream_anchor[kind] = cursor.position()
+        cursor.insertHtml(f"{self._SUMMARY_HEADERS[kind]}<br>")
+
+    def _flush_stream(self, kind, text):
+        """Append coalesced token deltas to the pane in a single edit."""
+        if not text or kind not in self._stream_anchor:
+            return
+        pane = self._summary_pane(kind)
+        cursor = pane.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        cursor.insertText(text)
+        pane.verticalScrollBar().setValue(pane.verticalScrollBar().maximum())
+
+    def _finish_stream(self, kind, formatted):
+        """Replace the raw streamed text with the formatted summary."""
+        pane = self._summary_pane(kind)
+        cursor = pane.textCursor()
+        cursor.setPosition(self._stream_anchor.pop(kind))
+        cursor.movePosition(QTextCursor.MoveOperation.End, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertHtml(
+            f'<div style="margin-bottom:10px;">{self._SUMMARY_HEADERS[kind]}<br>{formatted}</div>'
+        )
+        pane.verticalScrollBar().setValue(pane.verticalScrollBar().maximum())
 
     def _process_ui_queue(self):
         """Fetch backend updates and show them in the UI with formatting."""
+        pending = {}  # streamed deltas per pane, flushed once per timer tick
         while not self.ui_queue.empty():
             msg = self.ui_queue.get()
             msg_type = msg.get("type")
 
+            # === Handle streamed summary tokens ===
+            if msg_type in ("partial_start", "final_start"):
+                kind = msg_type.split("_")[0]
+                self._flush_stream(kind, pending.pop(kind, ""))
+                self._begin_stream(kind)
+                continue
+            if msg_type in ("partial_delta", "final_delta"):
+                kind = msg_type.split("_")[0]
+                pending[kind] = pending.get(kind, "") + (msg.get("content") or "")
+                continue
+
+            # === Handle pipeline progress ===
+            if msg_type == "status":
+                self.audio_status.setText(f"Status: {msg.get('content', '')}")
+                continue
+            if msg_type == "stopped":
+                self._on_pipeline_stopped()
+                continue
+            if msg_type == "coverage":
+                self._show_coverage(msg.get("content") or {})
+                continue
+            if msg_type == "queues":
+                self._show_queues(msg.get("content") or {})
+                continue
+            if msg_type == "latency":
+                self._show_latency(msg.get("content") or {}, msg.get("final", False))
+                continue
+            if msg_type == "participation":
+                self._show_participation(msg.get("content") or {})
+                continue
+
             # === Handle transcript updates (table) ===
             if msg_type == "transcript":
 
+                trace = msg.get("trace")
+                if trace and self.controller.latency is not None:
+                    # Time the row waited in ui_queue for this timer tick
+                    self.controller.latency.record("ui_dispatch", time.time() - trace["queued_at"])
                 transcript = msg.get("transcript", "").strip()
 
                 # 🚫 Skip empty, noise, or duplicate entries
@@ -399,8 +563,11 @@ class AudioTab(QWidget):
                 continue
 
             # === Handle summary updates (partial / final) ===
-            content = msg.get("content", "").strip()
+            content = (msg.get("content") or "").strip()
+            if msg_type in pending:
+                self._flush_stream(msg_type, pending.pop(msg_type))
             if not content:
+                self._stream_anchor.pop(msg_type, None)
                 continue
 
             # Convert markdown-style **bold** and newlines → HTML
@@ -408,7 +575,10 @@ class AudioTab(QWidget):
             formatted = re.sub(r"\*\*(.*?)\*\*", r"<b>\1</b>", formatted)
             formatted = formatted.replace("- ", "• ")
 
-            if msg_type == "partial":
+            if msg.get("streamed") and msg_type in self._stream_anchor:
+                self._finish_stream(msg_type, formatted)
+
+            elif msg_type == "partial":
                 self.partial_summary.append(
                     f'<div style="margin-bottom:10px;"><b>🧩 Partial Summary:</b><br>{formatted}</div>'
                 )
@@ -424,6 +594,15 @@ class AudioTab(QWidget):
                     self.final_summary.verticalScrollBar().maximum()
                 )
 
+            if msg_type == "final" and (msg.get("participation") or {}).get("speakers"):
+                self.final_summary.append(
+                    "<b>🎙️ Participation:</b>" + self._participation_table(msg["participation"])
+                )
+
+        # === Render this frame's streamed tokens in one edit per pane ===
+        for kind, text in pending.items():
+            self._flush_stream(kind, text)
+
 
 # class AudioTab(QWidget):
 #     def __init__(self):
@@ -2232,7 +2411,8 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(self.tabs)
 
         # === Audio tab ===
-        self.audio_tab = AudioTab()
+        # Objectives are read from the Workshop tab when the meeting is initialized
+        self.audio_tab = AudioTab(objectives_provider=lambda: self.workshop_tab._collect_company().objectives)
         self.tabs.addTab(self.audio_tab, "Audio")
 
         # === Workshop Setup tab ===
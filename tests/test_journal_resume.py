@@ -0,0 +1,74 @@
+"""
+Crash recovery: captured clips that never reached WAV are replayed on resume, silent clips
+the VAD dropped are not.
+"""
+
+import os
+import threading
+
+import numpy as np
+
+from utils.journal import SessionJournal, replay
+from utils.stages import StageContext
+from utils.vad import VadStage
+
+RATE = 16000
+
+
+def _speech(seconds: float = 1.0) -> bytes:
+    t = np.arange(int(RATE * seconds)) / RATE
+    return (8000 * np.sin(2 * np.pi * 220 * t)).astype(np.int16).tobytes()
+
+
+def _silence(seconds: float = 1.0) -> bytes:
+    return np.zeros(int(RATE * seconds), dtype=np.int16).tobytes()
+
+
+def _capture(journal, seq, pcm):
+    journal.append(
+        "captured", seq=seq, offset=float(seq - 1), end_offset=float(seq), captured_at=1000.0 + seq,
+        pcm=journal.save_audio(seq, pcm),
+    )
+
+
+def test_vad_dropped_clip_is_not_replayed(tmp_path):
+    path = str(tmp_path / "meeting.jsonl")
+    journal = SessionJournal(path, fsync=False)
+    clips = {1: _speech(), 2: _silence(), 3: _speech()}
+    for seq, pcm in clips.items():
+        _capture(journal, seq, pcm)
+
+    ctx = StageContext(
+        None, {"audio": {"rate": RATE}}, threading.Event(), threading.Event(), journal=journal,
+    )
+    vad = VadStage(ctx)
+    assert vad.process({"pcm": clips[1], "seq": 1}) is not None
+    assert vad.process({"pcm": clips[2], "seq": 2}) is None
+    # Clip 1 reaches WAV; clip 3 is still queued when the process dies
+    journal.append("clip", seq=1, last_seq=1, offset=0.0, end_offset=1.0, captured_at=1001.0, path="1.wav")
+    journal.discard_audio(1)
+    journal.close()
+
+    state = replay(path)
+    pending = state.pending_capture()
+    assert [c["seq"] for c in pending] == [3]
+    assert pending[0]["pcm"] == clips[3]
+    assert state.next_clip_seq == 4
+    assert sorted(os.listdir(journal.audio_dir)) == ["00000003.pcm"]
+
+
+def test_coalesced_silent_clips_are_all_settled(tmp_path):
+    path = str(tmp_path / "meeting.jsonl")
+    journal = SessionJournal(path, fsync=False)
+    for seq in (1, 2):
+        _capture(journal, seq, _silence())
+
+    ctx = StageContext(
+        None, {"audio": {"rate": RATE}}, threading.Event(), threading.Event(), journal=journal,
+    )
+    assert VadStage(ctx).process({"pcm": _silence(2.0), "seq": 1, "last_seq": 2}) is None
+    journal.close()
+
+    state = replay(path)
+    assert state.pending_capture() == []
+    assert os.listdir(journal.audio_dir) == []
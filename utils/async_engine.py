@@ -0,0 +1,128 @@
+"""
+Optional asyncio engine for the network-bound pipeline stages.
+One event loop runs in a background thread. With `pipeline.engine: asyncio`, stages that
+define `async process_async(item)` run as coroutines on it instead of on worker threads, so
+many STT / LLM requests can be in flight at once. Per-service limiters (`pipeline.limits`)
+cap concurrent requests to each API across all stages.
+
+Only the transcriber and tone stages have async variants. The summarizer (with the
+objective evaluation it runs) stays on its own thread: it is one sequential consumer, so
+coroutines would not add concurrency there, and its calls go through the thread clients.
+"""
+
+import os
+import asyncio
+import threading
+from dotenv import load_dotenv
+
+from utils.logger import get_logger
+
+load_dotenv()
+
+logger = get_logger("../config.yaml")
+
+DEFAULT_LIMITS = {"stt": 4, "llm": 8}
+
+
+class Limiter:
+    """
+    Semaphore for `async with` whose capacity can change while requests hold it: shrinking
+    lets in-flight requests finish and admits no new ones until usage is below the new limit.
+    Loop-thread only.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = int(capacity)
+        self.in_use = 0
+        self._changed = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.in_use < self.capacity)
+            self.in_use += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        async with self._changed:
+            self.in_use -= 1
+            self._changed.notify()
+
+    async def resize(self, capacity: int):
+        async with self._changed:
+            self.capacity = int(capacity)
+            self._changed.notify_all()
+
+
+class AsyncEngine:
+    """An event loop on a daemon thread, plus the async API clients and per-service limiters."""
+
+    def __init__(self, limits: dict = None):
+        self.limits = dict(DEFAULT_LIMITS)
+        self.limits.update(limits or {})
+        self.loop = asyncio.new_event_loop()
+        self._limiters = {}  # created on the loop thread
+        self._clients = {}
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), daemon=True, name="async-engine")
+        self._thread.start()
+        ready.wait()
+        logger.info(f"⚡ Async engine started | limits: {', '.join(f'{k}={v}' for k, v in self.limits.items())}")
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self.loop)
+        self.loop.call_soon(ready.set)
+        self.loop.run_forever()
+
+    # --- called from any thread ---
+    def submit(self, coro):
+        """Schedule a coroutine on the loop; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro, timeout: float = None):
+        """Run a coroutine on the loop and wait for its result."""
+        return self.submit(coro).result(timeout)
+
+    def configure(self, limits: dict):
+        """Change the per-service limits in place; requests already in flight count against the new ones."""
+        async def apply():
+            self.limits.update(limits or {})
+            for service, limiter in self._limiters.items():
+                await limiter.resize(self.limits.get(service, 4))
+        self.submit(apply())
+
+    # --- called on the loop thread ---
+    def limit(self, service: str) -> Limiter:
+        """Limiter bounding concurrent requests to one service ("stt", "llm", ...)."""
+        limiter = self._limiters.get(service)
+        if limiter is None:
+            limiter = self._limiters[service] = Limiter(self.limits.get(service, 4))
+        return limiter
+
+    def openai(self):
+        if "openai" not in self._clients:
+            from openai import AsyncOpenAI
+            self._clients["openai"] = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self._clients["openai"]
+
+    def elevenlabs(self):
+        if "elevenlabs" not in self._clients:
+            from elevenlabs.client import AsyncElevenLabs
+            self._clients["elevenlabs"] = AsyncElevenLabs(
+                api_key=os.getenv("ELEVENLABS_API_KEY"), base_url=os.getenv("ELEVENLABS_BASE_URL")
+            )
+        return self._clients["elevenlabs"]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine(limits: dict = None) -> AsyncEngine:
+    """Return the process-wide engine, starting it on first use (later calls update the limits)."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = AsyncEngine(limits)
+        elif limits:
+            _engine.configure(limits)
+        return _engine
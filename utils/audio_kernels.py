@@ -0,0 +1,45 @@
+"""
+CPU-bound audio kernels.
+Plain module-level functions over int16 sample arrays, so they can run in a worker process
+(`engine: process`) as well as inline. Keep this module light: worker processes import it.
+"""
+
+import wave
+import numpy as np
+from multiprocessing import shared_memory
+
+# Worker side: shared PCM blocks stay attached for the life of the process, keyed by name
+_attached = {}
+
+
+def run_kernel(kernel, block_name: str, nbytes: int, params: dict):
+    """Entry point in a worker process: view the shared PCM as int16 in place and call the kernel."""
+    shm = _attached.get(block_name)
+    if shm is None:
+        shm = _attached[block_name] = shared_memory.SharedMemory(name=block_name)
+    samples = np.ndarray((nbytes // 2,), dtype=np.int16, buffer=shm.buf)
+    try:
+        return kernel(samples, **params)
+    finally:
+        del samples  # no exported view may outlive the call
+
+
+def voiced_fraction(samples: np.ndarray, frame_len: int, threshold_db: float) -> float:
+    """Share of frames whose RMS level (dBFS) is above `threshold_db`."""
+    n_frames = len(samples) // frame_len
+    if n_frames == 0:
+        return 0.0
+    frames = samples[: n_frames * frame_len].astype(np.float32).reshape(n_frames, frame_len) / 32768.0
+    rms = np.sqrt(np.mean(frames * frames, axis=1))
+    level_db = 20.0 * np.log10(np.maximum(rms, 1e-10))
+    return float(np.mean(level_db > threshold_db))
+
+
+def write_wav(samples: np.ndarray, path: str, rate: int = 16000, channels: int = 1) -> str:
+    """Encode 16-bit PCM samples as a WAV file; returns the path."""
+    with wave.open(path, "wb") as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)  # 16-bit PCM = 2 bytes
+        wf.setframerate(rate)
+        wf.writeframes(samples)
+    return path
@@ -0,0 +1,243 @@
+"""
+Bounded pipeline queues with a configurable backpressure policy and live gauges.
+
+Policies applied when a queue is full:
+    block        wait for space (plain queue.Queue behaviour)
+    drop_oldest  discard the oldest queued item to make room
+    coalesce     merge the new item into the newest queued one (adjacent audio clips,
+                 transcript deltas); falls back to blocking when they cannot be merged
+    spill        write items to disk and reload them in order as space frees up
+
+The end-of-stream sentinel (None) is never dropped, merged or blocked on: it always
+gets queued behind the items already accepted.
+"""
+
+import os
+import time
+import pickle
+import queue
+import itertools
+import threading
+from collections import deque
+
+from utils.logger import get_logger
+
+logger = get_logger("../config.yaml")
+
+POLICIES = ("block", "drop_oldest", "coalesce", "spill")
+
+
+def coalesce_items(older, newer, max_bytes=None):
+    """Merge two adjacent queue items, or return None when they cannot be merged."""
+    if isinstance(older, (bytes, bytearray)) and isinstance(newer, (bytes, bytearray)):
+        if max_bytes and len(older) + len(newer) > max_bytes:
+            return None
+        return bytes(older) + bytes(newer)
+    if isinstance(older, dict) and isinstance(newer, dict) and "pcm" in older and "pcm" in newer:
+        # Adjacent captured clips: the merged clip keeps the first clip's seq, offset and capture time
+        if max_bytes and len(older["pcm"]) + len(newer["pcm"]) > max_bytes:
+            return None
+        merged = dict(older)
+        merged["pcm"] = b"".join((older["pcm"], newer["pcm"]))
+        merged["last_seq"] = newer.get("last_seq", newer.get("seq"))
+        return merged
+    if isinstance(older, dict) and isinstance(newer, dict) and "segments" in older and "segments" in newer:
+        merged = dict(newer)
+        merged["segments"] = list(older["segments"]) + list(newer["segments"])
+        merged["first_seq"] = older.get("first_seq", older.get("seq"))
+        return merged
+    return None
+
+
+class MonitoredQueue(queue.Queue):
+    """queue.Queue with a backpressure policy plus depth, high-water and age-of-oldest gauges."""
+
+    _spill_ids = itertools.count()
+
+    def __init__(self, name: str, maxsize: int = 50, policy: str = "block", spill_dir: str = None,
+                 coalesce_max_bytes: int = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown backpressure policy {policy!r} for {name}; expected one of {POLICIES}")
+        if policy == "spill" and not spill_dir:
+            raise ValueError(f"Queue {name} uses the spill policy but has no spill_dir")
+        super().__init__(maxsize=maxsize)
+        self.name = name
+        self.policy = policy
+        self.spill_dir = spill_dir
+        self.coalesce_max_bytes = coalesce_max_bytes
+        self.high_water = 0
+        self.counters = {"put": 0, "get": 0, "dropped": 0, "coalesced": 0, "spilled": 0}
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    # --- queue.Queue storage hooks (called with self.mutex held) ---
+    def _init(self, maxsize):
+        self.queue = deque()
+        self._enqueued_at = deque()
+        self._spilled = deque()  # (path, enqueued_at), oldest first
+
+    def _qsize(self):
+        return len(self.queue) + len(self._spilled)
+
+    def _put(self, item):
+        self.queue.append(item)
+        self._enqueued_at.append(time.monotonic())
+        self.counters["put"] += 1
+        self.high_water = max(self.high_water, len(self.queue) + len(self._spilled))
+
+    def _get(self):
+        item = self.queue.popleft()  # get() has loaded spilled items first
+        self._enqueued_at.popleft()
+        self.counters["get"] += 1
+        while self._spilled and len(self.queue) < self.maxsize:
+            self._unspill()
+        return item
+
+    # --- spill-to-disk ---
+    def _spill(self, item):
+        path = os.path.join(self.spill_dir, f"{self.name}_{next(self._spill_ids):08d}.pkl")
+        with open(path, "wb") as f:
+            pickle.dump(item, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self._spilled.append((path, time.monotonic()))
+        self.counters["spilled"] += 1
+        self.counters["put"] += 1
+        self.high_water = max(self.high_water, len(self.queue) + len(self._spilled))
+
+    def _unspill(self):
+        path, enqueued_at = self._spilled.popleft()
+        try:
+            with open(path, "rb") as f:
+                item = pickle.load(f)
+            os.remove(path)
+        except Exception as e:
+            logger.error(f"[Queues] {self.name}: lost spilled item {path}: {e}", exc_info=True)
+            # Dropped: it will never be get() or task_done()
+            self.unfinished_tasks -= 1
+            if self.unfinished_tasks == 0:
+                self.all_tasks_done.notify_all()
+            return
+        self.queue.append(item)
+        self._enqueued_at.append(enqueued_at)
+
+    def prefill(self, items):
+        """Queue work recovered on resume ahead of anything new, past maxsize (before consumers start)."""
+        with self.mutex:
+            for item in items:
+                self._put(item)
+                self.unfinished_tasks += 1
+            self.not_empty.notify_all()
+
+    def get(self, block=True, timeout=None):
+        """queue.Queue.get, except that spilled items that cannot be read back are skipped, not returned."""
+        with self.not_empty:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                while not self.queue and self._spilled:
+                    self._unspill()
+                if self.queue:
+                    break
+                if not block:
+                    raise queue.Empty
+                if deadline is None:
+                    self.not_empty.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise queue.Empty
+                    self.not_empty.wait(remaining)
+            item = self._get()
+            self.not_full.notify()
+            return item
+
+    def put(self, item, block=True, timeout=None):
+        with self.not_full:
+            if self.policy == "spill" and self._spilled:
+                # Keep FIFO order: once spilling, everything (sentinel included) goes to disk
+                self._spill(item)
+                self.unfinished_tasks += 1
+                self.not_empty.notify()
+                return
+
+            if item is not None and 0 < self.maxsize <= len(self.queue):
+                if self.policy == "drop_oldest":
+                    self.queue.popleft()
+                    self._enqueued_at.popleft()
+                    self.unfinished_tasks -= 1
+                    self.counters["dropped"] += 1
+                    logger.warning(f"[Queues] {self.name} full → dropped oldest item ({self.counters['dropped']} so far)")
+                elif self.policy == "coalesce":
+                    merged = coalesce_items(self.queue[-1], item, self.coalesce_max_bytes)
+                    if merged is not None:
+                        self.queue[-1] = merged
+                        self.counters["coalesced"] += 1
+                        self.not_empty.notify()
+                        return
+                elif self.policy == "spill":
+                    self._spill(item)
+                    self.unfinished_tasks += 1
+                    self.not_empty.notify()
+                    return
+
+                # block (also coalesce when the items cannot be merged)
+                if not block:
+                    raise queue.Full
+                deadline = None if timeout is None else time.monotonic() + timeout
+                while len(self.queue) >= self.maxsize:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise queue.Full
+                    self.not_full.wait(remaining)
+
+            # The sentinel skips the capacity check, so shutdown never blocks on a full queue
+            self._put(item)
+            self.unfinished_tasks += 1
+            self.not_empty.notify()
+
+    def stats(self) -> dict:
+        """Depth (memory + spilled), high-water mark, age of the oldest item and policy counters."""
+        with self.mutex:
+            oldest = self._enqueued_at[0] if self._enqueued_at else (self._spilled[0][1] if self._spilled else None)
+            return {
+                "depth": len(self.queue) + len(self._spilled),
+                "on_disk": len(self._spilled),
+                "maxsize": self.maxsize,
+                "high_water": self.high_water,
+                "oldest_age": round(time.monotonic() - oldest, 2) if oldest is not None else 0.0,
+                "policy": self.policy,
+                **self.counters,
+            }
+
+
+class QueueMonitor(threading.Thread):
+    """Periodically logs queue gauges and pushes them to the UI as a "queues" message."""
+
+    def __init__(self, queues, interval: float = 5.0, ui_queue=None):
+        super().__init__(daemon=True, name="QueueMonitor")
+        self.queues = queues
+        self.interval = interval
+        self.ui_queue = ui_queue
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """Report once more and exit (the pipeline has fully drained)."""
+        self._stopped.set()
+
+    def snapshot(self) -> dict:
+        return {q.name: q.stats() for q in self.queues}
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.report()
+        self.report()
+
+    def report(self):
+        snapshot = self.snapshot()
+        logger.info("[Queues] " + " | ".join(
+            f"{name}: {s['depth']}/{s['maxsize']} hw={s['high_water']} oldest={s['oldest_age']:.1f}s"
+            + (f" dropped={s['dropped']}" if s["dropped"] else "")
+            + (f" coalesced={s['coalesced']}" if s["coalesced"] else "")
+            + (f" spilled={s['spilled']}" if s["spilled"] else "")
+            for name, s in snapshot.items()
+        ))
+        if self.ui_queue:
+            self.ui_queue.put({"type": "queues", "content": snapshot})
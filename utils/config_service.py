@@ -0,0 +1,279 @@
+"""
+Typed, hot-reloadable access to config.yaml.
+The file is parsed and validated once per change by a single watcher thread; readers get
+the current, type-coerced sections, and subscribers are called with (new, old) for every
+section that changed. An edit that fails validation is logged and ignored, so a typo
+mid-meeting never takes down a running pipeline.
+"""
+
+import os
+import copy
+import time
+import logging
+import threading
+import yaml
+
+# The logger subscribes to this service, so log through the root logger directly
+logger = logging.getLogger()
+
+
+class Field:
+    """Expected type, default and bounds of one config value."""
+
+    def __init__(self, type_, default=None, min=None, max=None, choices=None, nullable=False):
+        self.type = type_
+        self.default = default
+        self.min = min
+        self.max = max
+        self.choices = choices
+        self.nullable = nullable
+
+    def coerce(self, name, value):
+        if value is None:
+            if self.nullable or self.default is None:
+                return None
+            raise ValueError(f"{name} must not be empty")
+        if self.type is bool:
+            if not isinstance(value, bool):
+                raise ValueError(f"{name} must be true or false, got {value!r}")
+        else:
+            try:
+                value = self.type(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"{name} must be {self.type.__name__}, got {value!r}")
+        if self.type is str and self.choices and value.upper() in self.choices:
+            value = value.upper()  # logging levels
+        if self.choices and value not in self.choices:
+            raise ValueError(f"{name} must be one of {', '.join(map(str, self.choices))}, got {value!r}")
+        if self.min is not None and value < self.min:
+            raise ValueError(f"{name} must be ≥ {self.min}, got {value}")
+        if self.max is not None and value > self.max:
+            raise ValueError(f"{name} must be ≤ {self.max}, got {value}")
+        return value
+
+
+# Known fields per section; unknown keys (and sections) pass through unchanged
+SCHEMA = {
+    "logging": {
+        "level": Field(str, "INFO", choices=("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")),
+        "file": Field(str, "logs/app.log"),
+        "max_bytes": Field(int, 5 * 1024 * 1024, min=1024),
+        "backup_count": Field(int, 5, min=0),
+    },
+    "audio": {
+        "output_dir": Field(str, "temp_audio"),
+        "chunk_format": Field(str, "wav"),
+        "rate": Field(int, 16000, min=8000),
+        "chunk_size": Field(int, 1024, min=64),
+        "duration": Field(float, 5.0, min=0.5),
+        "input_device_index": Field(int, None, min=0, nullable=True),
+        "capture": Field(str, "process", choices=("process", "thread")),
+        "ring_seconds": Field(float, 60.0, min=1.0),
+    },
+    "sessions": {
+        "stt_workers": Field(int, 4, min=1),
+        "llm_workers": Field(int, 6, min=1),
+        "max_share": Field(int, None, min=1, nullable=True),
+    },
+    "summarizer": {
+        "partial_speech_seconds": Field(float, 20.0, min=0),
+        "partial_new_words": Field(int, 60, min=0),
+        "partial_min_spacing": Field(float, 10.0, min=0),
+        "partial_window": Field(int, 2, min=1),
+        "token_budget": Field(int, 8000, min=512),
+        "context_budget": Field(int, 1500, min=0),
+        "overflow": Field(str, "split", choices=("split", "truncate")),
+        "stream": Field(bool, True),
+    },
+    "latency": {
+        "report_interval": Field(float, 30.0, min=0.5),
+    },
+    "journal": {
+        "enabled": Field(bool, True),
+        "dir": Field(str, "sessions"),
+        "resume": Field(bool, True),
+        "fsync": Field(bool, True),
+    },
+    "headless": {
+        "output_dir": Field(str, "meetings"),
+        "control_socket": Field(str, "audio-pipeline.sock"),
+    },
+    "shutdown": {
+        "drain_timeout": Field(float, 20.0, min=0),
+        "final_timeout": Field(float, 10.0, min=0),
+    },
+    "participation": {
+        "max_pause": Field(float, 2.0, min=0),
+        "silence_alert": Field(float, 120.0, min=0),
+    },
+    "evaluator": {
+        "backend": Field(str, "openai", choices=("openai", "local", "auto")),
+        "granularity": Field(str, "summary", choices=("summary", "bullets")),
+        "reduce": Field(str, "max", choices=("max", "mean")),
+        "storage": Field(str, "float32", choices=("float32", "int8")),
+        "covered_threshold": Field(float, 0.8, min=0, max=1),
+        "ewma_alpha": Field(float, 0.3, min=0, max=1),
+        "library_pca_dims": Field(int, None, min=1, nullable=True),
+        "library_top_k": Field(int, 5, min=1),
+    },
+}
+
+
+def _validate_pipeline(section: dict, errors: list):
+    engine = section.get("engine", "threads")
+    if engine not in ("threads", "asyncio"):
+        errors.append(f"pipeline.engine must be threads or asyncio, got {engine!r}")
+    processes = section.get("processes", 2)
+    if not isinstance(processes, int) or processes < 1:
+        errors.append(f"pipeline.processes must be a positive integer, got {processes!r}")
+    for service, limit in (section.get("limits") or {}).items():
+        if not isinstance(limit, int) or limit < 1:
+            errors.append(f"pipeline.limits.{service} must be a positive integer, got {limit!r}")
+    names = set()
+    for i, spec in enumerate(section.get("stages") or []):
+        if not isinstance(spec, dict) or not spec.get("name") or not spec.get("class"):
+            errors.append(f"pipeline.stages[{i}] needs a name and a class")
+            continue
+        if spec["name"] in names:
+            errors.append(f"pipeline.stages: duplicate stage name {spec['name']!r}")
+        names.add(spec["name"])
+        if spec.get("engine", "threads") not in ("threads", "asyncio", "process"):
+            errors.append(f"pipeline.stages.{spec['name']}.engine must be threads, asyncio or process")
+        concurrency = spec.get("concurrency", 1)
+        if not isinstance(concurrency, int) or concurrency < 1:
+            errors.append(f"pipeline.stages.{spec['name']}.concurrency must be a positive integer")
+
+
+def _validate_models(section: dict, errors: list):
+    for task, route in section.items():
+        if not isinstance(route, dict) or not route.get("model"):
+            errors.append(f"models.{task} needs a model")
+            continue
+        for key in ("max_tokens", "timeout", "dimensions"):
+            value = route.get(key)
+            if value is not None and (not isinstance(value, (int, float)) or value <= 0):
+                errors.append(f"models.{task}.{key} must be a positive number, got {value!r}")
+
+
+def validate(raw: dict):
+    """Return (config with typed sections and defaults filled in, list of error messages)."""
+    config = copy.deepcopy(raw or {})
+    errors = []
+    for section, fields in SCHEMA.items():
+        values = config.get(section)
+        if values is None:
+            values = {}
+        if not isinstance(values, dict):
+            errors.append(f"{section} must be a mapping")
+            continue
+        for key, field in fields.items():
+            try:
+                values[key] = field.coerce(f"{section}.{key}", values.get(key, field.default))
+            except ValueError as e:
+                errors.append(str(e))
+        config[section] = values
+    _validate_pipeline(config.get("pipeline") or {}, errors)
+    _validate_models(config.get("models") or {}, errors)
+    return config, errors
+
+
+class ConfigError(ValueError):
+    """config.yaml could not be parsed or failed validation."""
+
+
+class ConfigService:
+    """Parses and validates config.yaml once per change and publishes per-section change events."""
+
+    def __init__(self, path: str, watch_interval: float = 2.0):
+        self.path = os.path.abspath(path)
+        self.watch_interval = watch_interval
+        self._lock = threading.RLock()
+        self._subscribers = {}  # section → [callback(new, old)]
+        self._mtime = None
+        self.version = 0
+        self.config = self._parse()
+        self._mtime = os.path.getmtime(self.path)
+        self._watcher = threading.Thread(target=self._watch, daemon=True, name="ConfigWatcher")
+        self._watcher.start()
+
+    def _parse(self) -> dict:
+        try:
+            with open(self.path, "r") as f:
+                raw = yaml.safe_load(f) or {}
+        except (OSError, yaml.YAMLError) as e:
+            raise ConfigError(f"Could not read {self.path}: {e}")
+        config, errors = validate(raw)
+        if errors:
+            raise ConfigError(f"Invalid {os.path.basename(self.path)}: " + "; ".join(errors))
+        return config
+
+    # --- reading ---
+    def section(self, name: str) -> dict:
+        """Current (validated) contents of one top-level section."""
+        with self._lock:
+            return copy.deepcopy(self.config.get(name) or {})
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return copy.deepcopy(self.config)
+
+    # --- change events ---
+    def subscribe(self, section: str, callback):
+        """Call `callback(new_section, old_section)` whenever `section` changes."""
+        with self._lock:
+            self._subscribers.setdefault(section, []).append(callback)
+        return callback
+
+    def unsubscribe(self, section: str, callback):
+        with self._lock:
+            callbacks = self._subscribers.get(section, [])
+            if callback in callbacks:
+                callbacks.remove(callback)
+
+    def reload(self) -> list:
+        """Re-read the file now; returns the names of the sections that changed."""
+        try:
+            new = self._parse()
+        except ConfigError as e:
+            logger.error(f"[Config] Ignoring edit, keeping the previous settings: {e}")
+            return []
+        with self._lock:
+            old = self.config
+            changed = sorted(k for k in set(old) | set(new) if old.get(k) != new.get(k))
+            if not changed:
+                return []
+            self.config = new
+            self.version += 1
+            callbacks = [(s, list(self._subscribers.get(s, []))) for s in changed]
+        logger.info(f"[Config] Reloaded {os.path.basename(self.path)} (v{self.version}): {', '.join(changed)} changed")
+        for section, subscribers in callbacks:
+            for callback in subscribers:
+                try:
+                    callback(copy.deepcopy(new.get(section) or {}), copy.deepcopy(old.get(section) or {}))
+                except Exception as e:
+                    logger.error(f"[Config] Subscriber to {section} failed: {e}", exc_info=True)
+        return changed
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            try:
+                mtime = os.path.getmtime(self.path)
+            except OSError:
+                continue
+            if mtime != self._mtime:
+                self._mtime = mtime
+                self.reload()
+
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_config_service(path: str) -> ConfigService:
+    """Return the process-wide service for a config file (one parse + one watcher per file)."""
+    path = os.path.abspath(path)
+    with _services_lock:
+        if path not in _services:
+            _services[path] = ConfigService(path)
+        return _services[path]
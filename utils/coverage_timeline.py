@@ -0,0 +1,84 @@
+"""
+Objective-coverage time series for a meeting.
+Every evaluation window appends one score per objective to a growing float32 array and updates
+the running max and EWMA in place, so each update costs O(objectives) regardless of history.
+"""
+
+import numpy as np
+
+
+class CoverageTimeline:
+    """Per-objective coverage scores over time, with running max and EWMA."""
+
+    def __init__(self, names, alpha: float = 0.3, threshold: float = 0.8, capacity: int = 64):
+        self.names = list(names)
+        self.alpha = alpha
+        self.threshold = threshold  # running max at or above this counts as covered
+
+        n = len(self.names)
+        self._scores = np.zeros((capacity, n), dtype=np.float32)  # rows = windows, amortized doubling
+        self._times = np.zeros(capacity, dtype=np.float64)  # meeting time (seconds) of each window
+        self.length = 0
+        self.running_max = np.zeros(n, dtype=np.float32)
+        self.ewma = np.zeros(n, dtype=np.float32)
+        self.covered_at = np.full(n, np.nan)  # meeting time each objective first crossed the threshold
+
+    def _grow(self):
+        capacity = 2 * self._scores.shape[0]
+        scores = np.zeros((capacity, len(self.names)), dtype=np.float32)
+        scores[: self.length] = self._scores[: self.length]
+        times = np.zeros(capacity, dtype=np.float64)
+        times[: self.length] = self._times[: self.length]
+        self._scores, self._times = scores, times
+
+    def update(self, scores, t: float):
+        """Append one window of scores (ordered like `names`) observed at meeting time `t`."""
+        scores = np.asarray(scores, dtype=np.float32)
+        if self.length == self._scores.shape[0]:
+            self._grow()
+        self._scores[self.length] = scores
+        self._times[self.length] = t
+
+        if self.length == 0:
+            self.ewma[:] = scores
+        else:
+            self.ewma += self.alpha * (scores - self.ewma)
+        np.maximum(self.running_max, scores, out=self.running_max)
+        newly = np.isnan(self.covered_at) & (self.running_max >= self.threshold)
+        self.covered_at[newly] = t
+        self.length += 1
+
+    def update_from_results(self, results: dict, t: float):
+        """Append the scores from an `evaluate_objectives` result dict."""
+        self.update([results.get(name, {}).get("score", 0.0) for name in self.names], t)
+
+    @property
+    def scores(self) -> np.ndarray:
+        """(windows × objectives) view of the recorded scores."""
+        return self._scores[: self.length]
+
+    @property
+    def times(self) -> np.ndarray:
+        return self._times[: self.length]
+
+    def uncovered(self):
+        """Objectives whose running max has not reached the threshold yet."""
+        return [name for name, peak in zip(self.names, self.running_max) if peak < self.threshold]
+
+    def snapshot(self) -> dict:
+        """Current state for the UI: latest, max and EWMA per objective plus the uncovered list."""
+        latest = self._scores[self.length - 1] if self.length else np.zeros(len(self.names), dtype=np.float32)
+        return {
+            "windows": self.length,
+            "time": float(self._times[self.length - 1]) if self.length else 0.0,
+            "objectives": {
+                name: {
+                    "latest": round(float(latest[i]), 2),
+                    "max": round(float(self.running_max[i]), 2),
+                    "ewma": round(float(self.ewma[i]), 2),
+                    "covered_at": None if np.isnan(self.covered_at[i]) else round(float(self.covered_at[i]), 1),
+                }
+                for i, name in enumerate(self.names)
+            },
+            "uncovered": self.uncovered(),
+        }
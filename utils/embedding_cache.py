@@ -0,0 +1,150 @@
+"""
+Persistent embedding cache for the evaluator.
+Vectors are stored as float32 rows in a memory-mapped .npy file per model, with a JSON
+sidecar index mapping sha1(text) → row. Texts that never change (objectives) are embedded
+once per cache lifetime instead of on every evaluation.
+"""
+
+import os
+import re
+import json
+import hashlib
+import threading
+import numpy as np
+
+from utils.logger import get_logger
+
+logger = get_logger("../config.yaml")
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "cache", "embeddings")
+
+
+def text_key(text: str) -> str:
+    """Stable cache key for a text."""
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+class _ModelStore:
+    """One model's vectors: `<slug>.npy` (capacity × dim, float32) + `<slug>.json` index."""
+
+    def __init__(self, directory: str, model: str):
+        slug = re.sub(r"[^A-Za-z0-9_.-]+", "_", model)
+        self.data_path = os.path.join(directory, f"{slug}.npy")
+        self.index_path = os.path.join(directory, f"{slug}.json")
+        self.model = model
+        self.dim = None
+        self.rows = {}
+        self.matrix = None  # np.memmap, opened read/write
+
+        if os.path.exists(self.index_path) and os.path.exists(self.data_path):
+            try:
+                with open(self.index_path, "r") as f:
+                    index = json.load(f)
+                self.dim = int(index["dim"])
+                self.rows = index["rows"]
+                self.matrix = np.load(self.data_path, mmap_mode="r+")
+            except Exception as e:
+                logger.warning(f"[EmbeddingCache] Discarding unreadable cache for {model}: {e}")
+                self.dim, self.rows, self.matrix = None, {}, None
+
+    def get(self, key: str):
+        row = self.rows.get(key)
+        return None if row is None else self.matrix[row]
+
+    def _ensure_capacity(self, needed: int, dim: int):
+        """Grow the backing file (doubling) so it can hold `needed` rows."""
+        if self.matrix is not None and self.matrix.shape[0] >= needed:
+            return
+        capacity = max(64, needed, 2 * (self.matrix.shape[0] if self.matrix is not None else 0))
+        tmp_path = self.data_path + ".tmp.npy"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(capacity, dim))
+        if self.matrix is not None and self.rows:
+            used = len(self.rows)
+            grown[:used] = self.matrix[:used]
+        grown.flush()
+        del grown
+        self.matrix = None
+        os.replace(tmp_path, self.data_path)
+        self.matrix = np.load(self.data_path, mmap_mode="r+")
+        self.dim = dim
+
+    def put_many(self, keys, vectors: np.ndarray):
+        new = [(k, v) for k, v in zip(keys, vectors) if k not in self.rows]
+        if not new:
+            return
+        dim = vectors.shape[1]
+        if self.dim is not None and dim != self.dim:
+            raise ValueError(f"Embedding dim {dim} does not match cached dim {self.dim} for {self.model}")
+        start = len(self.rows)
+        self._ensure_capacity(start + len(new), dim)
+        for i, (key, vec) in enumerate(new):
+            self.matrix[start + i] = vec
+            self.rows[key] = start + i
+        self.matrix.flush()
+
+        # Data first, then the index, so the index never points past written rows
+        tmp_index = self.index_path + ".tmp"
+        with open(tmp_index, "w") as f:
+            json.dump({"model": self.model, "dim": self.dim, "rows": self.rows}, f)
+        os.replace(tmp_index, self.index_path)
+
+
+class EmbeddingCache:
+    """Thread-safe, on-disk cache of embeddings keyed by embedding space (model[@dims]) and text hash."""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR):
+        self.directory = os.path.normpath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def _store(self, model: str) -> _ModelStore:
+        if model not in self._stores:
+            self._stores[model] = _ModelStore(self.directory, model)
+        return self._stores[model]
+
+    def get_many(self, model: str, texts):
+        """Return a list with a float32 vector (copy) for each cached text, None for misses."""
+        with self._lock:
+            store = self._store(model)
+            out = []
+            for text in texts:
+                vec = store.get(text_key(text))
+                out.append(None if vec is None else np.array(vec, dtype=np.float32))
+            return out
+
+    def put_many(self, model: str, texts, vectors):
+        """Persist vectors for texts (rows already cached are left untouched)."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            self._store(model).put_many([text_key(t) for t in texts], vectors)
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(s.rows) for s in self._stores.values())
+
+    def memory_report(self) -> dict:
+        """Rows, dimension and on-disk bytes per embedding space opened so far."""
+        with self._lock:
+            return {
+                model: {
+                    "rows": len(store.rows),
+                    "dim": store.dim,
+                    "bytes": 0 if store.matrix is None else int(store.matrix.nbytes),
+                }
+                for model, store in self._stores.items()
+            }
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache(directory: str = None) -> EmbeddingCache:
+    """Return the process-wide cache, (re)creating it when a different directory is requested."""
+    global _cache
+    with _cache_lock:
+        if _cache is None or (directory and os.path.normpath(directory) != _cache.directory):
+            _cache = EmbeddingCache(directory or DEFAULT_CACHE_DIR)
+            logger.info(f"[EmbeddingCache] Using {_cache.directory}")
+        return _cache
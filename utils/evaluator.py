@@ -1,53 +1,311 @@
 import os
 import json
-import re
+import time
 import numpy as np
+import scipy.sparse as sp
 from openai import OpenAI
 from dotenv import load_dotenv
+from utils.model_router import get_model, record_call
+from utils.embedding_cache import get_embedding_cache
+from utils.local_embeddings import HashingTfidfEmbedder
+from utils.logger import get_logger
 load_dotenv()
 
+logger = get_logger("../config.yaml")
+
 # === OpenAI Setup ===
-OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
-openai_client = OpenAI(api_key=OPENAI_API_KEY)
+# Built on first use: the offline parts (local backend, Int8Matrix, benchmarks) need no API key
+_openai_client = None
+
+
+def openai_client() -> OpenAI:
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _openai_client
+
 
 def cosine_similarity(a, b):
     return np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b))
 
-def evaluate_objectives(objectives: dict, partial_summary: str, threshold: float = 1.0):
+
+def embedding_space(route: dict = None):
     """
-    Evaluate objectives vs partial summary using OpenAI embeddings (no torch needed).
-    Also lists out speakers who haven't spoken yet.
+    (model, dimensions, key) of the "evaluation" route (or of `route`). `key` names the vector
+    space, so caches and indexes never mix vectors of different models or truncation sizes.
     """
+    route = route or get_model("evaluation")
+    dimensions = route.get("dimensions")
+    dimensions = int(dimensions) if dimensions else None
+    key = route["model"] if dimensions is None else f"{route['model']}@{dimensions}"
+    return route["model"], dimensions, key
 
-    # --- Extract speakers from summary ---
-    spoken_speakers = sorted(set(re.findall(r"Speaker[_\s]*(\d+)", partial_summary)))
-    spoken_speakers = [f"Speaker_{s}" for s in spoken_speakers]
-    all_speakers = sorted(set(re.findall(r"Speaker[_\s]*\d+", partial_summary)))
-    if not all_speakers:
-        all_speakers = [f"Speaker_{i}" for i in range(1, 6)]
-    silent_speakers = [s for s in all_speakers if s not in spoken_speakers]
 
-    # --- Get embeddings ---
-    texts = list(objectives.values()) + [partial_summary]
-    response = openai_client.embeddings.create(model="text-embedding-3-large", input=texts)
-    embeddings = [np.array(e.embedding) for e in response.data]
-    summary_emb = embeddings[-1]
+def embed_texts(texts, use_cache: bool = True, session_id: str = None, route: dict = None):
+    """
+    Embed texts with the "evaluation" model, returning a float32 matrix (one row per text).
+
+    With `use_cache`, rows are served from the persistent embedding cache and only misses
+    are sent to the API (and then cached). When the route sets `dimensions`, the API returns
+    vectors truncated to that size. `route` pins the model, e.g. to the one vectors being
+    compared with were embedded with; by default the current "evaluation" route is used.
+    """
+    route = route or get_model("evaluation")
+    model, dimensions, space = embedding_space(route)
+    cache = get_embedding_cache() if use_cache else None
+    vectors = cache.get_many(space, texts) if cache is not None else [None] * len(texts)
+
+    missing = [i for i, v in enumerate(vectors) if v is None]
+    if missing:
+        started = time.perf_counter()
+        extra = {"dimensions": dimensions} if dimensions else {}
+        response = openai_client().embeddings.create(
+            model=model, input=[texts[i] for i in missing], timeout=route["timeout"], **extra
+        )
+        usage = getattr(response, "usage", None)
+        record_call("evaluation", model, time.perf_counter() - started,
+                    prompt_tokens=getattr(usage, "prompt_tokens", 0), session_id=session_id)
+        fresh = np.array([e.embedding for e in response.data], dtype=np.float32)
+        for i, vec in zip(missing, fresh):
+            vectors[i] = vec
+        if cache is not None:
+            cache.put_many(space, [texts[i] for i in missing], fresh)
+
+    return np.vstack(vectors) if vectors else np.zeros((0, 0), dtype=np.float32)
+
+def normalize_rows(matrix) -> np.ndarray:
+    """L2-normalize each row as float32 (zero rows stay zero)."""
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class Int8Matrix:
+    """
+    Row-wise symmetric int8 quantization of a normalized embedding matrix (4× smaller than
+    float32). Supports `matrix @ other`, rescaling each row by its own scale.
+
+    The product upcasts `BLOCK_BYTES` worth of rows at a time to float32 for BLAS, so scoring
+    never materializes a float32 copy of the whole matrix.
+    """
+
+    BLOCK_BYTES = 1 << 20  # float32 working set per block of rows
 
-    # --- Evaluate each objective ---
+    def __init__(self, data: np.ndarray, scale: np.ndarray):
+        self.data = data
+        self.scale = scale
+
+    @classmethod
+    def quantize(cls, matrix: np.ndarray):
+        matrix = np.asarray(matrix, dtype=np.float32)
+        scale = np.abs(matrix).max(axis=1) / 127.0
+        scale[scale == 0] = 1.0
+        data = np.clip(np.rint(matrix / scale[:, None]), -127, 127).astype(np.int8)
+        return cls(data, scale.astype(np.float32))
+
+    @property
+    def shape(self):
+        return self.data.shape
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes + self.scale.nbytes
+
+    def __matmul__(self, other):
+        other = np.asarray(other, dtype=np.float32)
+        rows, dim = self.data.shape
+        out = np.empty((rows,) + other.shape[1:], dtype=np.float32)
+        step = max(1, self.BLOCK_BYTES // (4 * dim))
+        for start in range(0, rows, step):
+            np.matmul(self.data[start:start + step].astype(np.float32), other, out=out[start:start + step])
+        out *= self.scale.reshape((rows,) + (1,) * (out.ndim - 1))
+        return out
+
+    def __len__(self):
+        return self.data.shape[0]
+
+
+def pack_matrix(matrix, storage: str = "float32"):
+    """Normalize rows and store them as float32 or int8 ("int8" → Int8Matrix)."""
+    matrix = normalize_rows(matrix)
+    return Int8Matrix.quantize(matrix) if storage == "int8" else matrix
+
+
+# Full output size per embedding model, the baseline for memory reporting
+NATIVE_DIMENSIONS = {"text-embedding-3-large": 3072, "text-embedding-3-small": 1536, "text-embedding-ada-002": 1536}
+
+
+def log_matrix_memory(label: str, matrix):
+    """Log the footprint of an embedding matrix next to full-size float64 storage."""
+    rows, dim = matrix.shape
+    baseline = rows * NATIVE_DIMENSIONS.get(embedding_space()[0], dim) * 8
+    logger.info(
+        f"[Evaluator] {label}: {rows}×{dim} {getattr(matrix, 'dtype', 'int8')} = "
+        f"{matrix.nbytes / 1024:.1f} KiB (full-size float64: {baseline / 1024:.1f} KiB, "
+        f"{baseline / max(matrix.nbytes, 1):.1f}× smaller)"
+    )
+
+
+# Raw cosine of (an unrelated summary, an objective clearly covered) per backend. Scores are
+# mapped linearly between the two onto one [0, 1] scale, so the covered threshold, the
+# coverage timeline and the EWMA mean the same thing whichever backend produced them (an
+# API failure in "auto" mode must not read as a coverage collapse).
+SCORE_CALIBRATION = {"openai": (0.10, 0.60), "local": (0.0, 0.30)}
+
+
+def coverage_matrix(objective_matrix, segment_matrix, backend: str = "openai") -> np.ndarray:
+    """
+    Score every objective against every summary/segment in one matmul.
+
+    Both inputs must be row-normalized (dense or scipy.sparse); returns an
+    (objectives × segments) float32 matrix of calibrated scores (see SCORE_CALIBRATION).
+    """
+    sims = objective_matrix @ segment_matrix.T
+    if sp.issparse(sims):
+        sims = sims.toarray()
+    return calibrate(sims, backend)
+
+
+def calibrate(sims, backend: str = "openai") -> np.ndarray:
+    """Map raw cosine similarities of `backend` onto the shared 0–1 score scale."""
+    unrelated, covered = SCORE_CALIBRATION[backend]
+    sims = (np.asarray(sims, dtype=np.float32) - unrelated) / (covered - unrelated)
+    return np.clip(sims, 0.0, 1.0)
+
+
+def reduce_coverage(coverage: np.ndarray, how: str = "max") -> np.ndarray:
+    """Collapse a coverage matrix to one score per objective ("max" or "mean" over segments)."""
+    if coverage.shape[1] == 0:
+        return np.zeros(coverage.shape[0], dtype=np.float32)
+    return coverage.mean(axis=1) if how == "mean" else coverage.max(axis=1)
+
+
+def relevance_label(score: float) -> str:
+    if score > 0.85:
+        return "Highly Relevant"
+    elif score > 0.6:
+        return "Relevant"
+    elif score > 0.4:
+        return "Somewhat Related"
+    return "Irrelevant"
+
+
+class ObjectiveSet:
+    """
+    Objectives with their embeddings stacked into one pre-normalized matrix
+    (float32, or int8 with `storage="int8"`).
+
+    `backend` is "openai" (API embeddings), "local" (offline hashed TF-IDF) or "auto"
+    (API scores when reachable, local as the offline fallback). The "evaluation" route is
+    pinned when the set is built: summaries scored against it are embedded with the same
+    model, even if the route is changed in config.yaml mid-meeting.
+    """
+
+    def __init__(self, objectives: dict, backend: str = "openai", storage: str = "float32"):
+        self.names = list(objectives.keys())
+        self.descriptions = list(objectives.values())
+        self.backend = backend
+        self.route = get_model("evaluation")
+        self.space = embedding_space(self.route)[2]
+        self.matrix = None
+        if self.descriptions and backend in ("openai", "auto"):
+            try:
+                self.matrix = pack_matrix(embed_texts(self.descriptions, route=self.route), storage)
+                log_matrix_memory("Objective matrix", self.matrix)
+            except Exception as e:
+                if backend == "openai":
+                    raise
+                logger.warning(f"[Evaluator] Objective embeddings unavailable, using local backend only: {e}")
+
+        self.local = None
+        self._local_matrix, self._local_version = None, -1
+        if self.descriptions and backend in ("local", "auto"):
+            self.local = HashingTfidfEmbedder()
+            self.local.fit_partial(self.descriptions)
+
+    def local_matrix(self):
+        """Objective TF-IDF rows, re-derived whenever the embedder's IDF has moved on."""
+        if self._local_version != self.local.version:
+            self._local_matrix = self.local.transform(self.descriptions)
+            self._local_version = self.local.version
+        return self._local_matrix
+
+    def __len__(self):
+        return len(self.names)
+
+
+_mismatched_spaces = set()
+
+
+def _warn_space_mismatch(library_space: str, objective_space: str):
+    """The library index was built in another embedding space: its matches would be meaningless."""
+    if (library_space, objective_space) not in _mismatched_spaces:
+        _mismatched_spaces.add((library_space, objective_space))
+        logger.warning(
+            f"[Evaluator] Library index is in {library_space}, objectives in {objective_space}; "
+            f"library matches are skipped until both are rebuilt"
+        )
+
+
+def _scored(objectives: ObjectiveSet, scores: np.ndarray) -> dict:
+    return {
+        name: {"score": round(score, 2), "label": relevance_label(score)}
+        for name, score in zip(objectives.names, scores.tolist())
+    }
+
+
+def evaluate_objectives(objectives, partial_summary: str, threshold: float = 1.0,
+                        segments=None, reduce: str = "max", library=None, library_k: int = 5,
+                        session_id: str = None):
+    """
+    Evaluate objectives vs partial summary using embeddings (no torch needed).
+    Speaker participation is tracked from segment timestamps (see utils.participation).
+
+    `objectives` is a {name: description} dict or a prepared ObjectiveSet (whose backend
+    decides between OpenAI and local embeddings). Optional `segments` (e.g. summary bullets)
+    are embedded together with the summary; `reduce` picks how the per-segment scores
+    collapse per objective. With a `library` VectorIndex, the best-matching library items
+    for the summary are returned under "library" (API embeddings only). Embedding usage is
+    recorded under `session_id`; the route stays process-wide, as the objectives' vectors
+    must share its embedding space.
+    """
+
+    if not isinstance(objectives, ObjectiveSet):
+        objectives = ObjectiveSet(objectives)
     results = {}
-    for obj, desc, emb in zip(objectives.keys(), objectives.values(), embeddings[:-1]):
-        score = cosine_similarity(emb, summary_emb)
-        score = float((score + 1) / 2)  # normalize [-1, 1] → [0, 1]
-        if score > 0.85:
-            label = "Highly Relevant"
-        elif score > 0.6:
-            label = "Relevant"
-        elif score > 0.4:
-            label = "Somewhat Related"
-        else:
-            label = "Irrelevant"
-
-        results[obj] = {"score": round(score, 2), "label": label}
-
-    results["user"] = silent_speakers
+    if len(objectives):
+        texts = [partial_summary] + [t for t in (segments or []) if t.strip()]
+        if objectives.local is not None:
+            # Keep the fallback's IDF current, but only embed and score locally when needed
+            objectives.local.fit_partial(texts)
+
+        # --- API embeddings (objectives come from the cache after the first call) ---
+        if objectives.matrix is not None:
+            try:
+                segment_matrix = normalize_rows(
+                    embed_texts(texts, use_cache=False, session_id=session_id, route=objectives.route)
+                )
+                scores = reduce_coverage(coverage_matrix(objectives.matrix, segment_matrix, "openai"), reduce)
+                results = _scored(objectives, scores)
+                if library is not None and library.model != objectives.space:
+                    _warn_space_mismatch(library.model, objectives.space)
+                elif library is not None and len(library):
+                    # Same calibrated scale as the objective scores; `cosine` is the raw similarity
+                    results["library"] = [
+                        {"name": name, "score": round(float(calibrate(cosine)), 2), "cosine": cosine}
+                        for name, cosine in library.search(segment_matrix[:1], library_k)[0]
+                    ]
+            except Exception as e:
+                if objectives.local is None:
+                    raise
+                logger.warning(f"[Evaluator] Embedding API failed, scoring locally: {e}")
+
+        # --- Local backend (offline, sub-millisecond): "local", or "auto" without the API ---
+        if not results and objectives.local is not None:
+            segment_matrix = objectives.local.transform(texts)
+            scores = reduce_coverage(coverage_matrix(objectives.local_matrix(), segment_matrix, "local"), reduce)
+            results = _scored(objectives, scores)
+            logger.debug(f"[Evaluator] Local scores: {results}")
+
     return results
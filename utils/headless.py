@@ -0,0 +1,339 @@
+"""
+Headless daemon for meeting-room boxes: runs MasterController without any Qt import.
+
+Each meeting writes JSON Lines under `<output_dir>/<meeting id>/`:
+    transcript.jsonl   one transcript row per line (speaker, time, text, sentiment, aggression)
+    summaries.jsonl    partial and final summaries
+    events.jsonl       status, coverage, participation, queue and latency reports
+
+Control:
+    signals            SIGTERM / SIGINT stop the meeting and exit (twice: exit now; the
+                       journal keeps the meeting resumable), SIGUSR1 starts a meeting,
+                       SIGUSR2 stops it
+    control socket     a Unix socket taking one command per line (start, stop, pause, resume,
+                       status, quit) and answering with one JSON line; `audioMaster.py ctl`
+                       is its client
+"""
+
+import os
+import sys
+import json
+import argparse
+import time
+import queue
+import signal
+import socket
+import threading
+
+from utils.logger import get_logger
+from utils.config_service import get_config_service
+
+logger = get_logger("../config.yaml")
+
+COMMANDS = ("start", "stop", "pause", "resume", "status", "quit")
+
+# ui_queue message types → output file; streamed tokens are skipped, the full text follows
+_FILES = {"transcript": "transcript", "partial": "summaries", "final": "summaries"}
+_SKIPPED = ("partial_start", "partial_delta", "final_start", "final_delta")
+
+
+class JsonlSink:
+    """Writes one meeting's ui_queue messages to JSON Lines files, flushed per line."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._files = {}
+        self.counts = {}
+
+    def write(self, msg: dict):
+        msg_type = msg.get("type")
+        if msg_type in _SKIPPED:
+            return
+        name = _FILES.get(msg_type, "events")
+        record = {k: v for k, v in msg.items() if k != "trace"}
+        record["ts"] = time.time()
+        f = self._files.get(name)
+        if f is None:
+            f = self._files[name] = open(os.path.join(self.directory, f"{name}.jsonl"), "a", encoding="utf-8")
+        f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        f.flush()
+        self.counts[name] = self.counts.get(name, 0) + 1
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._files = {}
+
+
+class ControlServer(threading.Thread):
+    """Unix-socket front end: hands each command to the daemon loop and sends back its reply."""
+
+    def __init__(self, path: str, submit):
+        super().__init__(daemon=True, name="ControlSocket")
+        self.path = path
+        self.submit = submit  # submit(command) → reply dict
+        if os.path.exists(path):
+            os.remove(path)  # left behind by a killed daemon
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(path)
+        os.chmod(path, 0o600)
+        self.sock.listen(4)
+
+    def run(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return  # closed
+            with conn, conn.makefile("rwb") as stream:
+                for line in stream:
+                    command = line.decode("utf-8", "replace").strip().lower()
+                    if not command:
+                        continue
+                    reply = self.submit(command)
+                    stream.write((json.dumps(reply, default=str) + "\n").encode("utf-8"))
+                    stream.flush()
+
+    def close(self):
+        try:
+            self.sock.close()
+        finally:
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def send_command(path: str, command: str, timeout: float = 10.0) -> dict:
+    """Client side: send one command to a running daemon and return its reply."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(path)
+        sock.sendall((command + "\n").encode("utf-8"))
+        with sock.makefile("rb") as stream:
+            return json.loads(stream.readline())
+
+
+class HeadlessDaemon:
+    """
+    Drives one MasterController from signals and the control socket, writing its output as JSONL.
+
+    All controller calls happen on the thread running `serve()`: signal handlers and the
+    socket only queue commands.
+    """
+
+    def __init__(self, controller, output_dir: str, socket_path: str = None, meeting: dict = None):
+        self.controller = controller
+        self.output_dir = output_dir
+        self.socket_path = socket_path
+        self.meeting = meeting or {}
+        # (command, reply queue or None); SimpleQueue.put is safe from a signal handler, which may
+        # interrupt serve() inside commands.get()
+        self.commands = queue.SimpleQueue()
+        self.sink = None
+        self.meeting_id = None
+        self._quitting = False
+        self._signals = 0
+        self.server = None
+
+    # --- command intake (any thread) ---
+    def submit(self, command: str, timeout: float = 10.0) -> dict:
+        if command not in COMMANDS:
+            return {"ok": False, "error": f"unknown command {command!r}; expected one of {', '.join(COMMANDS)}"}
+        reply = queue.Queue(maxsize=1)
+        self.commands.put((command, reply))
+        try:
+            return reply.get(timeout=timeout)
+        except queue.Empty:
+            return {"ok": False, "error": "daemon busy"}
+
+    def _on_signal(self, signum, frame):
+        if signum in (signal.SIGTERM, signal.SIGINT):
+            self._signals += 1
+            if self._signals > 1:
+                logger.warning("⚠️ Second stop signal: exiting now (the meeting journal can be resumed).")
+                os._exit(130)
+            self.commands.put(("quit", None))
+        elif signum == getattr(signal, "SIGUSR1", None):
+            self.commands.put(("start", None))
+        elif signum == getattr(signal, "SIGUSR2", None):
+            self.commands.put(("stop", None))
+
+    def install_signal_handlers(self):
+        for name in ("SIGTERM", "SIGINT", "SIGUSR1", "SIGUSR2"):
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), self._on_signal)
+
+    # --- commands (serve() thread) ---
+    def status(self) -> dict:
+        c = self.controller
+        return {
+            "session": c.session_id,
+            "meeting": self.meeting_id,
+            "running": c.is_running(),
+            "stopping": c.is_stopping(),
+            "paused": not c.pause_event.is_set(),
+            "output": self.sink.directory if self.sink else None,
+            "written": dict(self.sink.counts) if self.sink else {},
+            "capture": c.capture_stats(),
+            "latency": c.latency_report(),
+        }
+
+    def _handle(self, command: str) -> dict:
+        c = self.controller
+        if command == "status":
+            return {"ok": True, **self.status()}
+        if command == "start":
+            if c.is_running() or c.is_stopping():
+                return {"ok": False, "error": "a meeting is already running or still stopping"}
+            self._open_sink()
+            c.start_all()
+            return {"ok": c.is_running(), "meeting": self.meeting_id, "output": self.sink.directory}
+        if command in ("stop", "quit"):
+            self._quitting = self._quitting or command == "quit"
+            if c.is_running() and not c.is_stopping():
+                c.stop_all()
+            return {"ok": True, "stopping": c.is_stopping()}
+        if not c.is_running():
+            return {"ok": False, "error": "no meeting is running"}
+        c.pause_all() if command == "pause" else c.resume_all()
+        return {"ok": True, "paused": not c.pause_event.is_set()}
+
+    def _open_sink(self):
+        self.meeting_id = time.strftime("%Y%m%d-%H%M%S")
+        if self.controller.session_id:
+            self.meeting_id = f"{self.controller.session_id}-{self.meeting_id}"
+        self.sink = JsonlSink(os.path.join(self.output_dir, self.meeting_id))
+        self.sink.write({"type": "meeting", "content": self.meeting, "session": self.controller.session_id})
+        logger.info(f"📝 Writing meeting output to {self.sink.directory}")
+
+    def _drain_ui(self):
+        ui_queue = self.controller.ui_queue
+        latency = self.controller.latency
+        while True:
+            try:
+                msg = ui_queue.get_nowait()
+            except queue.Empty:
+                return
+            trace = msg.get("trace")
+            if trace and latency is not None:
+                latency.record("ui_dispatch", time.time() - trace["queued_at"])
+            if self.sink is not None:
+                self.sink.write(msg)
+            if msg.get("type") == "stopped" and self.sink is not None:
+                logger.info(f"📝 Meeting {self.meeting_id} written: {self.sink.counts}")
+                self.sink.close()
+                self.sink = None
+
+    def serve(self, autostart: bool = True):
+        """Run until `quit` (or SIGTERM / SIGINT) and the meeting has been written out."""
+        if self.socket_path:
+            if hasattr(socket, "AF_UNIX"):
+                self.server = ControlServer(self.socket_path, self.submit)
+                self.server.start()
+                logger.info(f"🔌 Control socket listening on {self.socket_path}")
+            else:
+                logger.warning("⚠️ Unix sockets are not available here; control the daemon with signals.")
+        if autostart:
+            self.commands.put(("start", None))
+        logger.info("🟢 Headless daemon ready.")
+        try:
+            while True:
+                try:
+                    command, reply = self.commands.get(timeout=0.1)
+                except queue.Empty:
+                    command = reply = None
+                if command is not None:
+                    try:
+                        result = self._handle(command)
+                    except Exception as e:
+                        logger.error(f"❌ Command {command!r} failed: {e}", exc_info=True)
+                        result = {"ok": False, "error": str(e)}
+                    if reply is not None:
+                        reply.put(result)
+                self._drain_ui()
+                if self._quitting and not self.controller.is_running() and not self.controller.is_stopping():
+                    self._drain_ui()
+                    break
+        finally:
+            if self.server is not None:
+                self.server.close()
+            if self.sink is not None:
+                self.sink.close()
+            self.controller.close()
+            logger.info("👋 Headless daemon exited.")
+
+
+# ======================================================
+# 🖥️ CLI: python audioMaster.py run | ctl <command>  (or python -m utils.headless)
+# ======================================================
+
+def _load_meeting(args) -> dict:
+    meeting = {}
+    if args.meeting:
+        with open(args.meeting, "r", encoding="utf-8") as f:
+            meeting = json.load(f)
+    if args.purpose:
+        meeting["purpose"] = args.purpose
+    if args.participant:
+        meeting["participants"] = args.participant
+    if args.objective:
+        meeting["objectives"] = args.objective
+    return meeting
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Run the meeting pipeline without the UI, or control a running daemon.")
+    parser.add_argument("--config", default="./config.yaml")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    run = sub.add_parser("run", help="run the headless daemon")
+    run.add_argument("--output", help="directory for the meetings' JSONL output (default: headless.output_dir)")
+    run.add_argument("--socket", help="control socket path (default: headless.control_socket)")
+    run.add_argument("--no-socket", action="store_true", help="signals only")
+    run.add_argument("--session", help="session id (names the journal; one per room)")
+    run.add_argument("--device", type=int, help="audio input device index")
+    run.add_argument("--wait", action="store_true", help="do not start recording until a `start` command")
+    run.add_argument("--meeting", help='JSON file with {"purpose", "participants", "objectives"}')
+    run.add_argument("--purpose")
+    run.add_argument("--participant", action="append")
+    run.add_argument("--objective", action="append")
+
+    ctl = sub.add_parser("ctl", help="send a command to a running daemon")
+    ctl.add_argument("command", choices=COMMANDS)
+    ctl.add_argument("--socket", help="control socket path (default: headless.control_socket)")
+
+    args = parser.parse_args(argv)
+    settings = get_config_service(args.config)
+    base_dir = os.path.dirname(os.path.abspath(args.config))
+    headless_cfg = settings.section("headless")
+    socket_path = args.socket or os.path.join(base_dir, headless_cfg["control_socket"])
+
+    if args.mode == "ctl":
+        try:
+            reply = send_command(socket_path, args.command)
+        except OSError as e:
+            print(f"❌ No daemon listening on {socket_path}: {e}", file=sys.stderr)
+            return 2
+        print(json.dumps(reply, indent=2))
+        return 0 if reply.get("ok") else 1
+
+    from audioMaster import MasterController  # the pipeline (and its API clients) only for `run`
+
+    overrides = {"audio": {"input_device_index": args.device}} if args.device is not None else None
+    controller = MasterController(args.config, ui_queue=queue.Queue(), session_id=args.session, overrides=overrides)
+    meeting = _load_meeting(args)
+    if meeting:
+        controller.initialize_meeting(**meeting)
+    daemon = HeadlessDaemon(
+        controller,
+        output_dir=args.output or os.path.join(base_dir, headless_cfg["output_dir"]),
+        socket_path=None if args.no_socket else socket_path,
+        meeting=meeting,
+    )
+    daemon.install_signal_handlers()
+    daemon.serve(autostart=not args.wait)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+"""
+Append-only, crash-safe session journal.
+
+One JSON record per line, flushed and fsynced as it is written, at chunk granularity:
+    meeting     purpose / participants / objectives
+    captured    a clip as the recorder emits it (seq, offset, end_offset, captured_at); its PCM
+                is saved next to the journal until the clip's WAV is written
+    clip        a captured clip written to WAV (seq, last_seq when merged, offset, end_offset,
+                captured_at, path)
+    dropped     a captured clip the VAD skipped as silence (seq, last_seq when merged)
+    stt         the speech-to-text segments of a clip
+    delta       a clip's segments with tone, in transcript order (seq)
+    partial     a partial summary and the last delta it covers
+    evaluation  objective scores for a partial, at meeting time `at`
+    final       the final summary (the meeting is complete)
+
+`replay()` rebuilds the meeting from the file without calling any API; a torn last line
+from a crash mid-write is ignored.
+"""
+
+import os
+import json
+import time
+import shutil
+import threading
+
+from utils.logger import get_logger
+
+logger = get_logger("../config.yaml")
+
+
+class SessionJournal:
+    """Writer side: thread-safe appends, each one durable before append() returns."""
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.records = 0
+
+    def append(self, record_type: str, **fields):
+        line = json.dumps({"t": record_type, "ts": time.time(), **fields}, ensure_ascii=False)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self.records += 1
+
+    @property
+    def audio_dir(self) -> str:
+        return audio_dir(self.path)
+
+    def save_audio(self, seq: int, pcm) -> str:
+        """Keep a clip's PCM until its WAV is written (as durable as the records); returns the path."""
+        os.makedirs(self.audio_dir, exist_ok=True)
+        path = os.path.join(self.audio_dir, f"{seq:08d}.pcm")
+        with open(path, "wb") as f:
+            f.write(pcm)
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+        return path
+
+    def discard_audio(self, first_seq: int, last_seq: int = None):
+        """The clips' WAV file is journaled: their saved PCM is no longer needed."""
+        for seq in range(first_seq, (last_seq or first_seq) + 1):
+            try:
+                os.remove(os.path.join(self.audio_dir, f"{seq:08d}.pcm"))
+            except FileNotFoundError:
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def audio_dir(path: str) -> str:
+    """Directory of the PCM saved for a journal's not-yet-converted clips."""
+    return f"{path[:-len('.jsonl')] if path.endswith('.jsonl') else path}.clips"
+
+
+def discard_journal_audio(path: str):
+    shutil.rmtree(audio_dir(path), ignore_errors=True)
+
+
+class JournalState:
+    """A meeting as reconstructed from its journal."""
+
+    def __init__(self):
+        self.meeting = None
+        self.captured = {}  # clip seq → captured record (PCM path included)
+        self.clips = {}  # clip seq → clip record
+        self.dropped = {}  # clip seq → dropped record (silent clips skipped by the VAD)
+        self.stt = {}  # clip seq → segments
+        self.deltas = []  # delta records, in seq order
+        self.partials = []  # partial records
+        self.evaluations = []
+        self.final = None
+
+    @property
+    def empty(self) -> bool:
+        return not (self.captured or self.clips or self.deltas or self.partials)
+
+    @property
+    def last_seq(self) -> int:
+        return self.deltas[-1]["seq"] if self.deltas else 0
+
+    @property
+    def next_clip_seq(self) -> int:
+        converted = (c.get("last_seq", seq) for seq, c in self.clips.items())
+        return max(max(converted, default=0), max(self.captured, default=0)) + 1
+
+    @property
+    def next_offset(self) -> float:
+        """Audio offset where recording continues (end of the last journaled clip)."""
+        records = list(self.clips.values()) + list(self.captured.values())
+        return max((c["end_offset"] for c in records), default=0.0)
+
+    def _settled_seqs(self) -> set:
+        """Captured clips that were written to WAV or dropped as silence."""
+        records = list(self.clips.items()) + list(self.dropped.items())
+        return {s for seq, c in records for s in range(seq, c.get("last_seq", seq) + 1)}
+
+    def pending_capture(self) -> list:
+        """Captured clips that never reached a WAV file (queued or spilled at the crash), with their PCM."""
+        converted = self._settled_seqs()
+        out = []
+        for seq, rec in sorted(self.captured.items()):
+            if seq in converted or not os.path.exists(rec["pcm"]):
+                continue
+            with open(rec["pcm"], "rb") as f:
+                pcm = f.read()
+            out.append({"pcm": pcm, "seq": seq, "offset": rec["offset"], "captured_at": rec["captured_at"]})
+        return out
+
+    def _done_clips(self) -> set:
+        return {d["clip"] for d in self.deltas}
+
+    def pending_clips(self) -> list:
+        """Clips on disk that never got a transcript: they still need speech-to-text."""
+        return [
+            c for seq, c in sorted(self.clips.items())
+            if seq not in self.stt and seq not in self._done_clips() and os.path.exists(c["path"])
+        ]
+
+    def pending_tone(self) -> list:
+        """Transcribed clips whose delta was never emitted: only tone analysis is missing."""
+        done = self._done_clips()
+        out = []
+        for seq, segments in sorted(self.stt.items()):
+            if seq in done or not segments:
+                continue
+            clip = self.clips.get(seq, {})
+            out.append({
+                "clip": seq, "offset": clip.get("offset", 0.0), "captured_at": clip.get("captured_at"),
+                "segments": segments,
+            })
+        return out
+
+    def unsummarized_deltas(self) -> list:
+        """Deltas after the last successful partial summary."""
+        covered = self.partials[-1]["last_seq"] if self.partials else 0
+        return [d for d in self.deltas if d["seq"] > covered]
+
+
+def replay(path: str) -> JournalState:
+    """Read a journal into a JournalState."""
+    state = JournalState()
+    with open(path, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    for i, line in enumerate(lines):
+        try:
+            rec = json.loads(line)
+        except json.JSONDecodeError:
+            if i == len(lines) - 1:
+                logger.warning(f"[Journal] Ignoring torn last record in {path}")
+                break
+            raise
+        kind = rec.pop("t")
+        rec.pop("ts", None)
+        if kind == "meeting":
+            state.meeting = rec
+        elif kind == "captured":
+            state.captured[rec["seq"]] = rec
+        elif kind == "clip":
+            state.clips[rec["seq"]] = rec
+        elif kind == "dropped":
+            state.dropped[rec["seq"]] = rec
+        elif kind == "stt":
+            state.stt[rec["clip"]] = rec["segments"]
+        elif kind == "delta":
+            state.deltas.append(rec)
+        elif kind == "partial":
+            state.partials.append(rec)
+        elif kind == "evaluation":
+            state.evaluations.append(rec)
+        elif kind == "final":
+            state.final = rec.get("summary")
+    state.deltas.sort(key=lambda d: d["seq"])
+    return state
@@ -0,0 +1,133 @@
+"""
+Latency instrumentation from mic capture to UI row.
+
+Every clip carries a trace context (a plain dict, so it survives queue spilling) stamped
+by the recorder; stage runners record how long items waited in their input queue and how
+long the stage took, and the tone stage records how stale each transcript row is when it
+reaches ui_queue. Latencies go into log-bucketed histograms (O(1) per sample, fixed memory)
+that report p50/p95/p99.
+"""
+
+import time
+import math
+import bisect
+import threading
+
+from utils.logger import get_logger
+
+logger = get_logger("../config.yaml")
+
+# Bucket upper edges: 10 per decade from 1 ms to ~1 hour (interpolated within a bucket)
+_BUCKET_EDGES = [10 ** (e / 10) for e in range(-30, 36)]
+
+
+def new_trace(captured_at: float, ready_at: float = None, time_scale: float = 1.0) -> dict:
+    """
+    Trace context for one clip: capture start/end (wall clock) and the last hand-off time.
+    `time_scale` is wall seconds per audio second (1 for a microphone, 1/speed for a replay).
+    """
+    ready_at = time.time() if ready_at is None else ready_at
+    return {"captured_at": captured_at, "ready_at": ready_at, "handoff": ready_at, "time_scale": time_scale}
+
+
+def trace_of(item):
+    """The trace context carried by a queue item, if any."""
+    return item.get("trace") if isinstance(item, dict) else None
+
+
+class LatencyHistogram:
+    """Fixed log-spaced buckets plus exact count, sum, min and max."""
+
+    def __init__(self):
+        self.counts = [0] * (len(_BUCKET_EDGES) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        seconds = max(0.0, seconds)
+        self.counts[bisect.bisect_left(_BUCKET_EDGES, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+
+    def percentile(self, p: float) -> float:
+        """p-th percentile, interpolated within its bucket and clamped to the observed range."""
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100.0))
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if seen + c >= rank:
+                lower = _BUCKET_EDGES[i - 1] if i > 0 else 0.0
+                upper = _BUCKET_EDGES[i] if i < len(_BUCKET_EDGES) else self.max
+                value = lower + (upper - lower) * (rank - seen) / c
+                return min(max(value, self.min), self.max)
+            seen += c
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "p50": round(self.percentile(50), 3),
+            "p95": round(self.percentile(95), 3),
+            "p99": round(self.percentile(99), 3),
+            "max": round(self.max, 3),
+        }
+
+
+class LatencyTracker:
+    """Thread-safe set of named histograms: "wait.<stage>", "stage.<stage>", "end_to_end", ..."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        with self._lock:
+            hist = self._histograms.get(name)
+            if hist is None:
+                hist = self._histograms[name] = LatencyHistogram()
+            hist.record(seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {name: h.summary() for name, h in sorted(self._histograms.items())}
+
+    def log_report(self, title: str = "Latency"):
+        for name, s in self.snapshot().items():
+            logger.info(
+                f"[{title}] {name:<22} n={s['count']:<5} p50={s['p50']:.2f}s p95={s['p95']:.2f}s "
+                f"p99={s['p99']:.2f}s max={s['max']:.2f}s"
+            )
+
+
+class LatencyMonitor(threading.Thread):
+    """Periodically logs the latency histograms and pushes them to the UI as a "latency" message."""
+
+    def __init__(self, tracker: LatencyTracker, interval: float = 30.0, ui_queue=None):
+        super().__init__(daemon=True, name="LatencyMonitor")
+        self.tracker = tracker
+        self.interval = interval
+        self.ui_queue = ui_queue
+        self._stopped = threading.Event()
+
+    def stop(self):
+        """Report the session totals once more and exit."""
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            self.report()
+        self.report(final=True)
+
+    def report(self, final: bool = False):
+        snapshot = self.tracker.snapshot()
+        if not snapshot:
+            return
+        self.tracker.log_report("Latency (session)" if final else "Latency")
+        if self.ui_queue:
+            self.ui_queue.put({"type": "latency", "content": snapshot, "final": final})
@@ -0,0 +1,94 @@
+"""
+Offline embedding backend for the evaluator: hashing vectorizer + TF-IDF with sublinear tf.
+No network and no fitted vocabulary — terms are hashed into a fixed sparse space, and
+document frequencies are accumulated from every text the embedder has seen.
+"""
+
+import re
+import zlib
+import threading
+import numpy as np
+import scipy.sparse as sp
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:'[a-z]+)?")
+
+# Too frequent in meeting language to carry topic signal
+STOP_WORDS = frozenset("""
+a an and are as at be but by for from has have i in is it its of on or our so that the their
+them they this to was we were will with you your he she his her not do does did can could would
+should just about into than then there these those what which who also been being if
+""".split())
+
+
+def tokenize(text: str):
+    """Lowercased word unigrams plus adjacent-word bigrams, stop words removed."""
+    words = [w for w in _TOKEN_RE.findall(text.lower()) if w not in STOP_WORDS]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class HashingTfidfEmbedder:
+    """
+    Sparse TF-IDF vectors in a hashed feature space.
+
+    Term frequencies are sublinear (1 + log tf), features are signed by a hash bit to cancel
+    collisions on average, IDF is smoothed, and rows are L2-normalized float32 CSR.
+    """
+
+    def __init__(self, n_features: int = 2 ** 18):
+        self.n_features = n_features
+        self.doc_freq = np.zeros(n_features, dtype=np.int32)
+        self.n_docs = 0
+        self.version = 0  # bumps whenever the IDF changes
+        self._lock = threading.Lock()
+
+    def _hash_counts(self, text: str):
+        counts = {}
+        for token in tokenize(text):
+            h = zlib.crc32(token.encode("utf-8"))
+            idx = h % self.n_features
+            sign = 1.0 if (h >> 31) & 1 else -1.0
+            tf, _ = counts.get(idx, (0, sign))
+            counts[idx] = (tf + 1, sign)
+        return counts
+
+    def fit_partial(self, texts):
+        """Add texts to the document-frequency statistics."""
+        with self._lock:
+            for text in texts:
+                idx = np.fromiter(self._hash_counts(text).keys(), dtype=np.int64)
+                if idx.size:
+                    self.doc_freq[idx] += 1
+                self.n_docs += 1
+            self.version += 1
+
+    def idf(self, indices: np.ndarray) -> np.ndarray:
+        return np.log((1.0 + self.n_docs) / (1.0 + self.doc_freq[indices])) + 1.0
+
+    def transform(self, texts) -> sp.csr_matrix:
+        """Embed texts with the current IDF as L2-normalized float32 CSR rows."""
+        indptr, indices, data = [0], [], []
+        with self._lock:
+            for text in texts:
+                counts = self._hash_counts(text)
+                idx = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+                if idx.size:
+                    tf = np.array([c for c, _ in counts.values()], dtype=np.float32)
+                    sign = np.array([s for _, s in counts.values()], dtype=np.float32)
+                    weights = sign * (1.0 + np.log(tf)) * self.idf(idx)
+                    norm = np.linalg.norm(weights)
+                    if norm > 0:
+                        weights /= norm
+                    order = np.argsort(idx)
+                    indices.extend(idx[order].tolist())
+                    data.extend(weights[order].astype(np.float32).tolist())
+                indptr.append(len(indices))
+        return sp.csr_matrix(
+            (np.asarray(data, dtype=np.float32), np.asarray(indices, dtype=np.int32), np.asarray(indptr)),
+            shape=(len(texts), self.n_features),
+        )
+
+    def embed(self, texts, update_idf: bool = True) -> sp.csr_matrix:
+        """Optionally learn from texts, then embed them."""
+        if update_idf:
+            self.fit_partial(texts)
+        return self.transform(texts)
@@ -1,19 +1,19 @@
 """
 Dynamic, centralized logger with YAML config.
-Supports live reloading of all logging parameters (level, file, rotation).
+Supports live reloading of all logging parameters (level, file, rotation) through the
+`logging` section change events of the config service.
 """
 
 import os
-import yaml
-import time
 import logging
 import threading
 from logging.handlers import RotatingFileHandler
 
+from utils.config_service import get_config_service
+
 _logger_initialized = False
 _logger_lock = threading.Lock()
 _config_path = None
-_config_last_modified = 0
 
 
 # ============================================================
@@ -28,12 +28,10 @@ def _resolve_path(path: str) -> str:
     return path
 
 
-def _load_config() -> dict:
-    """Load YAML logging configuration."""
-    global _config_path
-    with open(_config_path, "r") as f:
-        data = yaml.safe_load(f) or {}
-    cfg = data.get("logging", {})
+def _load_config(cfg: dict = None) -> dict:
+    """Logging settings from the (validated) `logging` section."""
+    if cfg is None:
+        cfg = get_config_service(_config_path).section("logging")
     return {
         "level": cfg.get("level", "INFO").upper(),
         "file": cfg.get("file", "logs/app.log"),
@@ -87,28 +85,13 @@ def _apply_new_config(logger, new_cfg):
     )
 
 
-def _watch_config(logger):
-    """Monitor YAML file and reload configuration dynamically."""
-    global _config_last_modified
-    while True:
-        try:
-            mtime = os.path.getmtime(_config_path)
-            if mtime != _config_last_modified:
-                _config_last_modified = mtime
-                new_cfg = _load_config()
-                _apply_new_config(logger, new_cfg)
-        except Exception as e:
-            logger.error(f"[LOGGER] Config watcher error: {e}")
-        time.sleep(5)  # check every 5 seconds
-
-
 # ============================================================
 # Initialization
 # ============================================================
 
 def setup_logger(config_path: str) -> logging.Logger:
-    """Initialize logger and start watching for config changes."""
-    global _logger_initialized, _config_path, _config_last_modified
+    """Initialize logger and subscribe to changes of the `logging` config section."""
+    global _logger_initialized, _config_path
     if _logger_initialized:
         return logging.getLogger()
 
@@ -121,7 +104,6 @@ def setup_logger(config_path: str) -> logging.Logger:
             raise FileNotFoundError(f"[LOGGER] Config file not found: {_config_path}")
 
         cfg = _load_config()
-        _config_last_modified = os.path.getmtime(_config_path)
 
         # ---- Setup logger ----
         logger = logging.getLogger()
@@ -150,13 +132,14 @@ def setup_logger(config_path: str) -> logging.Logger:
         logger.addHandler(file_handler)
         logger.addHandler(console_handler)
 
-        # Start watcher thread
-        watcher = threading.Thread(target=_watch_config, args=(logger,), daemon=True)
-        watcher.start()
+        # Re-apply whenever the config service publishes a new `logging` section
+        get_config_service(_config_path).subscribe(
+            "logging", lambda new, old: _apply_new_config(logger, _load_config(new))
+        )
 
         logger.info(f"[LOGGER] Initialized using {_config_path}")
         logger.info(f"[LOGGER] Writing logs to {cfg['file']}")
-        logger.info(f"[LOGGER] Watching for live config updates every 5s")
+        logger.info(f"[LOGGER] Following live config updates")
 
         _logger_initialized = True
         return logger
@@ -0,0 +1,120 @@
+"""
+Per-task model routing and usage accounting for OpenAI calls.
+Each pipeline task (tone, partial, final, evaluation) maps to a model, max_tokens and timeout
+in the `models:` section of config.yaml; a session may route through its own view of that
+section (its overrides applied). Latency and token usage are recorded per session and task.
+"""
+
+import os
+import threading
+
+from utils.logger import get_logger
+from utils.config_service import get_config_service
+
+logger = get_logger("../config.yaml")
+
+DEFAULT_MODELS = {
+    "tone": {"model": "gpt-4o-mini", "max_tokens": 100, "timeout": 15},
+    "partial": {"model": "gpt-4o", "max_tokens": 1200, "timeout": 60},
+    "final": {"model": "gpt-4o", "max_tokens": 1200, "timeout": 60},
+    "evaluation": {"model": "text-embedding-3-large", "max_tokens": None, "timeout": 30, "dimensions": None},
+}
+
+_DEFAULT_CONFIG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "config.yaml")
+
+_lock = threading.Lock()
+_models = None
+_usage = {}  # session_id (None for a single-session controller) → task → stats
+_subscribed = set()  # config files whose `models` section we follow
+
+
+def configure_models(config_path: str = _DEFAULT_CONFIG) -> dict:
+    """Load the `models:` section and follow its changes, falling back to DEFAULT_MODELS per task and field."""
+    service = get_config_service(config_path)
+    with _lock:
+        subscribe = service.path not in _subscribed
+        _subscribed.add(service.path)
+    if subscribe:
+        # Routing changes apply to the next call of each task, mid-meeting included
+        service.subscribe("models", lambda new, old: _apply_models(new))
+    return _apply_models(service.section("models"))
+
+
+def _resolve(task: str, configured: dict) -> dict:
+    entry = dict(DEFAULT_MODELS.get(task, DEFAULT_MODELS["partial"]))
+    entry.update(configured.get(task) or {})
+    return entry
+
+
+def _space(route: dict) -> str:
+    return route["model"] if not route.get("dimensions") else f"{route['model']}@{int(route['dimensions'])}"
+
+
+def _apply_models(configured: dict) -> dict:
+    global _models
+    models = {task: _resolve(task, configured) for task in set(DEFAULT_MODELS) | set(configured)}
+
+    with _lock:
+        previous, _models = _models, models
+    if previous is not None and _space(previous["evaluation"]) != _space(models["evaluation"]):
+        logger.warning(
+            f"[Models] Evaluation embeddings changed {_space(previous['evaluation'])} → "
+            f"{_space(models['evaluation'])}: meetings already started keep scoring in their own space"
+        )
+    logger.info(
+        "[Models] Routing: " + ", ".join(f"{t}={m['model']}" for t, m in sorted(models.items()))
+    )
+    return models
+
+
+def get_model(task: str, models: dict = None) -> dict:
+    """
+    Return {model, max_tokens, timeout} (plus `dimensions` for embeddings) for a pipeline task.
+    `models` is a session's view of the `models` section; without it the process-wide routing applies.
+    """
+    if models is not None:
+        return _resolve(task if task in DEFAULT_MODELS or task in models else "partial", models)
+    if _models is None:
+        configure_models()
+    return dict(_models.get(task) or _models["partial"])
+
+
+def record_call(task: str, model: str, latency: float, prompt_tokens: int = 0, completion_tokens: int = 0,
+                session_id: str = None):
+    """Accumulate latency and token usage for one API call of a session."""
+    with _lock:
+        stats = _usage.setdefault(session_id, {}).setdefault(task, {
+            "model": model, "calls": 0, "total_latency": 0.0, "max_latency": 0.0,
+            "prompt_tokens": 0, "completion_tokens": 0,
+        })
+        stats["model"] = model
+        stats["calls"] += 1
+        stats["total_latency"] += latency
+        stats["max_latency"] = max(stats["max_latency"], latency)
+        stats["prompt_tokens"] += prompt_tokens or 0
+        stats["completion_tokens"] += completion_tokens or 0
+    logger.debug(
+        f"[Models] {task}{f' [{session_id}]' if session_id else ''} | model={model} | latency={latency:.2f}s | "
+        f"prompt_tokens={prompt_tokens} | completion_tokens={completion_tokens}"
+    )
+
+
+def usage_report(session_id: str = None) -> dict:
+    """Snapshot of a session's per-task call counts, latency and token totals."""
+    with _lock:
+        report = {}
+        for task, stats in _usage.get(session_id, {}).items():
+            report[task] = dict(stats)
+            report[task]["avg_latency"] = round(stats["total_latency"] / stats["calls"], 3)
+        return report
+
+
+def log_usage_report(session_id: str = None):
+    """Write a session's per-task usage table to the log."""
+    label = f" [{session_id}]" if session_id else ""
+    for task, stats in sorted(usage_report(session_id).items()):
+        logger.info(
+            f"[Models]{label} {task:<10} | {stats['model']} | calls={stats['calls']} | "
+            f"avg={stats['avg_latency']:.2f}s | max={stats['max_latency']:.2f}s | "
+            f"prompt_tokens={stats['prompt_tokens']} | completion_tokens={stats['completion_tokens']}"
+        )
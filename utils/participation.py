@@ -0,0 +1,117 @@
+"""
+Speaker participation statistics computed from transcript segment timestamps.
+Segments arrive per chunk with absolute start/end times; every statistic is updated in
+O(new segments), nothing is recomputed from the full transcript.
+"""
+
+
+class _SpeakerStats:
+    __slots__ = ("talk_time", "turns", "longest_monologue", "interruptions", "interrupted",
+                 "overlap", "last_end")
+
+    def __init__(self):
+        self.talk_time = 0.0
+        self.turns = 0
+        self.longest_monologue = 0.0
+        self.interruptions = 0  # times this speaker started while someone else was still talking
+        self.interrupted = 0  # times someone else started while this speaker was talking
+        self.overlap = 0.0  # seconds of speech overlapping the previous speaker
+        self.last_end = 0.0
+
+
+class ParticipationTracker:
+    """
+    Per-speaker talk time, turns, longest monologue, interruptions/overlaps and silence.
+
+    A turn is a run of one speaker's segments; a pause longer than `max_pause` seconds
+    starts a new turn even for the same speaker. Speakers quiet for `silence_alert`
+    seconds of meeting time are reported as silent.
+    """
+
+    def __init__(self, participants=None, max_pause: float = 2.0, silence_alert: float = 120.0):
+        self.participants = list(participants or [])
+        self.max_pause = max_pause
+        self.silence_alert = silence_alert
+        self.speakers = {}
+        self.clock = 0.0  # meeting time of the latest segment end
+        self._last_speaker = None
+        self._turn_start = 0.0
+        self._turn_end = 0.0
+
+    def update(self, segments):
+        """Account for the segments of one transcribed chunk."""
+        for seg in sorted(segments, key=lambda s: s.get("start", 0.0)):
+            speaker = seg.get("speaker") or "Unknown"
+            start, end = float(seg.get("start", 0.0)), float(seg.get("end", 0.0))
+            if end < start:
+                start, end = end, start
+            stats = self.speakers.get(speaker)
+            if stats is None:
+                stats = self.speakers[speaker] = _SpeakerStats()
+
+            stats.talk_time += end - start
+            previous = self._last_speaker
+            if speaker != previous:
+                if previous is not None and start < self._turn_end:
+                    stats.interruptions += 1
+                    stats.overlap += min(end, self._turn_end) - start
+                    self.speakers[previous].interrupted += 1
+                self._new_turn(stats, start, end)
+            elif start - self._turn_end > self.max_pause:
+                self._new_turn(stats, start, end)
+            else:
+                self._turn_end = max(self._turn_end, end)
+
+            self._last_speaker = speaker
+            stats.longest_monologue = max(stats.longest_monologue, self._turn_end - self._turn_start)
+            stats.last_end = max(stats.last_end, end)
+            self.clock = max(self.clock, end)
+
+    def _new_turn(self, stats, start, end):
+        stats.turns += 1
+        self._turn_start, self._turn_end = start, end
+
+    def silent_speakers(self):
+        """Speakers heard before but quiet for at least `silence_alert` seconds."""
+        return sorted(
+            name for name, stats in self.speakers.items()
+            if self.clock - stats.last_end >= self.silence_alert
+        )
+
+    def unheard(self) -> int:
+        """Expected participants beyond the number of distinct voices heard so far."""
+        return max(0, len(self.participants) - len(self.speakers))
+
+    def snapshot(self) -> dict:
+        total = sum(s.talk_time for s in self.speakers.values()) or 1.0
+        return {
+            "clock": round(self.clock, 1),
+            "speakers": {
+                name: {
+                    "talk_time": round(s.talk_time, 1),
+                    "share": round(s.talk_time / total, 3),
+                    "turns": s.turns,
+                    "longest_monologue": round(s.longest_monologue, 1),
+                    "interruptions": s.interruptions,
+                    "interrupted": s.interrupted,
+                    "overlap": round(s.overlap, 1),
+                    "silence": round(self.clock - s.last_end, 1),
+                }
+                for name, s in sorted(self.speakers.items())
+            },
+            "silent": self.silent_speakers(),
+            "unheard": self.unheard(),
+        }
+
+    def report(self) -> str:
+        """Plain-text participation table for the final report."""
+        snap = self.snapshot()
+        lines = [f"{'Speaker':<12} {'Talk':>7} {'Share':>6} {'Turns':>6} {'Longest':>8} {'Intr.':>6} {'Silent':>7}"]
+        for name, s in snap["speakers"].items():
+            lines.append(
+                f"{name:<12} {s['talk_time']:>6.0f}s {s['share']:>6.0%} {s['turns']:>6} "
+                f"{s['longest_monologue']:>7.0f}s {s['interruptions']:>6} {s['silence']:>6.0f}s"
+            )
+        if snap["unheard"]:
+            lines.append(f"{snap['unheard']} expected participant(s) not heard.")
+        return "\n".join(lines)
@@ -1,21 +1,31 @@
 import threading
 import queue
+import asyncio
 import time
 import pyaudio
-import wave
 import json
 import yaml
-import copy
 import os
+import wave
+import numpy as np
+from collections import deque
+from concurrent.futures import Future
 from openai import OpenAI
 from datetime import datetime
 from dotenv import load_dotenv
 load_dotenv()
 
 from utils.logger import get_logger  # Import your dynamic logger
-from utils.transcription_assemblyai import transcribe_chunk, summarize_text
-from utils.transcription_assemblyai import get_global_state
+from utils.transcription_assemblyai import transcribe_segments, transcribe_segments_async, summarize_text
 from utils.evaluator import evaluate_objectives
+from utils.scheduler import PartialScheduler
+from utils.coverage_timeline import CoverageTimeline
+from utils.participation import ParticipationTracker
+from utils.model_router import get_model, record_call
+from utils.stages import Stage, SourceStage
+from utils.latency import new_trace
+from utils.audio_kernels import write_wav
+from utils.capture_process import CaptureProcess
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 openai_client = OpenAI(api_key=OPENAI_API_KEY)
@@ -29,231 +39,296 @@ logger.info("🔧 Audio processing pipeline initialized.")
 
 
 # ============================================================
-#  Recorder Thread
+#  Recorder Stage
 # ============================================================
 
 
+class RecorderStage(SourceStage):
+    """Source stage: captures fixed-duration microphone clips stamped with seq, audio offset and capture time."""
 
-
-
-# class RecorderThread(threading.Thread):
-#     def __init__(self, record_q, stop_event, pause_event, config_path="config.yaml"):
-#         super().__init__(daemon=True, name="RecorderThread")
-#         self.record_q = record_q
-#         self.stop_event = stop_event
-#         self.pause_event = pause_event
-#         self.config_path = config_path
-#         self.logger = get_logger(config_path)
-
-#         # --- Load config dynamically ---
-#         import yaml, os
-#         with open(config_path, "r") as f:
-#             cfg = yaml.safe_load(f) or {}
-#         audio_cfg = cfg.get("audio", {})
-
-#         self.rate = int(audio_cfg.get("rate", 16000))
-#         self.chunk_size = int(audio_cfg.get("chunk_size", 1024))
-#         # ✅ Duration no longer used — recorder runs continuously
-#         self.duration = None  
-
-#         self.pa = pyaudio.PyAudio()
-#         self.logger.info(
-#             f"🎙️ Recorder initialized | rate={self.rate}, chunk_size={self.chunk_size}, duration=dynamic"
-#         )
-
-#         self.frames = []  # buffer to hold entire ongoing recording
-
-#     def run(self):
-#         """Continuously capture microphone audio until stopped. Flush on pause or stop."""
-#         self.logger.info("🎙️ Recorder started.")
-#         stream = None
-#         try:
-#             stream = self.pa.open(
-#                 format=pyaudio.paInt16,
-#                 channels=1,
-#                 rate=self.rate,
-#                 input=True,
-#                 frames_per_buffer=self.chunk_size,
-#             )
-
-#             while not self.stop_event.is_set():
-#                 # Wait if paused
-#                 if not self.pause_event.is_set():
-#                     time.sleep(0.1)
-#                     continue
-
-#                 try:
-#                     data = stream.read(self.chunk_size, exception_on_overflow=False)
-#                     self.frames.append(data)
-#                 except IOError as e:
-#                     self.logger.warning(f"[Recorder] Buffer overflow: {e}", exc_info=True)
-
-#             # When stop is triggered → flush the final chunk
-#             if self.frames:
-#                 pcm_data = b"".join(self.frames)
-#                 self.record_q.put(pcm_data)
-#                 self.logger.info(
-#                     f"[Recorder] Captured {len(self.frames)} frames ({len(self.frames) * self.chunk_size / self.rate:.2f}s of audio)."
-#                 )
-
-#             self.record_q.put(None)  # signal end
-
-#         except Exception as e:
-#             self.logger.error(f"[Recorder] Failed: {e}", exc_info=True)
-#         finally:
-#             try:
-#                 if stream:
-#                     stream.stop_stream()
-#                     stream.close()
-#             except Exception:
-#                 pass
-#             self.pa.terminate()
-#             self.logger.info("🎧 Recorder stopped gracefully.")
-
-
-
-class RecorderThread(threading.Thread):
-    def __init__(self, record_q, stop_event, pause_event, config_path="config.yaml"):
-        super().__init__(daemon=True, name="RecorderThread")
-        self.record_q = record_q
-        self.stop_event = stop_event
-        self.pause_event = pause_event
-        self.config_path = config_path
-        self.logger = get_logger(config_path)
-
-        # --- Load config dynamically ---
-        with open(config_path, "r") as f:
-            cfg = yaml.safe_load(f) or {}
-        audio_cfg = cfg.get("audio", {})
-
+    def __init__(self, ctx, **options):
+        super().__init__(ctx, **options)
+        audio_cfg = ctx.section("audio")
         self.rate = int(audio_cfg.get("rate", 16000))
         self.chunk_size = int(audio_cfg.get("chunk_size", 1024))
         self.duration = float(audio_cfg.get("duration", 5.0))
-
-        self.pa = pyaudio.PyAudio()
+        self.device_index = audio_cfg.get("input_device_index")  # None → system default (one mic per session)
+        # process: a child process reads the mic into a shared-memory ring; thread: read it here
+        self.capture_mode = audio_cfg.get("capture", "process")
+        self.ring_seconds = float(audio_cfg.get("ring_seconds", 60.0))
+        self.capture = None  # CaptureProcess
+        self._counters = {}
+        self.pa = None
+        self.stream = None
+        self.seq = 0
+        self.offset = 0.0  # seconds of audio captured before the current clip
+        self.time_scale = 1.0  # wall seconds per audio second
+
+    def resume(self, state):
+        # Continue the clip numbering and the meeting clock where the journal ends
+        self.seq = state.next_clip_seq - 1
+        self.offset = state.next_offset
+        # Clips captured but never written to WAV nor dropped (queued or spilled at the crash):
+        # they go back on the record queue, through the VAD and converter like fresh ones
+        return state.pending_capture()
+
+    def setup(self):
         self.logger.info(
-            f"🎙️ Recorder initialized | rate={self.rate}, chunk_size={self.chunk_size}, duration={self.duration}s"
+            f"🎙️ Recorder initialized | rate={self.rate}, chunk_size={self.chunk_size}, duration={self.duration}s, "
+            f"capture={self.capture_mode}"
         )
-
-    def run(self):
-        """Capture microphone audio for fixed-duration chunks and push to record_q."""
-        self.logger.info("🎙️ Recorder started.")
-        try:
-            stream = self.pa.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=self.rate,
-                input=True,
-                frames_per_buffer=self.chunk_size,
+        if self.capture_mode == "process":
+            self.capture = CaptureProcess(
+                self.rate, self.chunk_size, self.duration, self.ring_seconds, self.device_index
             )
+            self.capture.start()
+            self._counters = self.capture.counters()
+            return
+        self.pa = pyaudio.PyAudio()
+        self.stream = self.pa.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=self.rate,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=self.chunk_size,
+        )
 
-            frames_per_clip = int(self.rate / self.chunk_size * self.duration)
-            self.logger.debug(f"[Recorder] Frames per clip: {frames_per_clip}")
+    def _emit_clip(self, emit, pcm_data, start_time):
+        self.seq += 1
+        end_offset = self.offset + len(pcm_data) / (2 * self.rate)  # 16-bit mono
+        if self.ctx.journal is not None:
+            # Journaled before it is queued: a crash with the clip in a queue or spilled loses nothing
+            self.ctx.record(
+                "captured", seq=self.seq, offset=self.offset, end_offset=end_offset, captured_at=start_time,
+                pcm=self.ctx.journal.save_audio(self.seq, pcm_data),
+            )
+        emit({
+            "pcm": pcm_data, "seq": self.seq, "offset": self.offset, "captured_at": start_time,
+            "trace": new_trace(start_time, time_scale=self.time_scale),
+        })
+        self.offset = end_offset
+
+    def capture_stats(self) -> dict:
+        """Capture-process counters: device overflows, ring overruns, dropped / buffered samples."""
+        return dict(self._counters)
+
+    def _check_counters(self):
+        counters = self.capture.counters()
+        if counters["device_overflows"] > self._counters["device_overflows"]:
+            self.logger.warning(
+                f"[Recorder] Input overflow: {counters['device_overflows'] - self._counters['device_overflows']} "
+                f"device reads lost (total {counters['device_overflows']})"
+            )
+        if counters["overruns"] > self._counters["overruns"]:
+            self.logger.warning(
+                f"[Recorder] Ring buffer overrun: {counters['dropped_samples'] / self.rate:.2f}s of audio dropped "
+                f"so far ({counters['overruns']} overruns); the pipeline is not keeping up with capture"
+            )
+        self._counters = counters
+
+    def _produce_from_ring(self, emit):
+        """Copy each full clip out of the capture ring and hand it downstream."""
+        self.logger.info("🎙️ Recorder started (capture process).")
+        while not self.ctx.stop_event.is_set():
+            self.capture.pause(not self.ctx.pause_event.is_set())
+            clip = self.capture.next_clip(timeout=0.25)
+            self._check_counters()
+            if clip is None:
+                if not self.capture.alive():
+                    self.logger.error("[Recorder] Capture process exited unexpectedly.")
+                    break
+                continue
+            pcm_data, start_time = clip
+            self._emit_clip(emit, pcm_data, start_time)
+            self.logger.info(f"[Recorder] Captured {len(pcm_data) / (2 * self.rate):.2f}s of audio.")
+
+        # The clip in progress at Stop goes downstream too
+        tail = self.capture.stop()
+        if tail is not None:
+            self._emit_clip(emit, *tail)
+        self._check_counters()
+
+    def produce(self, emit):
+        """Capture microphone audio for fixed-duration chunks and emit them downstream."""
+        if self.capture is not None:
+            return self._produce_from_ring(emit)
+        self.logger.info("🎙️ Recorder started.")
+        frames_per_clip = int(self.rate / self.chunk_size * self.duration)
+        self.logger.debug(f"[Recorder] Frames per clip: {frames_per_clip}")
 
-            while not self.stop_event.is_set():
-                self.pause_event.wait()
-                frames = []
-                start_time = time.time()
+        while not self.ctx.stop_event.is_set():
+            self.ctx.pause_event.wait()
+            frames = []
+            start_time = time.time()
 
-                for _ in range(frames_per_clip):
-                    if self.stop_event.is_set():
-                        break
-                    try:
-                        data = stream.read(self.chunk_size, exception_on_overflow=False)
-                        frames.append(data)
-                    except IOError as e:
-                        self.logger.warning(
-                            f"[Recorder] Audio buffer overflow: {e}", exc_info=True
-                        )
-
-                # Combine frames into one PCM chunk
-                if frames:
-                    pcm_data = b"".join(frames)
-                    self.record_q.put(pcm_data)
-                    elapsed = time.time() - start_time
-                    self.logger.info(
-                        f"[Recorder] Captured {len(frames)} frames ({elapsed:.2f}s of audio)."
+            for _ in range(frames_per_clip):
+                if self.ctx.stop_event.is_set():
+                    break
+                try:
+                    data = self.stream.read(self.chunk_size, exception_on_overflow=False)
+                    frames.append(data)
+                except IOError as e:
+                    self.logger.warning(
+                        f"[Recorder] Audio buffer overflow: {e}", exc_info=True
                     )
 
-            self.record_q.put(None)
+            # Combine frames into one PCM clip
+            if frames:
+                self._emit_clip(emit, b"".join(frames), start_time)
+                elapsed = time.time() - start_time
+                self.logger.info(
+                    f"[Recorder] Captured {len(frames)} frames ({elapsed:.2f}s of audio)."
+                )
 
-        except Exception as e:
-            self.logger.error(f"[Recorder] Failed: {e}", exc_info=True)
-        finally:
-            try:
-                stream.stop_stream()
-                stream.close()
-            except Exception:
-                pass
+    def teardown(self):
+        if self.capture is not None:
+            self.capture.stop()
+            self._check_counters()
+            c = self._counters
+            self.logger.info(
+                f"[Recorder] Capture totals: {c['device_overflows']} device overflows, {c['overruns']} ring overruns "
+                f"({c['dropped_samples'] / self.rate:.2f}s dropped)"
+            )
+            self.capture.close()
+        try:
+            self.stream.stop_stream()
+            self.stream.close()
+        except Exception:
+            pass
+        if self.pa is not None:
             self.pa.terminate()
-            self.logger.info("🎧 Recorder stopped gracefully.")
+        self.logger.info("🎧 Recorder stopped gracefully.")
+
+def _synthetic_speech(start: int, n_samples: int, rate: int, seed: int = 0) -> bytes:
+    """
+    Speech-like 16-bit PCM from sample `start` on: a noise floor with voiced bursts at a
+    syllable-like rhythm and two alternating "speakers" (pitch), the same for the same seed.
+    """
+    rng = np.random.default_rng([seed, start])
+    t = (start + np.arange(n_samples)) / rate
+    pitch = np.where((t // 7) % 2 == 0, 120.0, 210.0)  # turns of 7 s
+    voiced = (np.sin(2 * np.pi * 0.9 * t) > -0.3) * (np.sin(2 * np.pi * 4.0 * t) > 0)
+    samples = rng.normal(0, 60, n_samples) + voiced * 5000 * np.sin(2 * np.pi * pitch * t)
+    return samples.clip(-32768, 32767).astype(np.int16).tobytes()
+
+
+class ReplayStage(RecorderStage):
+    """
+    Source stage standing in for the microphone: replays a recorded meeting (16-bit mono WAV
+    at `audio.rate`) or, without `path`, `seconds` of synthetic speech-like audio. Clips are
+    cut and stamped exactly as RecorderStage does. `speed` is the replay rate against real
+    time; 0 emits clips as fast as the record queue takes them. Capture times are stamped on
+    the replay's clock (an audio second lasts 1/speed wall seconds, none at speed 0, where a
+    clip counts as spoken when it is emitted). `finished` is set once the audio is used up;
+    the stage then idles until Stop, like a silent microphone.
+    """
+
+    def __init__(self, ctx, path: str = None, seconds: float = 60.0, speed: float = 1.0, seed: int = 0, **options):
+        super().__init__(ctx, **options)
+        self.path = path
+        self.seconds = float(seconds)
+        self.speed = float(speed)
+        self.seed = int(seed)
+        self.wav = None
+        self.total_samples = int(self.seconds * self.rate)
+        self.time_scale = 1.0 / self.speed if self.speed > 0 else 0.0
+        self.finished = threading.Event()
+
+    def setup(self):
+        if self.path:
+            self.wav = wave.open(self.path, "rb")
+            if (self.wav.getnchannels(), self.wav.getsampwidth(), self.wav.getframerate()) != (1, 2, self.rate):
+                self.wav.close()
+                raise ValueError(f"[Replay] {self.path} must be 16-bit mono at {self.rate} Hz")
+            self.total_samples = self.wav.getnframes()
+        self.logger.info(
+            f"🎞️ Replay source | {self.path or 'synthetic'} | {self.total_samples / self.rate:.1f}s of audio, "
+            f"duration={self.duration}s, speed={self.speed or 'max'}"
+        )
 
+    def _read(self, start: int, n_samples: int) -> bytes:
+        if self.wav is None:
+            return _synthetic_speech(start, n_samples, self.rate, self.seed)
+        self.wav.setpos(start)
+        return self.wav.readframes(n_samples)
+
+    def produce(self, emit):
+        clip_samples = int(self.rate * self.duration)
+        position = int(round(self.offset * self.rate))  # after a resume: skip what the journal has
+        started = time.monotonic() - (position / self.rate / self.speed if self.speed > 0 else 0.0)
+        while position < self.total_samples and not self.ctx.stop_event.is_set():
+            self.ctx.pause_event.wait()
+            n_samples = min(clip_samples, self.total_samples - position)
+            pcm = self._read(position, n_samples)
+            position += n_samples
+            if self.speed > 0:
+                # The clip is "captured" once its last sample is due
+                time.sleep(max(0.0, started + position / self.rate / self.speed - time.monotonic()))
+            self._emit_clip(emit, pcm, time.time() - n_samples / self.rate * self.time_scale)
+        self.logger.info(f"🎞️ Replay finished after {self.offset:.1f}s of audio.")
+        self.finished.set()
+        self.ctx.stop_event.wait()
+
+    def teardown(self):
+        if self.wav is not None:
+            self.wav.close()
+        self.logger.info("🎞️ Replay source stopped.")
 
 
 # ============================================================
-#  Converter Thread
+#  Converter Stage
 # ============================================================
 
-class ConverterThread(threading.Thread):
-    def __init__(self, record_q, convert_q, stop_event, config_path="config.yaml"):
-        super().__init__(daemon=True, name="ConverterThread")
-        self.record_q = record_q
-        self.convert_q = convert_q
-        self.stop_event = stop_event
-        self.logger = logger
-
-        # Load audio config
-        with open(config_path, "r") as f:
-            cfg = yaml.safe_load(f) or {}
-        audio_cfg = cfg.get("audio", {})
+class ConverterStage(Stage):
+    """PCM clip → WAV file; the clip keeps its seq/offset/capture time."""
+
+    kernel = staticmethod(write_wav)  # `engine: process` encodes in a worker process
+
+    def __init__(self, ctx, **options):
+        super().__init__(ctx, **options)
+        audio_cfg = ctx.section("audio")
+        self.rate = int(audio_cfg.get("rate", 16000))
         self.output_dir = audio_cfg.get("output_dir", "temp_audio")
+        if ctx.session_id:
+            self.output_dir = os.path.join(self.output_dir, str(ctx.session_id))  # clip names are per session
         self.chunk_format = audio_cfg.get("chunk_format", "wav")
 
         os.makedirs(self.output_dir, exist_ok=True)
         self.logger.info(f"[Converter] Output directory set to: {self.output_dir}")
 
-    def _write_wav_file(self, pcm_data: bytes, sample_rate=16000, channels=1, sampwidth=2) -> str:
-        """Convert PCM bytes into a WAV file and return its path."""
-        timestamp = int(time.time() * 1000)
-        file_path = os.path.join(self.output_dir, f"chunk_{timestamp}.{self.chunk_format}")
+    def kernel_args(self, clip) -> dict:
+        name = f"chunk_{int(clip.get('captured_at', time.time()) * 1000)}_{clip.get('seq', 0)}"
+        return {"path": os.path.join(self.output_dir, f"{name}.{self.chunk_format}"), "rate": self.rate}
+
+    def kernel_done(self, clip, wav_path):
+        """The clip, now pointing at its WAV file instead of carrying PCM."""
+        self.logger.debug(f"[Converter] Wrote {len(clip['pcm'])} bytes to {wav_path}")
+        out = {k: v for k, v in clip.items() if k != "pcm"}
+        out["path"] = wav_path
+        seq = clip.get("seq")
+        last_seq = clip.get("last_seq", seq)  # clips coalesced in the record queue
+        self.ctx.record(
+            "clip", seq=seq, last_seq=last_seq, offset=clip.get("offset", 0.0), captured_at=clip.get("captured_at"),
+            end_offset=clip.get("offset", 0.0) + len(clip["pcm"]) / (2 * self.rate), path=wav_path,
+        )
+        if self.ctx.journal is not None and seq is not None:
+            self.ctx.journal.discard_audio(seq, last_seq)
+        return out
 
+    def process(self, clip):
         try:
-            with wave.open(file_path, "wb") as wf:
-                wf.setnchannels(channels)
-                wf.setsampwidth(sampwidth)  # 16-bit PCM = 2 bytes
-                wf.setframerate(sample_rate)
-                wf.writeframes(pcm_data)
-            self.logger.debug(f"[Converter] Wrote {len(pcm_data)} bytes to {file_path}")
-            return file_path
+            wav_path = write_wav(clip["pcm"], **self.kernel_args(clip))
         except Exception as e:
             self.logger.error(f"[Converter] Failed to write WAV file: {e}", exc_info=True)
             return None
+        return self.kernel_done(clip, wav_path)
 
-    def run(self):
-        self.logger.info("🔄 Converter started.")
-        try:
-            while True:
-                chunk = self.record_q.get()
-                if chunk is None:
-                    self.convert_q.put(None)
-                    break
-
-                # Convert PCM bytes → WAV file
-                wav_path = self._write_wav_file(chunk)
+    def teardown(self):
+        self.logger.info("🔚 Converter stopped gracefully.")
 
-                if wav_path:
-                    self.convert_q.put(wav_path)
-        except Exception as e:
-            self.logger.error(f"[Converter] Error: {e}", exc_info=True)
-        finally:
-            self.logger.info("🔚 Converter stopped gracefully.")
-
-
-def analyze_text_with_openai(text):
-    """Analyze sentiment and aggression for a transcript line using OpenAI."""
-    if not text.strip():
-        return "Neutral", 0.0
 
+def _tone_messages(text):
     prompt = f"""
     Analyze the emotional tone and aggression level of this meeting line:
     "{text}"
@@ -264,245 +339,515 @@ def analyze_text_with_openai(text):
       "aggression_score": 0.0–1.0
     }}
     """
+    return [
+        {"role": "system", "content": "You are a precise language tone analyzer."},
+        {"role": "user", "content": prompt},
+    ]
+
+
+def _parse_tone(response, route, started, session_id=None):
+    """Record usage for one tone call and parse its JSON into (sentiment, aggression)."""
+    usage = getattr(response, "usage", None)
+    record_call(
+        "tone", route["model"], time.perf_counter() - started,
+        prompt_tokens=getattr(usage, "prompt_tokens", 0),
+        completion_tokens=getattr(usage, "completion_tokens", 0),
+        session_id=session_id,
+    )
+
+    raw = response.choices[0].message.content.strip()
 
     try:
+        data = json.loads(raw)
+        sentiment = data.get("sentiment", "Neutral").capitalize()
+        aggression = float(data.get("aggression_score", 0.0))
+        aggression = max(0.0, min(1.0, aggression))
+        return sentiment, aggression
+    except json.JSONDecodeError:
+        print("⚠️ Could not parse JSON, raw:", raw)
+        return "Neutral", 0.0
+
+
+def analyze_text_with_openai(text, models=None, session_id=None):
+    """
+    Analyze sentiment and aggression for a transcript line using OpenAI, routed through
+    `models` (a session's view of the `models` section) when given.
+    """
+    if not text.strip():
+        return "Neutral", 0.0
+
+    route = get_model("tone", models)
+    try:
+        started = time.perf_counter()
         response = openai_client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are a precise language tone analyzer."},
-                {"role": "user", "content": prompt},
-            ],
+            model=route["model"],
+            messages=_tone_messages(text),
             temperature=0.0,
-            max_tokens=100,
+            max_tokens=route["max_tokens"],
+            timeout=route["timeout"],
         )
+        return _parse_tone(response, route, started, session_id)
 
-        raw = response.choices[0].message.content.strip()
+    except Exception as e:
+        print(f"❌ [OpenAI Sentiment Error]: {e}")
+        return "Neutral", 0.0
 
-        try:
-            data = json.loads(raw)
-            sentiment = data.get("sentiment", "Neutral").capitalize()
-            aggression = float(data.get("aggression_score", 0.0))
-            aggression = max(0.0, min(1.0, aggression))
-            return sentiment, aggression
-        except json.JSONDecodeError:
-            print("⚠️ Could not parse JSON, raw:", raw)
-            return "Neutral", 0.0
+
+async def analyze_text_async(text, engine, models=None, session_id=None):
+    """Coroutine variant of `analyze_text_with_openai`, bounded by the engine's "llm" limiter."""
+    if not text.strip():
+        return "Neutral", 0.0
+
+    route = get_model("tone", models)
+    try:
+        async with engine.limit("llm"):
+            started = time.perf_counter()
+            response = await engine.openai().chat.completions.create(
+                model=route["model"],
+                messages=_tone_messages(text),
+                temperature=0.0,
+                max_tokens=route["max_tokens"],
+                timeout=route["timeout"],
+            )
+        return _parse_tone(response, route, started, session_id)
 
     except Exception as e:
         print(f"❌ [OpenAI Sentiment Error]: {e}")
         return "Neutral", 0.0
 
 
-class TranscriberThread(threading.Thread):
-    def __init__(self, convert_q, transcribe_q, stop_event, config_path="config.yaml", ui_queue=None):
-        super().__init__(daemon=True, name="TranscriberThread")
-        self.convert_q = convert_q
-        self.transcribe_q = transcribe_q
-        self.stop_event = stop_event
-        self.logger = logger
-        self.combined_transcript = None
-        self.total_offset = 0.0
-        self.ui_queue = ui_queue  # ✅ send updates to UI if available
+class TranscriberStage(Stage):
+    """WAV clip → transcript delta with absolute segment times (safe to run with several workers)."""
 
-    def run(self):
+    def __init__(self, ctx, **options):
+        super().__init__(ctx, **options)
+        self.language = options.get("language", "eng")
+
+    def setup(self):
         self.logger.info("🗣️ Transcriber started.")
-        try:
-            while True:
-                file_path = self.convert_q.get()
-                if file_path is None:
-                    self.transcribe_q.put(None)
-                    break
 
-                # --- Transcribe each chunk ---
-                self.total_offset, self.combined_transcript = transcribe_chunk(
-                    file_path,
-                    total_offset=self.total_offset,
-                    combined_transcript=self.combined_transcript
-                )
+    def process(self, clip):
+        # --- Transcribe the clip (only its own segments come back) ---
+        _, segments = transcribe_segments(
+            clip["path"],
+            total_offset=clip.get("offset", 0.0),
+            language=self.language,
+        )
+        return self._delta(clip, segments)
+
+    async def process_async(self, clip):
+        _, segments = await transcribe_segments_async(
+            clip["path"],
+            self.ctx.engine,
+            total_offset=clip.get("offset", 0.0),
+            language=self.language,
+        )
+        return self._delta(clip, segments)
 
-                # --- Send the transcript to summarizer (full dict copy) ---
-                if self.combined_transcript:
-                    self.transcribe_q.put(copy.deepcopy(self.combined_transcript))
+    def resume(self, state):
+        # Clips written to disk but never transcribed
+        return [{k: c[k] for k in ("seq", "offset", "captured_at", "path")} for c in state.pending_clips()]
 
-                    # --- Extract last spoken segment (for UI display) ---
-                    # --- Extract and push *all* new segments for UI display ---
-                try:
-                    timestamp = datetime.now().strftime("%H:%M:%S")
+    def _delta(self, clip, segments):
+        """Transcript delta for one clip; the clip's trace context travels with it."""
+        self.ctx.record("stt", clip=clip.get("seq"), segments=segments)
+        if not segments:
+            return None
+        return {
+            "clip": clip.get("seq"),
+            "offset": clip.get("offset", 0.0),
+            "captured_at": clip.get("captured_at"),
+            "trace": clip.get("trace"),
+            "segments": segments,
+        }
 
-                    for speaker, texts in self.combined_transcript.items():
-                        # Get last few lines spoken by this speaker (limit to recent 1–2 to avoid flooding)
-                        for text in texts[-2:]:
-                            if not text.strip():
-                                continue
+    def teardown(self):
+        self.logger.info("📜 Transcriber stopped gracefully.")
 
-                            # Analyze each line separately
-                            sentiment_label, aggression_score = analyze_text_with_openai(text)
 
-                            if self.ui_queue:
-                                self.ui_queue.put({
-                                    "type": "transcript",
-                                    "time": timestamp,
-                                    "speaker": speaker,
-                                    "language": "en",
-                                    "aggression": round(aggression_score, 2),
-                                    "sentiment": sentiment_label,
-                                    "transcript": text.strip()
-                                })
-
-                            self.logger.info(
-                                f"[Transcript] {speaker} ({sentiment_label}, {aggression_score:.2f}) → {text}"
-                            )
+class ToneStage(Stage):
+    """Adds sentiment/aggression per segment, pushes transcript rows to the UI and numbers the deltas."""
 
-                except Exception as inner_e:
-                    self.logger.warning(f"[Transcriber UI update failed]: {inner_e}")
-
-                    # try:
-                    #     latest_speaker = list(self.combined_transcript.keys())[-1]
-                    #     latest_texts = self.combined_transcript[latest_speaker]
-                    #     last_line = latest_texts[-1] if latest_texts else ""
-                    #     timestamp = datetime.now().strftime("%H:%M:%S")
-
-                    #     # --- Analyze sentiment/aggression ---
-                    #     sentiment_label, aggression_score = analyze_text_with_openai(last_line)
-
-                    #     # --- Push to UI queue ---
-                    #     if self.ui_queue:
-                    #         self.ui_queue.put({
-                    #             "type": "transcript",
-                    #             "time": timestamp,
-                    #             "speaker": latest_speaker,
-                    #             "language": "en",
-                    #             "aggression": round(aggression_score, 2),
-                    #             "sentiment": sentiment_label,
-                    #             "transcript": last_line
-                    #         })
-
-                    #     self.logger.info(
-                    #         f"[Transcript] {latest_speaker} ({sentiment_label}, {aggression_score:.2f}) → {last_line}"
-                    #     )
-
-                    # except Exception as inner_e:
-                    #     self.logger.warning(f"[Transcriber UI update failed]: {inner_e}")
+    def __init__(self, ctx, **options):
+        super().__init__(ctx, **options)
+        self.seq = 0  # sequence id of the last delta sent to the summarizer
+        self.models = ctx.section("models")  # this session's model routing
+
+    def setup(self):
+        self.ctx.subscribe("models", self._on_models_change)
+
+    def teardown(self):
+        self.ctx.unsubscribe("models", self._on_models_change)
+
+    def _on_models_change(self, new, old):
+        self.models = new
+
+    def process(self, delta):
+        for seg in delta["segments"]:
+            if seg["text"].strip():
+                # Analyze each line separately
+                seg["sentiment"], seg["aggression"] = analyze_text_with_openai(
+                    seg["text"], self.models, self.ctx.session_id
+                )
+        return delta
+
+    async def process_async(self, delta):
+        # All lines of the delta are analyzed concurrently (bounded by the "llm" limit)
+        segments = [seg for seg in delta["segments"] if seg["text"].strip()]
+        tones = await asyncio.gather(*(
+            analyze_text_async(seg["text"], self.ctx.engine, self.models, self.ctx.session_id) for seg in segments
+        ))
+        for seg, (sentiment, aggression) in zip(segments, tones):
+            seg["sentiment"], seg["aggression"] = sentiment, aggression
+        return delta
+
+    def resume(self, state):
+        # Show the recovered transcript, continue numbering, and finish clips that only lack tone
+        for delta in state.deltas:
+            self._show_rows(delta)
+        self.seq = state.last_seq
+        return state.pending_tone()
+
+    def on_emit(self, delta):
+        """Runs in transcript order: number the delta and show its rows."""
+        self.seq += 1
+        delta["seq"] = self.seq
+        self.ctx.record(
+            "delta", seq=self.seq, clip=delta.get("clip"), offset=delta.get("offset", 0.0),
+            captured_at=delta.get("captured_at"), segments=delta["segments"],
+        )
+        self._show_rows(delta)
+        return delta
+
+    def _show_rows(self, delta):
+        """Push the delta's segments to the UI (with their staleness when traced)."""
+        try:
+            timestamp = datetime.now().strftime("%H:%M:%S")
+            trace = delta.get("trace")
+            for seg in delta["segments"]:
+                text = seg["text"]
+                if not text.strip():
+                    continue
+                sentiment_label = seg.get("sentiment", "Neutral")
+                aggression_score = seg.get("aggression", 0.0)
+
+                row_trace = None
+                if trace is not None:
+                    # Staleness of the row: wall time since the segment's last word was spoken
+                    now = time.time()
+                    spoken_at = trace["captured_at"] + (seg["end"] - delta.get("offset", 0.0)) * trace.get("time_scale", 1.0)
+                    row_trace = {"clip": delta.get("clip"), "spoken_at": spoken_at, "queued_at": now}
+                    if self.ctx.latency is not None:
+                        self.ctx.latency.record("end_to_end", now - spoken_at)
+                        self.ctx.latency.record("clip_to_ui", now - trace["ready_at"])
+
+                if self.ctx.ui_queue:
+                    self.ctx.ui_queue.put({
+                        "type": "transcript",
+                        "time": timestamp,
+                        "speaker": seg["speaker"],
+                        "language": "en",
+                        "aggression": round(aggression_score, 2),
+                        "sentiment": sentiment_label,
+                        "transcript": text.strip(),
+                        "trace": row_trace,
+                    })
+
+                self.logger.info(
+                    f"[Transcript] {seg['speaker']} ({sentiment_label}, {aggression_score:.2f}) → {text}"
+                )
+        except Exception as inner_e:
+            self.logger.warning(f"[Transcriber UI update failed]: {inner_e}")
 
-        except Exception as e:
-            self.logger.error(f"[Transcriber] Error: {e}", exc_info=True)
-        finally:
-            self.logger.info("📜 Transcriber stopped gracefully.")
-
-
-
-# class TranscriberThread(threading.Thread):
-#     def __init__(self, convert_q, transcribe_q, stop_event, config_path="config.yaml",ui_queue = None):
-#         super().__init__(daemon=True, name="TranscriberThread")
-#         self.convert_q = convert_q
-#         self.transcribe_q = transcribe_q
-#         self.stop_event = stop_event
-#         self.logger = logger
-#         self.combined_transcript = None   
-#         self.total_offset = 0.0
-#         self.ui_queue = ui_queue
-
-#     def run(self):
-#         self.logger.info("🗣️ Transcriber started.")
-#         try:
-#             while True:
-#                 file_path = self.convert_q.get()
-#                 if file_path is None:
-#                     # Signal summarizer to finish
-#                     self.transcribe_q.put(None)
-#                     break
-
-#                 # ✅ Keep accumulating in same transcript dict
-#                 self.total_offset, self.combined_transcript = transcribe_chunk(
-#                     file_path,
-#                     total_offset=self.total_offset,
-#                     combined_transcript=self.combined_transcript
-#                 )
-
-#                 if self.combined_transcript:
-#                     # Push a COPY to summarizer (so summarizer gets full state)
-#                     import copy
-#                     self.transcribe_q.put(copy.deepcopy(self.combined_transcript))
-
-#         except Exception as e:
-#             self.logger.error(f"[Transcriber] Error: {e}", exc_info=True)
-#         finally:
-#             self.logger.info("📜 Transcriber stopped gracefully.")
 
             
 
 
 # ============================================================
-#  Summarizer Thread
+#  Summarizer Stage
 # ============================================================
 
-class SummarizerThread(threading.Thread):
-    def __init__(self, transcribe_q, stop_event, config_path="config.yaml", ui_queue = None):
-        super().__init__(daemon=True, name="SummarizerThread")
-        self.transcribe_q = transcribe_q
-        self.stop_event = stop_event
-        self.text_chunks = []
+class SummarizerStage(Stage):
+    """Sink stage: partial summaries on a speech-driven schedule, objective evaluation, final summary."""
+
+    def __init__(self, ctx, **options):
+        super().__init__(ctx, **options)
+        self.transcribe_q = None  # bound in consume()
+        self.stop_event = ctx.stop_event
+        self.messages_received = 0
+        self.last_seq = 0
         self.partial_summaries = []  
-        self.logger = logger
-        self.ui_queue = ui_queue
-        # --- Load config dynamically ---
-        import yaml, os
-        try:
-            if os.path.exists(config_path):
-                with open(config_path, "r") as f:
-                    cfg = yaml.safe_load(f) or {}
-                summarize_cfg = cfg.get("summarizer", {})
-                self.partial_interval = int(summarize_cfg.get("partial_interval", 2))
-                self.partial_window = int(summarize_cfg.get("partial_window", 2))
-            else:
-                self.partial_interval = 2
-                self.partial_window = 2
-        except Exception as e:
-            self.logger.warning(f"[Summarizer] Failed to load config: {e}. Using defaults.")
-            self.partial_interval = 2
-            self.partial_window = 2
+        self.pending_segments = []  # segments not yet covered by a partial summary
+        self.rolling_summary = None  # near-final summary, refreshed with every partial
+        self.final_summary = None
+        self._final_lock = threading.Lock()
+        self.speech_clock = 0.0  # meeting time (s) of the latest transcribed segment
+        self.timeline = None  # CoverageTimeline, created once the objectives are known
+        self.ui_queue = ctx.ui_queue
+        # --- Config sections (parsed once by the controller) ---
+        summarize_cfg = ctx.section("summarizer")
+        evaluator_cfg = ctx.section("evaluator")
+        participation_cfg = ctx.section("participation")
+        self.partial_window = int(summarize_cfg.get("partial_window", 2))
+        self.token_budget = int(summarize_cfg.get("token_budget", 8000))
+        self.context_budget = int(summarize_cfg.get("context_budget", 1500))
+        self.overflow = summarize_cfg.get("overflow", "split")
+        self.stream = bool(summarize_cfg.get("stream", True))
+        self.models = ctx.section("models")  # this session's model routing
+
+        # Partials fire on speech seconds / new words, not on message count
+        self.scheduler = PartialScheduler(
+            speech_seconds=float(summarize_cfg.get("partial_speech_seconds", 20)),
+            new_words=int(summarize_cfg.get("partial_new_words", 60)),
+            min_spacing=float(summarize_cfg.get("partial_min_spacing", 10)),
+        )
+
+        # Talk time, turns, interruptions and silence per speaker, from segment timestamps
+        self.participation = ParticipationTracker(
+            ctx.participants,
+            max_pause=float(participation_cfg.get("max_pause", 2.0)),
+            silence_alert=float(participation_cfg.get("silence_alert", 120)),
+        )
+
+        # Sliding window over the most recent transcript deltas
+        self.window = deque(maxlen=self.partial_window)
+
+        # Meeting objectives: an ObjectiveSet, or a Future still embedding it (see MasterController.initialize_meeting)
+        self.objectives = ctx.objectives
+        # Objective scoring: summary-level or per-bullet coverage, reduced per objective
+        self.coverage_granularity = evaluator_cfg.get("granularity", "summary")
+        self.coverage_reduce = evaluator_cfg.get("reduce", "max")
+        # Objective/topic library: a VectorIndex, or a Future still building it
+        self.library = ctx.library
+        self.library_k = int(evaluator_cfg.get("library_top_k", 5))
+        # Coverage timeline: an objective counts as covered once its running max reaches the threshold
+        self.coverage_threshold = float(evaluator_cfg.get("covered_threshold", 0.8))
+        self.coverage_alpha = float(evaluator_cfg.get("ewma_alpha", 0.3))
+        self._resumed_evaluations = []  # journaled evaluations, folded into the timeline once it exists
 
-                 
         self.logger.info(
-            f"[Summarizer] Config loaded | interval={self.partial_interval}, window={self.partial_window}"
+            f"[Summarizer] Config loaded | speech={self.scheduler.speech_seconds}s, "
+            f"words={self.scheduler.new_words}, spacing={self.scheduler.min_spacing}s, window={self.partial_window}, "
+            f"token_budget={self.token_budget}, context_budget={self.context_budget}, overflow={self.overflow}"
+        )
+
+    def resume(self, state):
+        """Rebuild the summarizer from the journal: partials, window, participation, coverage."""
+        for delta in state.deltas:
+            self.participation.update(delta["segments"])
+            self.window.append(delta["segments"])
+            for seg in delta["segments"]:
+                self.speech_clock = max(self.speech_clock, float(seg.get("end", 0.0)))
+        self.last_seq = state.last_seq
+        self.messages_received = len(state.deltas)
+        self.partial_summaries = [p["summary"] for p in state.partials]
+        self.rolling_summary = self.partial_summaries[-1] if self.partial_summaries else None
+        for delta in state.unsummarized_deltas():
+            self.pending_segments.extend(delta["segments"])
+            self.scheduler.add(delta["segments"])
+        self._resumed_evaluations = list(state.evaluations)
+
+        if self.ui_queue:
+            if self.rolling_summary:
+                self.ui_queue.put({"type": "partial", "content": self.rolling_summary, "streamed": False})
+            if self.participation.speakers:
+                self.ui_queue.put({"type": "participation", "content": self.participation.snapshot()})
+        self.logger.info(
+            f"[Summarizer] Resumed at delta #{self.last_seq} | {len(self.partial_summaries)} partials, "
+            f"{len(self.pending_segments)} segments awaiting a partial"
+        )
+        return []
+
+    def _on_settings_change(self, new, old):
+        """Apply an edited `summarizer` section mid-meeting (schedule, window, budgets, streaming)."""
+        self.scheduler.speech_seconds = float(new["partial_speech_seconds"])
+        self.scheduler.new_words = int(new["partial_new_words"])
+        self.scheduler.min_spacing = float(new["partial_min_spacing"])
+        if int(new["partial_window"]) != self.partial_window:
+            self.partial_window = int(new["partial_window"])
+            self.window = deque(self.window, maxlen=self.partial_window)
+        self.token_budget = int(new["token_budget"])
+        self.context_budget = int(new["context_budget"])
+        self.overflow = new["overflow"]
+        self.stream = bool(new["stream"])
+        self.logger.info(
+            f"[Summarizer] Settings updated | speech={self.scheduler.speech_seconds}s, "
+            f"words={self.scheduler.new_words}, spacing={self.scheduler.min_spacing}s, window={self.partial_window}, "
+            f"token_budget={self.token_budget}, context_budget={self.context_budget}, overflow={self.overflow}"
+        )
+
+    def _on_models_change(self, new, old):
+        """Route the next summary calls through the session's edited `models` section."""
+        self.models = new
+
+    def _accept_delta(self, message):
+        """Add one transcript delta from the transcriber to the sliding window."""
+        seq = message.get("seq", self.last_seq + 1)
+        first_seq = message.get("first_seq", seq)  # several deltas coalesced by the queue
+        if first_seq != self.last_seq + 1:
+            self.logger.warning(
+                f"[Summarizer] Transcript sequence gap: expected #{self.last_seq + 1}, got #{first_seq}"
+            )
+        self.last_seq = seq
+        self.messages_received += 1
+        trace = message.get("trace")
+        if trace is not None and self.ctx.latency is not None:
+            self.ctx.latency.record(f"wait.{self.name}", time.time() - trace["handoff"])
+        self.window.append(message.get("segments", []))
+        self.pending_segments.extend(self.window[-1])
+        self.scheduler.add(self.window[-1])
+        self.participation.update(self.window[-1])
+        if self.ui_queue and self.window[-1]:
+            self.ui_queue.put({"type": "participation", "content": self.participation.snapshot()})
+        for seg in self.window[-1]:
+            self.speech_clock = max(self.speech_clock, float(seg.get("end", 0.0)))
+        self.logger.debug(
+            f"[Summarizer] Added transcript delta #{seq} ({len(self.window[-1])} segments)"
         )
 
-    def run(self):
+    def _delta_forwarder(self, kind):
+        """Announce a streamed `kind` summary to the UI and return its token callback (or None)."""
+        if not (self.stream and self.ui_queue):
+            return None
+        self.ui_queue.put({"type": f"{kind}_start"})
+
+        def forward(delta):
+            self.ui_queue.put({"type": f"{kind}_delta", "content": delta})
+
+        return forward
+
+    @staticmethod
+    def _segments_text(segments) -> str:
+        """Render segments as `Speaker: text` lines."""
+        return "\n".join(f"{seg['speaker']}: {seg['text']}" for seg in segments)
+
+    def _meeting_objectives(self):
+        """Resolve the meeting's ObjectiveSet, waiting briefly if its embeddings are still being computed."""
+        if isinstance(self.objectives, Future):
+            try:
+                self.objectives = self.objectives.result(timeout=30)
+            except Exception as e:
+                self.logger.error(f"[Summarizer] Meeting objectives unavailable: {e}", exc_info=True)
+                self.objectives = None
+        return self.objectives
+
+    def _objective_library(self):
+        """Resolve the library index; while it is still being built, evaluate without it."""
+        if isinstance(self.library, Future):
+            if not self.library.done():
+                return None
+            try:
+                self.library = self.library.result()
+            except Exception as e:
+                self.logger.error(f"[Summarizer] Objective library unavailable: {e}", exc_info=True)
+                self.library = None
+        return self.library
+
+    def _record_coverage(self, objectives, evaluation_results):
+        """Append this window to the coverage timeline and push the uncovered objectives to the UI."""
+        if self.timeline is None:
+            self.timeline = CoverageTimeline(
+                objectives.names, alpha=self.coverage_alpha, threshold=self.coverage_threshold
+            )
+            for recovered in self._resumed_evaluations:  # windows scored before a crash
+                self.timeline.update_from_results(recovered["results"], recovered["at"])
+        self.timeline.update_from_results(evaluation_results, self.speech_clock)
+        snapshot = self.timeline.snapshot()
+        self.logger.info(
+            f"[Summarizer] Coverage @ {snapshot['time']:.0f}s: "
+            f"{len(objectives) - len(snapshot['uncovered'])}/{len(objectives)} objectives covered"
+        )
+        if self.ui_queue:
+            self.ui_queue.put({"type": "coverage", "content": snapshot})
+
+    def _summary_segments(self, summary):
+        """Summary bullets to score individually when granularity is "bullets"."""
+        if self.coverage_granularity != "bullets" or not summary:
+            return None
+        return [line.strip(" -•*\t") for line in summary.splitlines() if len(line.split()) >= 3]
+
+    def _partial_text(self) -> str:
+        """Text for the next partial: the window, or everything since the last partial if that is more."""
+        window_segments = [seg for segments in self.window for seg in segments]
+        if len(self.pending_segments) > len(window_segments):
+            return self._segments_text(self.pending_segments)
+        return self._segments_text(window_segments)
+
+    def _drain_pending(self) -> bool:
+        """
+        Take every delta already waiting on the queue, so a partial always covers the newest state
+        instead of outdated partials queueing up behind a slow API call. Returns True on end-of-stream.
+        """
+        while True:
+            try:
+                message = self.transcribe_q.get_nowait()
+            except queue.Empty:
+                return False
+            if message is None:
+                return True
+            self._accept_delta(message)
+
+    def consume(self, transcribe_q):
+        self.transcribe_q = transcribe_q
         self.logger.info("🧠 Summarizer started.")
+        # Live edits, seen through this session's overrides
+        self.ctx.subscribe("summarizer", self._on_settings_change)
+        self.ctx.subscribe("models", self._on_models_change)
         try:
-            while True:
-                text = self.transcribe_q.get()
-                if text is None:
+            ended = False
+            while not ended:
+                # Wake up at least once a second so time-based triggers fire without new input
+                try:
+                    message = self.transcribe_q.get(timeout=max(0.1, min(1.0, self.scheduler.seconds_until_allowed())))
+                except queue.Empty:
+                    message = False
+                if message is None:
                     break
+                if message:
+                    self._accept_delta(message)
+                ended = self._drain_pending()
 
-                self.text_chunks.append(text)
-                self.logger.debug(
-                    f"[Summarizer] Added text chunk #{len(self.text_chunks)}"
-                )
-
-               
-                if len(self.text_chunks) % self.partial_interval == 0:
-                    latest_window = self.text_chunks[-self.partial_window:]
+                # While stopping, just collect: the backlog is folded into the final summary
+                if self.scheduler.is_due() and not self.stop_event.is_set():
                     try:
-                       
-                        import collections
-                        combined_text = ""
-                        for chunk in latest_window:
-                            if isinstance(chunk, (dict, collections.defaultdict)):
-                                for speaker, texts in chunk.items():
-                                    combined_text += f"{speaker}: {' '.join(texts)}\n"
-                            elif isinstance(chunk, str):
-                                combined_text += chunk + "\n"
-
-                        partial_summary = summarize_text(combined_text)
+                        combined_text = self._partial_text()
+
+                        on_delta = self._delta_forwarder("partial")
+                        partial_summary = self.ctx.call(
+                            "llm", summarize_text,
+                            combined_text,
+                            context=self.partial_summaries[-1] if self.partial_summaries else None,
+                            token_budget=self.token_budget,
+                            context_budget=self.context_budget,
+                            overflow=self.overflow,
+                            on_delta=on_delta,
+                            models=self.models,
+                            session_id=self.ctx.session_id,
+                        )
+                        if not partial_summary or partial_summary.startswith("OpenAI API Error"):
+                            # Not a summary: never context, UI content or evaluator input. The pending
+                            # speech stays, so the retry covers it
+                            self.scheduler.mark_failed()
+                            self.logger.warning(
+                                f"[Summarizer] Partial summary failed, retrying in "
+                                f"{self.scheduler.min_spacing:.0f}s: {partial_summary}"
+                            )
+                            if self.ui_queue:
+                                self.ui_queue.put({"type": "status", "content": "Partial summary failed; retrying…"})
+                            continue
+                        self.scheduler.mark_fired()
                         self.partial_summaries.append(partial_summary)
-                        print(f"\n🟩 [Partial Summary – last {self.partial_window} chunks]\n{partial_summary}\n")
+                        # Partials carry the previous one as context, so the latest is a running summary
+                        self.rolling_summary = partial_summary
+                        self.pending_segments = []
+                        self.ctx.record("partial", summary=partial_summary, last_seq=self.last_seq)
+                        print(f"\n🟩 [Partial Summary – after delta #{self.last_seq}]\n{partial_summary}\n")
 
                         if self.ui_queue:
-                            print(f"[DEBUG] UI Queue is active: {self.ui_queue is not None}")
                             self.ui_queue.put({
                                 "type": "partial",
-                                "content": partial_summary
+                                "content": partial_summary,
+                                "streamed": on_delta is not None,
                             })
                         
 
@@ -517,20 +862,29 @@ class SummarizerThread(threading.Thread):
                         
 
 
-                        objectives = {
-                            "Clarify household role-sharing": "Discuss division of household chores and responsibilities.",
-                            "Improve communication": "Encourage partners to express their needs.",
-                            "Stock market analysis": "Discuss financial trends.",
-                            "Space exploration": "Talk about NASA missions."
-                
-                        }
+                        objectives = self._meeting_objectives()
+                        if objectives:
+                            # Run evaluator after each partial summary
+                            evaluation_results = self.ctx.call(
+                                "llm", evaluate_objectives,
+                                objectives,
+                                partial_summary,
+                                segments=self._summary_segments(partial_summary),
+                                reduce=self.coverage_reduce,
+                                library=self._objective_library(),
+                                library_k=self.library_k,
+                                session_id=self.ctx.session_id,
+                            )
 
-                        # Run evaluator after each partial summary
-                        evaluation_results = evaluate_objectives(objectives, partial_summary)
+                            # Print nicely formatted JSON to terminal
+                            evaluation_results["user"] = self.participation.silent_speakers()
 
-                        # Print nicely formatted JSON to terminal
-                        print("\n📊 Objective Evaluation (current partial summary):")
-                        print(json.dumps(evaluation_results, indent=2))
+                            print("\n📊 Objective Evaluation (current partial summary):")
+                            print(json.dumps(evaluation_results, indent=2))
+                            self._record_coverage(objectives, evaluation_results)
+                            self.ctx.record("evaluation", results=evaluation_results, at=self.speech_clock)
+                        else:
+                            self.logger.debug("[Summarizer] No meeting objectives; skipping evaluation.")
 
 
                       
@@ -557,6 +911,7 @@ class SummarizerThread(threading.Thread):
                             # )
 
                     except Exception as e:
+                        self.scheduler.mark_failed()  # back off instead of retrying on every wake-up
                         self.logger.error(f"[Summarizer] Partial summary error: {e}", exc_info=True)
 
 
@@ -567,6 +922,19 @@ class SummarizerThread(threading.Thread):
 
         except Exception as e:
             self.logger.error(f"[Summarizer] Error: {e}", exc_info=True)
+
+        self.ctx.unsubscribe("summarizer", self._on_settings_change)
+        self.ctx.unsubscribe("models", self._on_models_change)
+
+        # Input drained → fold whatever arrived since the last partial into the final summary
+        self.generate_final_summary()
+        if self.timeline is not None:
+            uncovered = self.timeline.uncovered()
+            self.logger.info(
+                f"[Summarizer] Coverage over {self.timeline.length} windows | "
+                f"uncovered: {', '.join(uncovered) if uncovered else 'none'}"
+            )
+        self.logger.info("🧩 Summarizer stopped gracefully.")
         # finally:
          
         #     try:
@@ -588,66 +956,67 @@ class SummarizerThread(threading.Thread):
         #     self.logger.info("🧩 Summarizer stopped gracefully.")
 
     # ==============================================================
-    # ✅ Manual Final Summary Trigger
+    # ✅ Final Summary
     # ==============================================================
     def generate_final_summary(self):
-        """Manually trigger final summary after all partials are complete."""
+        """
+        Produce the final summary from the rolling summary.
+
+        Only segments that arrived after the last partial need an API call, so this
+        normally finishes within a couple of seconds. Safe to call more than once.
+        """
         try:
-            if not self.partial_summaries:     
+            if self.final_summary is not None:
+                return self.final_summary
+
+            if self.pending_segments:
+                on_delta = self._delta_forwarder("final")
+                final_summary = self.ctx.call(
+                    "llm", summarize_text,
+                    self._segments_text(self.pending_segments),
+                    context=self.rolling_summary,
+                    token_budget=self.token_budget,
+                    context_budget=self.context_budget,
+                    overflow="split",
+                    on_delta=on_delta,
+                    task="final",
+                    models=self.models,
+                    session_id=self.ctx.session_id,
+                )
+                if not final_summary or final_summary.startswith("OpenAI API Error"):
+                    final_summary = None  # fall back to the rolling summary
+                self.publish_final_summary(final_summary, streamed=on_delta is not None)
+            elif self.rolling_summary:
+                self.publish_final_summary(self.rolling_summary)
+            else:
                 print("⚠️ No partial summaries to combine.")
-                return
-
-            combined_partials = "\n\n".join(self.partial_summaries)
-            final_summary = summarize_text(combined_partials)
-
-            print("\n==============================")
-            print("🧭 FINAL COMBINED SUMMARY")
-            print("==============================\n")
-            print(final_summary)
-            
-            if self.ui_queue:
-                self.ui_queue.put({
-                    "type": "final",
-                    "content": final_summary
-                    })
-            print("\n✅ Session completed successfully.\n")
-
-                # Optional: log to file
-                # self.logger.info(f"✅ Final Combined Summary:\n{final_summary}\n")
+            return self.final_summary
 
         except Exception as e:
             self.logger.error(f"[Summarizer] Error generating final summary: {e}", exc_info=True)
 
-
-
-# ============================================================
-#  Pipeline Runner (Optional for testing)
-# ============================================================
-# if __name__ == "__main__":
-#     record_q = queue.Queue()
-#     convert_q = queue.Queue()
-#     transcribe_q = queue.Queue()
-
-#     stop_event = threading.Event()
-#     pause_event = threading.Event()
-#     pause_event.set()  # start unpaused
-
-#     threads = [
-#         RecorderThread(record_q, stop_event, pause_event),
-#         ConverterThread(record_q, convert_q, stop_event),
-#         TranscriberThread(convert_q, transcribe_q, stop_event),
-#         SummarizerThread(transcribe_q, stop_event),
-#     ]
-
-#     for t in threads:
-#         t.start()
-
-#     try:
-#         while True:
-#             time.sleep(1)
-#     except KeyboardInterrupt:
-#         stop_event.set()
-#         logger.info("🛑 Graceful shutdown requested by user.")
-#         for t in threads:
-#             t.join()
-#         logger.info("✅ All threads stopped successfully.")
+    def publish_final_summary(self, final_summary=None, streamed=False):
+        """Send the final summary to the UI exactly once (defaults to the rolling summary)."""
+        with self._final_lock:
+            if self.final_summary is not None:
+                return False
+            self.final_summary = final_summary or self.rolling_summary or "No summary available."
+        self.ctx.record("final", summary=self.final_summary)
+
+        print("\n==============================")
+        print("🧭 FINAL COMBINED SUMMARY")
+        print("==============================\n")
+        print(self.final_summary)
+        if self.participation.speakers:
+            print("\n🎙️ Participation")
+            print(self.participation.report())
+
+        if self.ui_queue:
+            self.ui_queue.put({
+                "type": "final",
+                "content": self.final_summary,
+                "streamed": streamed,
+                "participation": self.participation.snapshot(),
+                })
+        print("\n✅ Session completed successfully.\n")
+        return True
@@ -0,0 +1,113 @@
+"""
+Worker processes for CPU-bound stages (`engine: process`).
+
+VAD, encoding and acoustic features would otherwise run in Python threads that compete for
+the GIL with the Qt event loop and the PyAudio reads. A stage that defines a `kernel` can
+run it in this pool instead: the clip's PCM is copied once into a reusable shared-memory
+block and the child reads it in place as an int16 array, so no audio is pickled through
+the executor's pipe. Only the kernel's small result comes back.
+"""
+
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from utils.logger import get_logger
+from utils.audio_kernels import run_kernel
+
+logger = get_logger("../config.yaml")
+
+_MIN_BLOCK = 64 * 1024  # bytes; blocks are sized in powers of two from here
+
+
+class _BlockPool:
+    """Reusable shared-memory blocks, so a clip costs one memcpy instead of a create/unlink."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._free = {}  # size → [SharedMemory]
+        self._all = []
+
+    def acquire(self, nbytes: int) -> shared_memory.SharedMemory:
+        size = _MIN_BLOCK
+        while size < nbytes:
+            size *= 2
+        with self._lock:
+            free = self._free.get(size)
+            if free:
+                return free.pop()
+            block = shared_memory.SharedMemory(create=True, size=size)
+            self._all.append(block)
+            return block
+
+    def release(self, block: shared_memory.SharedMemory):
+        with self._lock:
+            self._free.setdefault(block.size, []).append(block)
+
+    def close(self):
+        with self._lock:
+            for block in self._all:
+                try:
+                    block.close()
+                    block.unlink()
+                except (FileNotFoundError, BufferError):
+                    pass
+            self._all, self._free = [], {}
+
+
+class ProcessPool:
+    """A process pool for stage kernels with shared-memory PCM hand-off."""
+
+    def __init__(self, workers: int = 2):
+        self.workers = max(1, int(workers))
+        # forkserver: children start from a clean server process, not a fork of our threads and locks
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        if context.get_start_method() == "forkserver":
+            context.set_forkserver_preload(["utils.audio_kernels"])
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        self._blocks = _BlockPool()
+        self._closed = False
+        logger.info(f"🧮 Process pool started | workers={self.workers} ({context.get_start_method()})")
+
+    def submit(self, kernel, pcm, **params):
+        """Run `kernel(samples, **params)` in a worker on a shared copy of `pcm`; returns a Future."""
+        nbytes = len(pcm)
+        block = self._blocks.acquire(nbytes)
+        block.buf[:nbytes] = pcm
+        try:
+            future = self._executor.submit(run_kernel, kernel, block.name, nbytes, params)
+        except Exception:
+            self._blocks.release(block)
+            raise
+        future.add_done_callback(lambda f: self._blocks.release(block))
+        return future
+
+    def run(self, kernel, pcm, **params):
+        """Submit and wait for the kernel's result (the calling thread waits without holding the GIL)."""
+        return self.submit(kernel, pcm, **params).result()
+
+    def shutdown(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._blocks.close()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_process_pool(workers: int = 2) -> ProcessPool:
+    """Return the process-wide pool, starting it on first use (its size is fixed from then on)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPool(workers)
+            atexit.register(_pool.shutdown)
+        elif int(workers) != _pool.workers:
+            logger.info(f"[Processes] Pool already running with {_pool.workers} workers; a restart applies {workers}")
+        return _pool
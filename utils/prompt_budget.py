@@ -0,0 +1,77 @@
+"""
+Token counting and budgeted prompt assembly for the summarizer.
+Uses tiktoken when it is installed, otherwise a calibrated character estimator.
+"""
+
+import math
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+# English meeting transcripts average ~4 characters per token on the GPT-4o tokenizer
+CHARS_PER_TOKEN = 4.0
+
+_encoders = {}
+
+
+def _get_encoder(model: str):
+    """Return (and cache) a tiktoken encoder for the model, or None."""
+    if tiktoken is None:
+        return None
+    if model not in _encoders:
+        try:
+            _encoders[model] = tiktoken.encoding_for_model(model)
+        except KeyError:
+            _encoders[model] = tiktoken.get_encoding("o200k_base")
+    return _encoders[model]
+
+
+def count_tokens(text: str, model: str = "gpt-4o") -> int:
+    """Count tokens in text for the given model (estimated if tiktoken is missing)."""
+    if not text:
+        return 0
+    encoder = _get_encoder(model)
+    if encoder is not None:
+        return len(encoder.encode(text, disallowed_special=()))
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def truncate_to_tokens(text: str, budget: int, model: str = "gpt-4o", keep: str = "end") -> str:
+    """Trim text to at most `budget` tokens, keeping its start or its end."""
+    if budget <= 0:
+        return ""
+    if count_tokens(text, model) <= budget:
+        return text
+    encoder = _get_encoder(model)
+    if encoder is not None:
+        tokens = encoder.encode(text, disallowed_special=())
+        tokens = tokens[-budget:] if keep == "end" else tokens[:budget]
+        return encoder.decode(tokens)
+    max_chars = int(budget * CHARS_PER_TOKEN)
+    return text[-max_chars:] if keep == "end" else text[:max_chars]
+
+
+def pack_newest(lines, budget: int, model: str = "gpt-4o"):
+    """
+    Split lines into batches of at most `budget` tokens each, filling from the newest line.
+
+    Returns batches in chronological order, so the last batch always holds the newest lines.
+    A single line longer than the budget is trimmed to fit.
+    """
+    batches = []
+    current, used = [], 0
+    for line in reversed(lines):
+        cost = count_tokens(line, model) + 1  # +1 for the joining newline
+        if cost > budget:
+            line = truncate_to_tokens(line, budget - 1, model, keep="start")
+            cost = budget
+        if current and used + cost > budget:
+            batches.append(current)
+            current, used = [], 0
+        current.append(line)
+        used += cost
+    if current:
+        batches.append(current)
+    return ["\n".join(reversed(batch)) for batch in reversed(batches)]
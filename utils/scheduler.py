@@ -0,0 +1,54 @@
+"""
+Partial-summary scheduler driven by how much was actually said.
+A partial is due after N seconds of speech or M new words, whichever comes first.
+"""
+
+import time
+
+
+class PartialScheduler:
+    """Decides when the summarizer should produce the next partial summary."""
+
+    def __init__(self, speech_seconds: float = 20.0, new_words: int = 60, min_spacing: float = 10.0):
+        self.speech_seconds = speech_seconds
+        self.new_words = new_words
+        self.min_spacing = min_spacing
+
+        self.pending_speech = 0.0  # seconds of speech since the last partial
+        self.pending_words = 0
+        self.last_fired = None
+
+    def add(self, segments):
+        """Account for newly transcribed segments."""
+        for seg in segments:
+            self.pending_speech += max(0.0, float(seg.get("end", 0.0)) - float(seg.get("start", 0.0)))
+            self.pending_words += len(seg.get("text", "").split())
+
+    def has_pending(self) -> bool:
+        return self.pending_words > 0
+
+    def is_due(self, now: float = None) -> bool:
+        """True when enough new speech arrived and the minimum spacing has passed."""
+        if not self.has_pending():
+            return False  # nothing changed since the last partial
+        now = time.monotonic() if now is None else now
+        if self.last_fired is not None and now - self.last_fired < self.min_spacing:
+            return False
+        return self.pending_speech >= self.speech_seconds or self.pending_words >= self.new_words
+
+    def mark_fired(self, now: float = None):
+        """Reset the counters after a partial has been produced."""
+        self.pending_speech = 0.0
+        self.pending_words = 0
+        self.last_fired = time.monotonic() if now is None else now
+
+    def mark_failed(self, now: float = None):
+        """A partial call failed: keep the pending speech and retry once min_spacing has passed."""
+        self.last_fired = time.monotonic() if now is None else now
+
+    def seconds_until_allowed(self, now: float = None) -> float:
+        """How long until min_spacing permits another partial (0 if it already does)."""
+        if self.last_fired is None:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.min_spacing - (now - self.last_fired))
@@ -0,0 +1,160 @@
+"""
+Bounded worker pools shared by several meeting sessions in one process.
+Each pool (STT, LLM) has a fixed number of threads and one FIFO per session; workers take
+tasks from the sessions round-robin and skip sessions already at their in-flight share, so
+a busy room queues behind itself instead of starving the others. Queue wait and run time
+are tracked per session.
+"""
+
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future
+
+from utils.logger import get_logger
+from utils.latency import LatencyHistogram
+
+logger = get_logger("../config.yaml")
+
+
+class _SessionStats:
+    def __init__(self):
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.wait = LatencyHistogram()
+        self.run = LatencyHistogram()
+
+    def snapshot(self, queued: int) -> dict:
+        wait, run = self.wait.summary(), self.run.summary()
+        return {
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "queued": queued,
+            "in_flight": self.in_flight,
+            "wait_p50": wait["p50"], "wait_p95": wait["p95"],
+            "run_p50": run["p50"], "run_p95": run["p95"],
+        }
+
+
+class FairPool:
+    """Fixed-size thread pool with round-robin scheduling across sessions."""
+
+    def __init__(self, name: str, workers: int = 4, max_share: int = None):
+        self.name = name
+        self.workers = max(1, int(workers))
+        # Most tasks one session may run at once; by default it may use the whole pool when alone
+        self.max_share = max(1, int(max_share)) if max_share else self.workers
+        self._cv = threading.Condition()
+        self._queues = {}  # session → deque of (future, fn, args, kwargs, enqueued_at)
+        self._rotation = deque()  # sessions with queued tasks, in turn order
+        self._stats = {}
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._worker, daemon=True, name=f"{name}-pool-{i}")
+            for i in range(self.workers)
+        ]
+        for t in self._threads:
+            t.start()
+        logger.info(f"🏊 {name} pool started | workers={self.workers}, max_share={self.max_share}")
+
+    def submit(self, session, fn, *args, **kwargs) -> Future:
+        """Queue `fn(*args, **kwargs)` on behalf of `session`."""
+        future = Future()
+        with self._cv:
+            if self._closed:
+                raise RuntimeError(f"{self.name} pool is shut down")
+            queue_ = self._queues.setdefault(session, deque())
+            if not queue_:
+                self._rotation.append(session)
+            queue_.append((future, fn, args, kwargs, time.perf_counter()))
+            self._stats.setdefault(session, _SessionStats()).submitted += 1
+            self._cv.notify()
+        return future
+
+    def run(self, session, fn, *args, **kwargs):
+        """Submit and wait for the result (the caller's thread just waits its turn)."""
+        return self.submit(session, fn, *args, **kwargs).result()
+
+    def _take(self):
+        """Next task from the first session in rotation that is under its share (cv held)."""
+        for _ in range(len(self._rotation)):
+            session = self._rotation.popleft()
+            if self._stats[session].in_flight >= self.max_share:
+                self._rotation.append(session)
+                continue
+            queue_ = self._queues[session]
+            task = queue_.popleft()
+            if queue_:
+                self._rotation.append(session)  # back of the line
+            self._stats[session].in_flight += 1
+            return session, task
+        return None, None
+
+    def _worker(self):
+        while True:
+            with self._cv:
+                session, task = self._take()
+                while task is None:
+                    if self._closed and not self._rotation:
+                        return
+                    self._cv.wait()
+                    session, task = self._take()
+
+            future, fn, args, kwargs, enqueued_at = task
+            started = time.perf_counter()
+            failed = False
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    failed = True
+                    future.set_exception(e)
+            finished = time.perf_counter()
+
+            with self._cv:
+                stats = self._stats[session]
+                stats.in_flight -= 1
+                stats.completed += 1
+                stats.failed += int(failed)
+                stats.wait.record(started - enqueued_at)
+                stats.run.record(finished - started)
+                self._cv.notify_all()  # a session at its share may now be eligible again
+
+    def stats(self, session=None) -> dict:
+        """Per-session counters and p50/p95 queue wait / run time (one session if given)."""
+        with self._cv:
+            sessions = [session] if session is not None else list(self._stats)
+            return {
+                s: self._stats[s].snapshot(len(self._queues.get(s, ())))
+                for s in sessions if s in self._stats
+            }
+
+    def forget(self, session):
+        """Drop a closed session's metrics once it has nothing queued or running."""
+        with self._cv:
+            stats = self._stats.get(session)
+            if not self._queues.get(session) and (stats is None or not stats.in_flight):
+                self._queues.pop(session, None)
+                self._stats.pop(session, None)
+
+    def shutdown(self, wait: bool = True):
+        with self._cv:
+            self._closed = True
+            self._cv.notify_all()
+        if wait:
+            for t in self._threads:
+                t.join()
+
+
+def log_pool_stats(pools: dict, session=None):
+    """One log line per pool and session."""
+    for pool in pools.values():
+        for s, st in pool.stats(session).items():
+            logger.info(
+                f"[Pools] {pool.name:<4} {s}: {st['completed']}/{st['submitted']} done ({st['failed']} failed) "
+                f"| queued={st['queued']} in_flight={st['in_flight']} | wait p50={st['wait_p50']:.2f}s "
+                f"p95={st['wait_p95']:.2f}s | run p50={st['run_p50']:.2f}s p95={st['run_p95']:.2f}s"
+            )
@@ -0,0 +1,463 @@
+"""
+Pipeline stage framework.
+A stage turns items from its input queue into items on its output queue. The StageRunner
+owns the worker threads, the end-of-stream sentinel (None), in-order output and per-item
+timing; the topology (stages, queues, concurrency) is declared under `pipeline.stages`
+in config.yaml and built by `build_pipeline`. Stages with an `async process_async(item)`
+can instead run as coroutines on the shared event loop (utils.async_engine).
+"""
+
+import time
+import queue
+import itertools
+import importlib
+import threading
+
+from utils.logger import get_logger
+from utils.latency import trace_of
+
+logger = get_logger("../config.yaml")
+
+# Spec keys consumed by build_pipeline; everything else is a stage option
+STAGE_SPEC_KEYS = frozenset({"name", "class", "input", "output", "concurrency", "ordered", "enabled", "engine", "pool"})
+
+
+class StageContext:
+    """Run-wide state shared by every stage (events, UI queue, parsed config, meeting setup)."""
+
+    def __init__(self, config_path, config, stop_event, pause_event, ui_queue=None, **meeting):
+        self.config_path = config_path
+        self.config = config or {}  # validated snapshot taken when the run started
+        self.settings = meeting.get("settings")  # ConfigService, for stages that follow live changes
+        self.overrides = meeting.get("overrides") or {}  # this session's per-section overrides
+        self._subscriptions = {}  # (section, handler) → callback registered with settings
+        self.stop_event = stop_event
+        self.pause_event = pause_event
+        self.ui_queue = ui_queue
+        self.objectives = meeting.get("objectives")
+        self.participants = meeting.get("participants") or []
+        self.library = meeting.get("library")
+        self.engine = meeting.get("engine")  # AsyncEngine when `pipeline.engine: asyncio`
+        self.latency = meeting.get("latency")  # LatencyTracker for queue-wait / stage / end-to-end times
+        self.session_id = meeting.get("session_id")  # None for a single-session controller
+        self.pools = meeting.get("pools") or {}  # shared FairPools ("stt", "llm") across sessions
+        self.journal = meeting.get("journal")  # SessionJournal, for crash recovery
+        self.processes = meeting.get("processes")  # ProcessPool for stages with `engine: process`
+
+    def record(self, record_type: str, **fields):
+        """Append a record to the session journal, if journaling is on."""
+        if self.journal is not None:
+            self.journal.append(record_type, **fields)
+
+    def call(self, pool: str, fn, *args, **kwargs):
+        """Run fn on the shared `pool` under this session's turn, or inline without pools."""
+        if pool in self.pools:
+            return self.pools[pool].run(self.session_id, fn, *args, **kwargs)
+        return fn(*args, **kwargs)
+
+    def section(self, name: str) -> dict:
+        return self.config.get(name) or {}
+
+    def view(self, name: str, values) -> dict:
+        """A config section as this session sees it (its overrides applied)."""
+        merged = dict(values or {})
+        merged.update(self.overrides.get(name) or {})
+        return merged
+
+    def subscribe(self, name: str, handler):
+        """Follow live changes of a config section through this session's view of it."""
+        if self.settings is None:
+            return
+
+        def callback(new, old):
+            handler(self.view(name, new), self.view(name, old))
+
+        self._subscriptions[(name, handler)] = callback
+        self.settings.subscribe(name, callback)
+
+    def unsubscribe(self, name: str, handler):
+        callback = self._subscriptions.pop((name, handler), None)
+        if callback is not None:
+            self.settings.unsubscribe(name, callback)
+
+
+class Stage:
+    """
+    Base class for a processing stage.
+
+    Override `process(item)` and return the item to pass downstream (None drops it).
+    Lifecycle: `setup()` once before the workers start, `on_emit(item)` for every output in
+    input order, `teardown()` once after the last worker finished; `reconfigure(options)`
+    when the stage's spec options change in config.yaml mid-run. When a meeting is resumed
+    from its journal, `resume(state)` runs before the stage starts: it restores the stage's
+    state and returns the unfinished items to queue ahead of new input (a source's items go
+    on its output queue, ahead of what it produces). Sources override
+    `produce(emit)`; stages with their own loop override `consume(input_q)`. Network-bound
+    stages may also define `async process_async(item)`, used under the asyncio engine.
+    CPU-bound stages may define a picklable `kernel(samples, **kernel_args(item))` over the
+    item's PCM plus `kernel_done(item, result)`; with `engine: process` the kernel runs in a
+    worker process (PCM handed over in shared memory) instead of under the GIL.
+    """
+
+    name = "stage"
+
+    def __init__(self, ctx: StageContext, **options):
+        self.ctx = ctx
+        self.options = options
+        self.logger = logger
+
+    def setup(self):
+        pass
+
+    def process(self, item):
+        return item
+
+    def on_emit(self, item):
+        return item
+
+    def reconfigure(self, options: dict):
+        self.options = options
+
+    def resume(self, state) -> list:
+        return []
+
+    def teardown(self):
+        pass
+
+    produce = None  # source stages: produce(emit) runs until ctx.stop_event, calling emit(item)
+    consume = None  # custom loop: consume(input_q) reads until the sentinel itself
+    process_async = None  # coroutine variant of process(), run on ctx.engine's event loop
+    kernel = None  # module-level fn(samples, **params), run in ctx.processes under `engine: process`
+
+    def kernel_args(self, item) -> dict:
+        return {}
+
+    def kernel_done(self, item, result):
+        return result
+
+
+class SourceStage(Stage):
+    """Stage without an input queue: `produce(emit)` generates items until ctx.stop_event is set."""
+
+    def produce(self, emit):
+        raise NotImplementedError
+
+
+class StageRunner:
+    """
+    Runs one stage between an input and an output queue, either with N worker threads or,
+    given an AsyncEngine, with up to N `process_async` coroutines in flight on its loop.
+    Given a ProcessPool, the N workers hand each item's kernel to a worker process.
+    """
+
+    def __init__(self, stage: Stage, input_q=None, output_q=None, concurrency: int = 1, ordered: bool = True,
+                 engine=None, pool: str = None, processes=None):
+        if (stage.produce is not None or stage.consume is not None) and concurrency != 1:
+            raise ValueError(f"Stage {stage.name} runs its own loop and cannot use concurrency={concurrency}")
+        if engine is not None and stage.process_async is None:
+            raise ValueError(f"Stage {stage.name} has no process_async and cannot run on the asyncio engine")
+        if processes is not None and stage.kernel is None:
+            raise ValueError(f"Stage {stage.name} has no kernel and cannot run in worker processes")
+        self.stage = stage
+        self.engine = engine
+        self.pool = pool  # shared pool that runs process() when sessions share workers
+        self.processes = processes  # ProcessPool running the stage's kernel
+        self.latency = stage.ctx.latency
+        self.name = stage.name
+        self.logger = logger
+        self.input_q = input_q
+        self.output_q = output_q
+        self.concurrency = max(1, int(concurrency))
+        self.ordered = ordered
+
+        self._in_lock = threading.Lock()  # pairs each get() with its sequence number
+        self._pool_lock = threading.Condition()  # worker count / in-flight coroutines vs. concurrency
+        self._workers = []
+        self._live_workers = 0
+        self._inflight = 0
+        self._seq = itertools.count()
+        self._ended = False
+        self._emit_lock = threading.Lock()
+        self._next_out = 0
+        self._held = {}  # seq → output finished ahead of an earlier item
+
+        self._stats_lock = threading.Lock()
+        self.items = 0
+        self.errors = 0
+        self.busy = 0.0
+        self.max_latency = 0.0
+        self._started = None
+        prefix = f"{stage.ctx.session_id}/" if stage.ctx.session_id else ""
+        self._supervisor = threading.Thread(target=self._run, daemon=True, name=f"{prefix}{stage.name}-stage")
+
+    # --- thread-like interface used by MasterController ---
+    def start(self):
+        self._supervisor.start()
+
+    def is_alive(self) -> bool:
+        return self._supervisor.is_alive()
+
+    def join(self, timeout=None):
+        self._supervisor.join(timeout)
+
+    # --- output ---
+    def _send(self, item):
+        item = self.stage.on_emit(item)
+        if item is not None and self.output_q is not None:
+            trace = trace_of(item)
+            if trace is not None:
+                trace["handoff"] = time.time()
+            self.output_q.put(item)
+
+    def emit(self, item):
+        """Emit directly (sources and custom loops), bypassing the reorder buffer."""
+        with self._emit_lock:
+            self._send(item)
+
+    def _emit_ordered(self, seq, item):
+        with self._emit_lock:
+            if not self.ordered:
+                self._send(item)
+                return
+            self._held[seq] = item
+            while self._next_out in self._held:
+                out = self._held.pop(self._next_out)
+                self._next_out += 1
+                if out is not None:
+                    self._send(out)
+
+    def _record(self, elapsed: float, failed: bool = False):
+        with self._stats_lock:
+            self.items += 1
+            self.errors += int(failed)
+            self.busy += elapsed
+            self.max_latency = max(self.max_latency, elapsed)
+        if self.latency is not None:
+            self.latency.record(f"stage.{self.name}", elapsed)
+
+    def _received(self, item):
+        """Record how long a traced item sat in this stage's input queue."""
+        trace = trace_of(item)
+        if trace is not None and self.latency is not None:
+            self.latency.record(f"wait.{self.name}", time.time() - trace["handoff"])
+
+    # --- workers ---
+    def set_concurrency(self, concurrency: int):
+        """Resize the worker pool (or the in-flight limit) of a running stage."""
+        concurrency = max(1, int(concurrency))
+        if self.stage.produce is not None or self.stage.consume is not None:
+            if concurrency != 1:
+                self.logger.warning(f"[Stage] {self.name} runs its own loop; concurrency stays 1")
+            return
+        with self._pool_lock:
+            if concurrency == self.concurrency:
+                return
+            self.logger.info(f"[Stage] {self.name} concurrency {self.concurrency} → {concurrency}")
+            self.concurrency = concurrency
+            self._pool_lock.notify_all()
+        if self.engine is None and self._workers:
+            self._spawn_workers()  # pool already running; extra workers retire themselves when shrinking
+
+    def _spawn_workers(self):
+        with self._pool_lock:
+            while self._live_workers < self.concurrency and not self._ended:
+                self._live_workers += 1
+                w = threading.Thread(target=self._worker, daemon=True, name=f"{self.name}-{len(self._workers)}")
+                self._workers.append(w)
+                w.start()
+
+    def _retire(self) -> bool:
+        """Let this worker exit when the pool is larger than the configured concurrency."""
+        with self._pool_lock:
+            if self._live_workers > self.concurrency:
+                self._live_workers -= 1
+                return True
+            return False
+
+    def _worker(self):
+        while True:
+            if self._retire():
+                return
+            with self._in_lock:
+                if self._ended:
+                    return
+                item = self.input_q.get()
+                if item is None:
+                    self._ended = True
+                    return
+                seq = next(self._seq)
+
+            self._received(item)
+            started = time.perf_counter()
+            failed = False
+            try:
+                result = self._process(item)
+            except Exception as e:
+                self.logger.error(f"[Stage] {self.name} failed on an item: {e}", exc_info=True)
+                result, failed = None, True
+            self._record(time.perf_counter() - started, failed)
+            self._emit_ordered(seq, result)
+
+    def _process(self, item):
+        if self.processes is not None:
+            stage = self.stage
+            return stage.kernel_done(item, self.processes.run(stage.kernel, item["pcm"], **stage.kernel_args(item)))
+        if self.pool:
+            return self.stage.ctx.call(self.pool, self.stage.process, item)
+        return self.stage.process(item)
+
+    # --- asyncio engine ---
+    def _feed_async(self):
+        """Read the input queue and start a coroutine per item, at most `concurrency` in flight."""
+        done_q = queue.SimpleQueue()
+        collector = threading.Thread(
+            target=self._collect_async, args=(done_q,), daemon=True, name=f"{self.name}-collect"
+        )
+        collector.start()
+        submitted = 0
+        while True:
+            item = self.input_q.get()
+            if item is None:
+                break
+            self._received(item)
+            with self._pool_lock:
+                while self._inflight >= self.concurrency:
+                    self._pool_lock.wait()
+                self._inflight += 1
+            seq, started = next(self._seq), time.perf_counter()
+            future = self.engine.submit(self.stage.process_async(item))
+            future.add_done_callback(lambda f, seq=seq, started=started: done_q.put((seq, started, f)))
+            submitted += 1
+        done_q.put((None, submitted, None))
+        collector.join()
+
+    def _collect_async(self, done_q):
+        """Emit finished coroutines in input order; runs off the loop so a full output queue never blocks it."""
+        completed, total = 0, None
+        while total is None or completed < total:
+            seq, started, future = done_q.get()
+            if seq is None:
+                total = started  # end marker carries the number of items submitted
+                continue
+            failed = False
+            try:
+                result = future.result()
+            except Exception as e:
+                self.logger.error(f"[Stage] {self.name} failed on an item: {e}", exc_info=True)
+                result, failed = None, True
+            self._record(time.perf_counter() - started, failed)
+            self._emit_ordered(seq, result)
+            completed += 1
+            with self._pool_lock:
+                self._inflight -= 1
+                self._pool_lock.notify_all()
+
+    def _run(self):
+        self._started = time.perf_counter()
+        mode = "asyncio in-flight" if self.engine is not None else "process workers" if self.processes else "workers"
+        self.logger.info(f"▶️ Stage {self.name} starting ({mode}={self.concurrency}).")
+        try:
+            self.stage.setup()
+            if self.stage.produce is not None:
+                self.stage.produce(self.emit)
+            elif self.stage.consume is not None:
+                self.stage.consume(self.input_q)
+            elif self.engine is not None:
+                self._feed_async()
+            else:
+                self._spawn_workers()
+                # The pool may grow while we wait (set_concurrency), so join until none is left
+                while True:
+                    with self._pool_lock:
+                        alive = [w for w in self._workers if w.is_alive()]
+                    if not alive:
+                        break
+                    for w in alive:
+                        w.join()
+        except Exception as e:
+            self.logger.error(f"[Stage] {self.name} failed: {e}", exc_info=True)
+        finally:
+            try:
+                self.stage.teardown()
+            except Exception as e:
+                self.logger.warning(f"[Stage] {self.name} teardown failed: {e}", exc_info=True)
+            if self.output_q is not None:
+                self.output_q.put(None)  # end of stream → the next stage drains and exits
+            self.log_stats()
+            self.logger.info(f"⏹️ Stage {self.name} stopped.")
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            wall = (time.perf_counter() - self._started) if self._started else 0.0
+            return {
+                "items": self.items,
+                "errors": self.errors,
+                "avg_latency": round(self.busy / self.items, 3) if self.items else 0.0,
+                "max_latency": round(self.max_latency, 3),
+                "utilization": round(self.busy / (wall * self.concurrency), 3) if wall else 0.0,
+            }
+
+    def log_stats(self):
+        if self.stage.produce is not None or self.stage.consume is not None:
+            return
+        s = self.stats()
+        self.logger.info(
+            f"[Stage] {self.name}: {s['items']} items ({s['errors']} failed) | avg={s['avg_latency']:.2f}s "
+            f"| max={s['max_latency']:.2f}s | utilization={s['utilization']:.0%} x{self.concurrency}"
+        )
+
+
+def load_stage_class(path: str):
+    """Import "package.module.ClassName"."""
+    module_name, _, class_name = path.rpartition(".")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def build_pipeline(specs, ctx: StageContext, make_queue):
+    """
+    Instantiate the stages declared in `pipeline.stages`.
+
+    Each spec has `name`, `class`, optional `input` / `output` queue names, `concurrency`,
+    `ordered`, `enabled`, `engine` ("threads" / "asyncio" / "process") and `pool` (shared worker
+    pool for process() when several sessions run); any other keys are passed to the stage as
+    options. With `ctx.engine` set, stages that define `process_async` default to the asyncio
+    engine; "process" runs the stage's kernel in `ctx.processes`. Queues are created once per name with `make_queue(name)`.
+    Returns (runners, {name: queue}).
+    """
+    queues, runners = {}, []
+
+    def get_queue(name):
+        if name and name not in queues:
+            queues[name] = make_queue(name)
+        return queues.get(name) if name else None
+
+    for spec in specs:
+        spec = dict(spec)
+        if not spec.pop("enabled", True):
+            continue
+        name = spec.pop("name")
+        cls = load_stage_class(spec.pop("class"))
+        input_name, output_name = spec.pop("input", None), spec.pop("output", None)
+        concurrency = int(spec.pop("concurrency", 1))
+        ordered = bool(spec.pop("ordered", True))
+        engine_mode = spec.pop("engine", None)
+        pool = spec.pop("pool", None)
+        stage = cls(ctx, **spec)
+        stage.name = name
+        if engine_mode is None:
+            engine_mode = "asyncio" if ctx.engine is not None and stage.process_async is not None else "threads"
+        if engine_mode == "asyncio" and ctx.engine is None:
+            raise ValueError(f"Stage {name} asks for the asyncio engine but `pipeline.engine` is not asyncio")
+        if engine_mode == "process" and ctx.processes is None:
+            raise ValueError(f"Stage {name} asks for worker processes but no process pool was started")
+        engine = ctx.engine if engine_mode == "asyncio" else None
+        processes = ctx.processes if engine_mode == "process" else None
+        runners.append(StageRunner(
+            stage, get_queue(input_name), get_queue(output_name), concurrency, ordered, engine, pool, processes
+        ))
+
+    produced = {r.output_q for r in runners if r.output_q is not None}
+    for r in runners:
+        if r.input_q is not None and r.input_q not in produced:
+            raise ValueError(f"Stage {r.name} reads a queue that no stage writes to")
+    return runners, queues
@@ -1,5 +1,5 @@
 import os
-import threading
+import time
 import requests
 from io import BytesIO
 from datetime import timedelta
@@ -10,29 +10,20 @@ import os
 from dotenv import load_dotenv
 import elevenlabs
 
+from utils.logger import get_logger
+from utils.prompt_budget import count_tokens, pack_newest, truncate_to_tokens
+from utils.model_router import get_model, record_call
+
 load_dotenv()
 
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 
-elevenlabs = ElevenLabs(api_key=ELEVENLABS_API_KEY)
+# ELEVENLABS_BASE_URL (like OPENAI_BASE_URL for the OpenAI clients) points STT at a proxy or a local fake
+elevenlabs = ElevenLabs(api_key=ELEVENLABS_API_KEY, base_url=os.getenv("ELEVENLABS_BASE_URL"))
 openai_client = OpenAI(api_key=OPENAI_API_KEY)
-global_state_lock = threading.Lock()
-
-global_state = {
-    "total_offset": 0.0
-}
-
-def update_global_state(**kwargs):
-    """Thread-safe update to the shared state."""
-    with global_state_lock:
-        global_state.update(kwargs)
-
-def get_global_state():
-    """Return a snapshot of the current global state."""
-    with global_state_lock:
-        return dict(global_state)
+logger = get_logger("../config.yaml")
 
 
 def format_timestamp(seconds: float) -> str:
@@ -48,16 +39,33 @@ def format_timestamp(seconds: float) -> str:
 
 def transcribe_chunk(file_path, total_offset=None, combined_transcript=None, language="eng", diarize=True):
     """Transcribe one live/dynamic audio chunk and maintain continuous timestamps."""
-    if not os.path.exists(file_path):
-        print(f"⚠️ File not found:  {file_path}\n")
-        return total_offset, combined_transcript
-
     if combined_transcript is None:
         combined_transcript = defaultdict(list)
 
-    state = get_global_state()
+    total_offset, segments = transcribe_segments(
+        file_path, total_offset=total_offset, language=language, diarize=diarize
+    )
+    for seg in segments:
+        combined_transcript[seg["speaker"]].append(seg["text"])
+
+    return total_offset, combined_transcript
+
+
+def transcribe_segments(file_path, total_offset=None, language="eng", diarize=True):
+    """
+    Transcribe one audio chunk and return only the segments it contains.
+
+    Each segment is a dict with ``speaker`` ("Speaker N"), absolute ``start`` / ``end``
+    in seconds since the meeting began, and ``text``. Stateless: the caller passes the
+    chunk's ``total_offset`` and gets the offset after it back, so concurrent sessions
+    never share timing state.
+    """
     if total_offset is None:
-        total_offset = state.get("total_offset", 0.0)
+        total_offset = 0.0
+
+    if not os.path.exists(file_path):
+        print(f"⚠️ File not found:  {file_path}\n")
+        return total_offset, []
 
     with open(file_path, "rb") as f:
         audio_data = BytesIO(f.read())
@@ -73,7 +81,36 @@ def transcribe_chunk(file_path, total_offset=None, combined_transcript=None, lan
         tag_audio_events=True,
         timestamps_granularity="word",
     )
+    return _segments_from_transcription(transcription, total_offset)
+
+
+async def transcribe_segments_async(file_path, engine, total_offset=0.0, language="eng", diarize=True):
+    """
+    Coroutine variant of `transcribe_segments` for the asyncio engine: the request goes
+    through the engine's AsyncElevenLabs client, bounded by its "stt" limiter.
+    """
+    if not os.path.exists(file_path):
+        print(f"⚠️ File not found:  {file_path}\n")
+        return total_offset, []
 
+    with open(file_path, "rb") as f:
+        audio_data = BytesIO(f.read())
+
+    print(f"\n🎧 Processing new chunk: {file_path} ...")
+    async with engine.limit("stt"):
+        transcription = await engine.elevenlabs().speech_to_text.convert(
+            file=audio_data,
+            model_id="scribe_v1",
+            language_code=language,
+            diarize=diarize,
+            tag_audio_events=True,
+            timestamps_granularity="word",
+        )
+    return _segments_from_transcription(transcription, total_offset)
+
+
+def _segments_from_transcription(transcription, total_offset):
+    """Group the word timestamps of one STT response into per-speaker segments at absolute times."""
     language_code = transcription.language_code or "unknown"
 
     
@@ -106,33 +143,28 @@ def transcribe_chunk(file_path, total_offset=None, combined_transcript=None, lan
         })
 
     segments.sort(key=lambda x: x["start"])
-    # If there are timestamps, update state with the latest timing
-    if segments:
-        update_global_state(
-            chunk_start=segments[0]["start"] + total_offset,
-            chunk_end=segments[-1]["end"] + total_offset,
-    )
 
 
     
     print("\n🗣️ Formatted Transcript (this chunk):\n")
+    new_segments = []
     for seg in segments:
         adjusted_start = seg["start"] + total_offset
         timestamp = format_timestamp(adjusted_start)
         speaker_name = seg["speaker"].replace("speaker_", "Speaker ")
         text = seg["text"].strip()
         print(f'{speaker_name} ({timestamp}, {language_code}): "{text}"')
-        combined_transcript[speaker_name].append(text)
-        update_global_state(
-        current_speaker=speaker_name,
-        latest_text=text
-    )
+        new_segments.append({
+            "speaker": speaker_name,
+            "start": adjusted_start,
+            "end": seg["end"] + total_offset,
+            "text": text,
+        })
 
     if transcription.words:
         total_offset += transcription.words[-1].end
-        update_global_state(total_offset=total_offset)
 
-    return total_offset, combined_transcript
+    return total_offset, new_segments
 
 
 
@@ -150,32 +182,16 @@ def print_combined_transcript(combined_transcript):
 
 
 
-def summarize_text(text, participant_names=None):
-    """Generate a structured meeting summary using OpenAI GPT model with hard debug logging."""
-    import random, traceback, json
-
-   
-    # if not participant_names:
-    #     participant_names = [f"Speaker_{i}" for i in range(1, random.randint(3, 6))]
-
-    import re
-    if not participant_names:
-        speakers_found = sorted(set(re.findall(r"Speaker\s*\d+", text)))
-        if speakers_found:
-            participant_names = speakers_found
-        else:
-            participant_names = [f"Speaker_{i}" for i in range(1, random.int(3,6))]
-
-
-    formatted_names = sorted(list(set(
-        [n.replace("speaker_", "Speaker ") if n.lower().startswith("speaker_") else n
-         for n in participant_names]
-    )))
-    name_string = ", ".join(formatted_names)
-    count = len(formatted_names)
+def _summary_prompt(count, name_string, transcript, context=None):
+    """Build the structured-summary prompt, optionally with carried-over context."""
+    context_block = ""
+    if context:
+        context_block = f"""
+Context carried over from earlier in the meeting (already summarized, use it for continuity):
+{context}
+"""
 
-    # === Prompt ===
-    prompt = f"""
+    return f"""
 You are an expert meeting summarizer and corporate analyst.
 Analyze the following meeting transcript and output these 5 sections **in this exact order**:
 
@@ -187,47 +203,78 @@ Analyze the following meeting transcript and output these 5 sections **in this e
 
 Output each section clearly labeled and formatted with bullet points where appropriate.
 Do not add extra commentary or invented information.
-
+{context_block}
 Meeting Transcript:
-{text[:8000]}  # ✅ truncate safely to prevent overload
+{transcript}
 """
 
+
+def _call_summary_model(prompt, label="1/1", on_delta=None, task="partial", models=None, session_id=None):
+    """
+    Send one summary prompt to the model routed for `task` and return the text (or an error string).
+
+    When `on_delta` is given the response is streamed and each text delta is passed to it
+    as it arrives; time-to-first-token is logged.
+    """
+    import traceback
+
+    route = get_model(task, models)
+    prompt_tokens = count_tokens(prompt, route["model"])
+    logger.info(f"[Summarizer] {task} call {label} | model={route['model']} | prompt_tokens={prompt_tokens}")
+
     try:
-        print("\n[DEBUG] Calling OpenAI for final summary...")
+        started = time.perf_counter()
         response = openai_client.chat.completions.create(
-            model="gpt-4o", 
+            model=route["model"],
             messages=[
                 {"role": "system", "content": "You are a precise and structured meeting summarizer."},
                 {"role": "user", "content": prompt},
             ],
             temperature=0.3,
-            max_tokens=1200,
-            timeout=60,
+            max_tokens=route["max_tokens"],
+            timeout=route["timeout"],
+            **({"stream": True, "stream_options": {"include_usage": True}} if on_delta else {}),
         )
 
-        # Try extracting text from response
-        # if hasattr(response, "choices") and len(response.choices) > 0:
-        #     choice = response.choices[0]
-        #     if hasattr(choice, "message") and hasattr(choice.message, "content"):
-        #         content = choice.message.content.strip()
-        #         if content:
-        #             print("\n[DEBUG] Summary content extracted successfully.")
-        #             return content
-        #         else:
-        #             print("⚠️ [DEBUG] Empty message content returned by API.")
-        #             return None
-        #     else:
-        #         print("⚠️ [DEBUG] Missing .message or .content in response. Raw choice:", choice)
-        #         return None
-        # else:
-        #     print("⚠️ [DEBUG] No .choices field found in response.")
-        #     return None
-
-        try:
-            return response.choices[0].message.content.strip()
-        except Exception as e:
-            print(f"⚠️ Failed to extract content: {e}")
-            return None
+        if on_delta:
+            parts, usage, first_token_at = [], None, None
+            for chunk in response:
+                if getattr(chunk, "usage", None) is not None:
+                    usage = chunk.usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if not delta:
+                    continue
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                    logger.info(
+                        f"[Summarizer] Call {label} time_to_first_token={first_token_at - started:.2f}s"
+                    )
+                parts.append(delta)
+                on_delta(delta)
+            content = "".join(parts).strip()
+        else:
+            usage = getattr(response, "usage", None)
+            try:
+                content = response.choices[0].message.content.strip()
+            except Exception as e:
+                print(f"⚠️ Failed to extract content: {e}")
+                content = None
+
+        elapsed = time.perf_counter() - started
+        record_call(
+            task, route["model"], elapsed,
+            prompt_tokens=usage.prompt_tokens if usage is not None else prompt_tokens,
+            completion_tokens=usage.completion_tokens if usage is not None else count_tokens(content or ""),
+            session_id=session_id,
+        )
+        if usage is not None:
+            logger.info(
+                f"[Summarizer] Call {label} usage | prompt_tokens={usage.prompt_tokens} "
+                f"| completion_tokens={usage.completion_tokens} | total_time={elapsed:.2f}s"
+            )
+        return content
 
 
     except Exception as e:
@@ -236,6 +283,73 @@ Meeting Transcript:
         return f"OpenAI API Error: {e}"
 
 
+def summarize_text(text, participant_names=None, context=None, token_budget=8000,
+                   context_budget=1500, overflow="split", on_delta=None, task="partial", models=None,
+                   session_id=None):
+    """
+    Generate a structured meeting summary using OpenAI GPT model.
+
+    The prompt is filled up to `token_budget` tokens, newest transcript lines first, with
+    up to `context_budget` tokens of carried-over `context` (e.g. the previous summary).
+    When the transcript does not fit, `overflow="split"` summarizes it in several calls,
+    oldest batch first, carrying each result into the next; `overflow="truncate"` keeps
+    only the newest lines that fit. `on_delta`, if given, receives the streamed text of the
+    last (returned) call as it is generated. `task` selects the model route ("partial" / "final"),
+    resolved through `models` (a session's view of the `models` section) when given; usage is
+    recorded under `session_id`.
+    """
+    import random
+
+   
+    # if not participant_names:
+    #     participant_names = [f"Speaker_{i}" for i in range(1, random.randint(3, 6))]
+
+    import re
+    if not participant_names:
+        speakers_found = sorted(set(re.findall(r"Speaker\s*\d+", text)))
+        if speakers_found:
+            participant_names = speakers_found
+        else:
+            participant_names = [f"Speaker_{i}" for i in range(1, random.randint(3, 6))]
+
+
+    formatted_names = sorted(list(set(
+        [n.replace("speaker_", "Speaker ") if n.lower().startswith("speaker_") else n
+         for n in participant_names]
+    )))
+    name_string = ", ".join(formatted_names)
+    count = len(formatted_names)
+
+    # === Token budget ===
+    model = get_model(task, models)["model"]
+    overhead = count_tokens(_summary_prompt(count, name_string, ""), model) + context_budget
+    available = max(token_budget - overhead, 256)
+    batches = pack_newest(text.splitlines(), available, model) or [""]
+    if overflow == "truncate" and len(batches) > 1:
+        logger.info(f"[Summarizer] Transcript over budget, dropping {len(batches) - 1} oldest batch(es)")
+        batches = batches[-1:]
+
+    summary = None
+    carried = context
+    for i, batch in enumerate(batches, start=1):
+        if carried:
+            carried = truncate_to_tokens(carried, context_budget, model, keep="end")
+        prompt = _summary_prompt(count, name_string, batch, carried)
+        summary = _call_summary_model(
+            prompt,
+            label=f"{i}/{len(batches)}",
+            on_delta=on_delta if i == len(batches) else None,
+            task=task,
+            models=models,
+            session_id=session_id,
+        )
+        if summary is None or summary.startswith("OpenAI API Error"):
+            break
+        carried = summary
+
+    return summary
+
+
 
 def summarize_meeting(combined_transcript):
     """Generate the full meeting summary including all 5 required sections."""
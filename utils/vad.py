@@ -0,0 +1,57 @@
+"""
+Energy-based voice activity detection stage.
+Drops captured clips that are (almost) entirely silence before they reach WAV conversion
+and speech-to-text, so quiet stretches of a meeting cost no STT calls.
+"""
+
+import numpy as np
+
+from utils.stages import Stage
+from utils.audio_kernels import voiced_fraction
+
+
+class VadStage(Stage):
+    """Pass clips whose share of voiced frames reaches `min_voiced`; drop the rest."""
+
+    kernel = staticmethod(voiced_fraction)  # `engine: process` runs the level analysis off the GIL
+
+    def __init__(self, ctx, threshold_db: float = -45.0, min_voiced: float = 0.05, frame_ms: int = 30, **options):
+        super().__init__(ctx, **options)
+        self.rate = int(ctx.section("audio").get("rate", 16000))
+        self.threshold_db = float(threshold_db)
+        self.min_voiced = float(min_voiced)
+        self.frame_len = max(1, int(self.rate * frame_ms / 1000))
+        self.dropped = 0
+
+    def reconfigure(self, options: dict):
+        """Retune the thresholds mid-meeting (frame length stays as started)."""
+        super().reconfigure(options)
+        self.threshold_db = float(options.get("threshold_db", self.threshold_db))
+        self.min_voiced = float(options.get("min_voiced", self.min_voiced))
+        self.logger.info(f"[VAD] threshold={self.threshold_db:.0f} dBFS, min_voiced={self.min_voiced:.0%}")
+
+    def voiced_fraction(self, pcm: bytes) -> float:
+        """Share of frames whose RMS level (dBFS) is above the threshold."""
+        return voiced_fraction(np.frombuffer(pcm, dtype=np.int16), **self.kernel_args(None))
+
+    def kernel_args(self, clip) -> dict:
+        return {"frame_len": self.frame_len, "threshold_db": self.threshold_db}
+
+    def kernel_done(self, clip, voiced):
+        if voiced < self.min_voiced:
+            self.dropped += 1
+            seq = clip.get("seq")
+            last_seq = clip.get("last_seq", seq)  # clips coalesced in the record queue
+            self.logger.info(f"[VAD] Skipped silent clip #{seq} (voiced={voiced:.0%})")
+            # Settled: a resumed meeting must not send it to speech-to-text after all
+            self.ctx.record("dropped", seq=seq, last_seq=last_seq)
+            if self.ctx.journal is not None and seq is not None:
+                self.ctx.journal.discard_audio(seq, last_seq)
+            return None
+        return clip
+
+    def process(self, clip):
+        return self.kernel_done(clip, self.voiced_fraction(clip["pcm"]))
+
+    def teardown(self):
+        self.logger.info(f"🔇 VAD stopped ({self.dropped} silent clips skipped).")
@@ -0,0 +1,149 @@
+"""
+Persisted top-k vector index over the objective/topic library.
+Library items are embedded once with the evaluator's model, optionally reduced with PCA,
+and stored as one row-normalized float32 (or int8) matrix; a query is a single matvec plus
+`argpartition`, so scoring a summary against hundreds of items takes microseconds.
+"""
+
+import os
+import json
+import hashlib
+import numpy as np
+
+from utils.evaluator import Int8Matrix, embed_texts, embedding_space, log_matrix_memory, normalize_rows, pack_matrix
+from utils.model_router import get_model
+from utils.logger import get_logger
+
+logger = get_logger("../config.yaml")
+
+
+def load_library(path: str) -> dict:
+    """Read a library file: JSON list of texts, JSON {name: description}, or one item per text line."""
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+        else:
+            data = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    if isinstance(data, dict):
+        return {str(k): str(v) for k, v in data.items()}
+    return {item: item for item in data}
+
+
+class VectorIndex:
+    """Row-normalized float32/int8 matrix of library embeddings with optional PCA projection."""
+
+    def __init__(self, names, texts, matrix, model, mean=None, components=None):
+        self.names = list(names)
+        self.texts = list(texts)
+        self.matrix = matrix if isinstance(matrix, Int8Matrix) else np.ascontiguousarray(matrix, dtype=np.float32)
+        self.model = model  # embedding space key, e.g. "text-embedding-3-large@1024"
+        self.mean = mean  # (dim,) float32, set when PCA is used
+        self.components = components  # (pca_dims, dim) float32
+
+    @staticmethod
+    def fingerprint(names, texts, model: str, pca_dims=None, storage: str = "float32") -> str:
+        digest = hashlib.sha1(f"{model}|{pca_dims}|{storage}".encode("utf-8"))
+        for name, text in zip(names, texts):
+            digest.update(b"\0" + name.encode("utf-8") + b"\1" + text.encode("utf-8"))
+        return digest.hexdigest()
+
+    @classmethod
+    def build(cls, library: dict, pca_dims: int = None, storage: str = "float32"):
+        """Embed the library (through the embedding cache), fit the optional PCA and pack the rows."""
+        names, texts = list(library.keys()), list(library.values())
+        route = get_model("evaluation")  # one route for every row, even if it is reloaded meanwhile
+        vectors = embed_texts(texts, route=route)
+        mean = components = None
+        if pca_dims and pca_dims < min(vectors.shape):
+            mean = vectors.mean(axis=0)
+            # Principal axes of the centered library via thin SVD
+            _, _, vt = np.linalg.svd(vectors - mean, full_matrices=False)
+            components = np.ascontiguousarray(vt[:pca_dims], dtype=np.float32)
+            mean = mean.astype(np.float32)
+            vectors = (vectors - mean) @ components.T
+        return cls(names, texts, pack_matrix(vectors, storage), embedding_space(route)[2], mean, components)
+
+    @property
+    def pca_dims(self):
+        return None if self.components is None else self.components.shape[0]
+
+    @property
+    def storage(self) -> str:
+        return "int8" if isinstance(self.matrix, Int8Matrix) else "float32"
+
+    @property
+    def nbytes(self) -> int:
+        extra = 0 if self.components is None else self.mean.nbytes + self.components.nbytes
+        return self.matrix.nbytes + extra
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp.npz"
+        extra = {} if self.components is None else {"mean": self.mean, "components": self.components}
+        if isinstance(self.matrix, Int8Matrix):
+            extra.update(matrix=self.matrix.data, scale=self.matrix.scale)
+        else:
+            extra.update(matrix=self.matrix)
+        np.savez(
+            tmp_path, names=np.array(self.names, dtype=str), texts=np.array(self.texts, dtype=str), model=self.model,
+            fingerprint=self.fingerprint(self.names, self.texts, self.model, self.pca_dims, self.storage), **extra,
+        )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        with np.load(path) as data:
+            matrix = Int8Matrix(data["matrix"], data["scale"]) if "scale" in data else data["matrix"]
+            return cls(
+                data["names"].tolist(), data["texts"].tolist(), matrix, str(data["model"]),
+                data["mean"] if "mean" in data else None,
+                data["components"] if "components" in data else None,
+            ), str(data["fingerprint"])
+
+    @classmethod
+    def load_or_build(cls, library: dict, path: str, pca_dims: int = None, storage: str = "float32"):
+        """Reuse the index at `path` if it was built from the same items (names included), model, PCA size and storage."""
+        wanted = cls.fingerprint(list(library.keys()), list(library.values()), embedding_space()[2], pca_dims, storage)
+        index = None
+        if os.path.exists(path):
+            try:
+                index, fingerprint = cls.load(path)
+                if fingerprint != wanted:
+                    index = None
+                else:
+                    logger.info(f"[VectorIndex] Loaded {len(index.names)} library items from {path}")
+            except Exception as e:
+                logger.warning(f"[VectorIndex] Rebuilding unreadable index {path}: {e}")
+                index = None
+        if index is None:
+            index = cls.build(library, pca_dims, storage)
+            index.save(path)
+            logger.info(
+                f"[VectorIndex] Built {len(index.names)} library items "
+                f"(dim={index.matrix.shape[1]}, pca={index.pca_dims}, storage={index.storage}) → {path}"
+            )
+        log_matrix_memory("Library index", index.matrix)
+        return index
+
+    def project(self, vectors) -> np.ndarray:
+        """Map raw embeddings into the index space and normalize them."""
+        vectors = np.atleast_2d(np.asarray(vectors, dtype=np.float32))
+        if self.components is not None:
+            vectors = (vectors - self.mean) @ self.components.T
+        return normalize_rows(vectors)
+
+    def search(self, vectors, k: int = 5):
+        """Top-k (name, cosine) per query row, best first."""
+        scores = (self.matrix @ self.project(vectors).T).T
+        k = min(k, scores.shape[1])
+        if k <= 0:
+            return [[] for _ in range(scores.shape[0])]
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in zip(scores, top):
+            order = candidates[np.argsort(-row[candidates])]
+            results.append([(self.names[i], round(float(row[i]), 3)) for i in order])
+        return results
+
+    def __len__(self):
+        return len(self.names)